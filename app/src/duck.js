@@ -1,4 +1,9 @@
 import * as duckdb from '@duckdb/duckdb-wasm';
+import { cacheGet, cachePut } from "./store.js";
+
+const DICTIONARY = "en_simple.parquet";
+// Larger dictionaries are only queried with range requests, as the whole file would be held in memory
+const MAX_STORED_DICTIONARY = 256 * 1024 * 1024;
 
 async function initDatabase({
   log = false
@@ -22,63 +27,115 @@ async function initDatabase({
   return db;
 }
 
-async function runSQL(db, sql) {
-  const conn = await db.connect();
-
-  // Query
-  const arrowResult = await conn.query(sql);
+// Returns the first column of the result. DuckDB sends results as Arrow, so this reads
+// the column vector directly instead of converting every row to JSON.
+async function queryColumn(conn, sql) {
+  const table = await conn.query(sql);
+  const column = table.getChildAt(0);
+  return column === null ? [] : column.toArray();
+}
 
-  // Convert arrow table to json
-  const result = arrowResult.toArray().map((row) => row.toJSON());
+// Runs many single column queries as one UNION ALL query. Rows are tagged with the index
+// of their query, which comes back as an Int32Array and is used to split the results.
+async function queryBatch(conn, sqls) {
+  if (sqls.length === 0) {
+    return [];
+  }
+  const sql = sqls.map((query, i) => `select ${i}::INTEGER as q, * from (${query})`).join(" union all ");
+  const table = await conn.query(sql);
+  const results = sqls.map(() => []);
+  if (table.numRows === 0) {
+    return results;
+  }
+  const index = table.getChild("q").toArray();
+  const values = table.getChildAt(1).toArray();
+  for (let i = 0; i < index.length; i++) {
+    results[index[i]].push(values[i]);
+  }
+  return results;
+}
 
-  // Close the connection to release memory
-  await conn.close();
+// Version of the dictionary on the server (its ETag or modification date) and its size, nulls when offline
+async function dictionaryVersion(url) {
+  try {
+    const response = await fetch(url, { method: "HEAD", cache: "no-cache" });
+    const headers = response.headers;
+    return {
+      version: headers.get("ETag") || headers.get("Last-Modified"),
+      size: Number(headers.get("Content-Length")),
+    };
+  } catch (error) {
+    return { version: null, size: null };
+  }
+}
 
-  return result;
+// Registers the dictionary stored in IndexedDB if it's current (or the server can't be reached). Otherwise DuckDB
+// reads the file with HTTP range requests, fetching only the row groups and columns a query needs, while the whole
+// file is downloaded in the background and stored for the next visit. Returns the version of the dictionary.
+async function registerDictionary(db, url) {
+  const { version, size } = await dictionaryVersion(url);
+  const stored = await cacheGet("dictionary", version);
+  if (stored !== undefined) {
+    await db.registerFileBuffer(DICTIONARY, new Uint8Array(stored.data));
+    console.info("Registered parquet file from IndexedDB");
+    return stored.version;
+  }
+  await db.registerFileURL(DICTIONARY, url, duckdb.DuckDBDataProtocol.HTTP, false);
+  console.info("Registered parquet file");
+  if (version !== null && size <= MAX_STORED_DICTIONARY) {
+    fetch(url)
+      .then((response) => response.arrayBuffer())
+      .then((data) => cachePut("dictionary", version, { version, data }))
+      .catch((error) => console.warn("Couldn't store the dictionary", error));
+  }
+  return version;
 }
 
 export async function set_up_database() {
   const db = await initDatabase({ log: true });
-  const res = await fetch("s3/en_simple.parquet");
-  console.info("Got parquet file")
-  await db.registerFileBuffer('buffer.parquet', new Uint8Array(await res.arrayBuffer()));
-  console.info("Registered parquet file")
+  const version = await registerDictionary(db, new URL(`s3/${DICTIONARY}`, self.location.href).href);
   const connection = await db.connect();
-  await connection.query("CREATE TABLE en_simple AS SELECT * FROM 'buffer.parquet'");
-  await connection.query("ALTER TABLE en_simple ALTER alphabit_raw TYPE BITSTRING");
-  await connection.query("ALTER TABLE en_simple RENAME alphabit_raw TO alphabit");
-  await connection.close();
-  console.info("Alphabit column converted")
-  if ((await runSQL(db, "SELECT alphabit FROM en_simple LIMIT 10")).length > 0) {
+  const columns = await queryColumn(connection, "SELECT column_name FROM (DESCRIBE SELECT * FROM read_parquet('en_simple.parquet'))");
+  // The queries select from `words` (see `queries.words_view` in Python). Files exported with `en-parquet` already
+  // store the length, the integer alphabit and the crossability score, older ones have the raw answers and a string
+  // alphabit_raw. Answers without a score get 0.
+  const score = columns.includes("score") ? "score" : "0.0::REAL AS score";
+  if (columns.includes("length")) {
+    await connection.query(`CREATE VIEW words AS SELECT answer, length, alphabit, ${score} FROM read_parquet('en_simple.parquet')`);
+  }
+  else {
+    const alphabit = columns.includes("alphabit") ? "alphabit" : "alphabit_raw::BIT::UINTEGER";
+    await connection.query(
+      `CREATE VIEW words AS SELECT answer, length(answer) AS length, ${alphabit} AS alphabit, ${score}
+       FROM read_parquet('en_simple.parquet') WHERE length(answer) > 1`
+    );
+  }
+  console.info("Created the words view")
+  if ((await queryColumn(connection, "SELECT alphabit FROM words LIMIT 10")).length > 0) {
     console.info("Database set up and tested successfully!")
   }
   else {
     console.error("Database set up failed!")
   }
-  return db;
+  return { db, connection, version };
 }
 
+// Functions registered in Pyodide as the `_duckdb` module. They share one connection for the whole session,
+// the SQL itself is built in Python (platyrhynchos/exclusive/queries.py).
 export async function prepare_functions() {
-  const db = await set_up_database();
+  const { db, connection, version } = await set_up_database();
 
   return {
     db: db,
+    // Version of the dictionary, null if it's unknown
+    version: version,
 
-    get_regex_w_alphabit: async function(regex, alphabit, previous = null) {
-      previous = ["'A'"] || previous.map(i => `'${i}'`);
-      const sql = `select answer from en_simple where bit_count('${alphabit}'::BIT | alphabit)=length(alphabit) and regexp_matches(answer, '${regex}') and length(answer) > 1 and length(answer) > 1 and answer not in (${previous.join(',')}) sample 20`;
-      return await runSQL(db, sql).then(db => db.map(i => i.answer));
+    query_column: async function(sql) {
+      return await queryColumn(connection, sql);
     },
-    
-    get_regex: async function(regex, previous = []) {
-      previous = ["'A'"] || previous.map(i => `'${i}'`);
-      const sql = `select answer from en_simple where regexp_matches(answer, '${regex}') and length(answer) > 1 and answer not in (${previous.join(',')}) sample 20`;
-      return await runSQL(db, sql).then(db => db.map(i => i.answer));
+
+    query_batch: async function(sqls) {
+      return await queryBatch(connection, Array.from(sqls));
     },
-    
-    get_random: async function(max_size) {
-      const sql = `select answer from en_simple where length(answer) > 1 and length(answer) < ${max_size} using sample 1`;
-      return await runSQL(db, sql).then(db => db.map(i => i.answer));
-    }
   }
 }
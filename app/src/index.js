@@ -1,37 +1,44 @@
-import { prepare_functions } from "./duck.js"
-import { initPy } from "./loadpy.js"
 import "./spinner.css"
 
-
-const promise_duckdb_client = prepare_functions();
-const pyodide = await initPy()
-const duckdb_client = await promise_duckdb_client;
-const test_connection = duckdb_client.get_regex_w_alphabit(".+", "11111111111111111111111111", "").then((x) => console.info("Connection to DuckDB successful!"))
-
-const settings = await (await fetch("settings.toml")).text()
-const _stuff = {
-    settings_text: settings,
+// The service worker (built by Workbox in production, see webpack.config.js) caches Pyodide, its packages and the
+// wheel, so repeat visits start without downloading them
+if (process.env.NODE_ENV === "production" && "serviceWorker" in navigator) {
+    navigator.serviceWorker
+        .register("service-worker.js")
+        .catch((error) => console.error("Service Worker registration failed: ", error));
 }
 
-pyodide.registerJsModule("_duckdb", duckdb_client);
-console.log("Registered DuckDB WASM client in Pyodide");
-pyodide.registerJsModule("_stuff", _stuff);
+// Pyodide and DuckDB live in a web worker, the page only sends requests and renders the results
+const worker = new Worker(new URL("./worker.js", import.meta.url));
 
-await test_connection;
-const crossword = await pyodide.runPythonAsync(`
-    from platyrhynchos.director.direct_search import generate_crossword
-    from platyrhynchos.cruciverbalist.en_simple import get_regex_w_alphabit
+let requestId = 0;
+const pending = new Map();
 
-    if await get_regex_w_alphabit(".+", "11111111111111111111111111", []):
-        print("Connection to DB via Pyodide successful!")
+worker.onmessage = (event) => {
+    const { type, id } = event.data;
+    if (type === "ready") {
+        console.info("Worker ready");
+        return;
+    }
+    const { resolve, reject } = pending.get(id);
+    pending.delete(id);
+    if (type === "result") {
+        console.info(`Crossword generated in ${Math.round(event.data.generationTime)} ms`);
+        resolve(event.data.crossword);
+    } else {
+        reject(new Error(event.data.message));
+    }
+};
+
+function generate(width, height, words) {
+    const id = requestId++;
+    return new Promise((resolve, reject) => {
+        pending.set(id, { resolve, reject });
+        worker.postMessage({ type: "generate", id, width, height, words });
+    });
+}
 
-    crossword = await generate_crossword(10, 10, 10)
-    print(crossword)
-    print()
-    print("Word amount:", len(crossword.words))
-    print("Words:", ",".join(crossword.words.keys()))
-    crossword.as_exolve()
-`);
+const crossword = await generate(10, 10, 10);
 document.getElementById("spinner").remove();
 // const crossword = `
 // exolve-begin
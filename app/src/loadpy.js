@@ -1,11 +1,18 @@
-const loadPyodide = require('pyodide')
+// Pyodide is loaded inside the web worker, so it's imported with importScripts instead of a <script> tag.
+// The versions are set by webpack (see webpack.config.js). In production builds the service worker keeps Pyodide,
+// its packages and the wheel in versioned caches, so repeat visits don't download them.
+const PYODIDE_URL = `https://cdn.jsdelivr.net/pyodide/v${__PYODIDE_VERSION__}/full/`;
+const WHEEL = `platyrhynchos-${__PACKAGE_VERSION__}-py3-none-any.whl`;
 
 export async function initPy(){
-    let pyodide = await loadPyodide();
+    if (typeof self.loadPyodide === "undefined") {
+        importScripts(`${PYODIDE_URL}pyodide.js`);
+    }
+    let pyodide = await self.loadPyodide({ indexURL: PYODIDE_URL });
     await pyodide.loadPackage("micropip");
     const micropip = pyodide.pyimport("micropip");
     pyodide.loadPackage("setuptools");
-    await micropip.install('http://localhost:8080/platyrhynchos-0.1.1-py3-none-any.whl');
+    await micropip.install(new URL(WHEEL, self.location.href).href);
     console.log("Loaded pyodide");
     return pyodide;
 }
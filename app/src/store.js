@@ -0,0 +1,58 @@
+// Persistent key-value store in IndexedDB, shared by the page and the worker. Every entry is stored with
+// a version, a lookup with another version is a miss, so stale entries are replaced by the next `put`.
+const DB_NAME = "platyrhynchos";
+const STORE = "cache";
+
+let opened = null;
+
+function openDatabase() {
+  if (opened === null) {
+    opened = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, 1);
+      request.onupgradeneeded = () => request.result.createObjectStore(STORE);
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+  return opened;
+}
+
+async function transaction(mode, action) {
+  const db = await openDatabase();
+  return new Promise((resolve, reject) => {
+    const request = action(db.transaction(STORE, mode).objectStore(STORE));
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+// Returns the value stored under `key` with `version`, or undefined. A null version accepts any.
+// Errors (e.g. IndexedDB disabled in private windows) are misses.
+export async function cacheGet(key, version) {
+  try {
+    const entry = await transaction("readonly", (store) => store.get(key));
+    if (entry !== undefined && (version === null || entry.version === version)) {
+      return entry.value;
+    }
+  } catch (error) {
+    console.warn(`Couldn't read ${key} from IndexedDB`, error);
+  }
+  return undefined;
+}
+
+export async function cachePut(key, version, value) {
+  try {
+    await transaction("readwrite", (store) => store.put({ version, value }, key));
+  } catch (error) {
+    console.warn(`Couldn't store ${key} in IndexedDB`, error);
+  }
+}
+
+// Short hash of a text, to put e.g. the settings into a version key
+export function hashText(text) {
+  let hash = 5381;
+  for (let i = 0; i < text.length; i++) {
+    hash = Math.imul(hash, 33) ^ text.charCodeAt(i);
+  }
+  return (hash >>> 0).toString(36);
+}
@@ -0,0 +1,85 @@
+// Runs Pyodide and DuckDB off the main thread, so generation doesn't block the UI.
+//
+// Messages from the page:  { type: "generate", id, width, height, words }
+// Messages to the page:    { type: "ready" }
+//                          { type: "result", id, crossword, generationTime }
+//                          { type: "error", id, message }
+import { prepare_functions } from "./duck.js"
+import { initPy } from "./loadpy.js"
+import { cacheGet, cachePut, hashText } from "./store.js"
+
+// Query results are kept in IndexedDB between visits. They depend on the package, the dictionary and the settings,
+// so all three make the version. Set to false to start with an empty cache every time.
+const PERSIST_QUERY_CACHE = true;
+let queryCacheVersion = null;
+
+async function setUp() {
+    const promise_duckdb_client = prepare_functions();
+    const settings = await (await fetch("settings.toml")).text();
+    const pyodide = await initPy();
+    const duckdb_client = await promise_duckdb_client;
+
+    pyodide.registerJsModule("_duckdb", duckdb_client);
+    console.log("Registered DuckDB WASM client in Pyodide");
+    pyodide.registerJsModule("_stuff", { settings_text: settings });
+
+    await pyodide.runPythonAsync(`
+        import json
+
+        from platyrhynchos.commons.logger import configure_logging
+        from platyrhynchos.director import generate_crossword
+        from platyrhynchos.director.direct_search import get_cruciverbalist
+        from platyrhynchos.exclusive import get_regex_w_alphabit
+
+        configure_logging()
+
+        if await get_regex_w_alphabit(".+", "11111111111111111111111111", []):
+            print("Connection to DB via Pyodide successful!")
+
+        def dump_query_cache():
+            return json.dumps(get_cruciverbalist().query_cache.items())
+
+        def load_query_cache(text):
+            get_cruciverbalist().query_cache.update(json.loads(text))
+    `);
+    if (PERSIST_QUERY_CACHE && duckdb_client.version !== null) {
+        queryCacheVersion = `${__PACKAGE_VERSION__}/${duckdb_client.version}/${hashText(settings)}`;
+        const stored = await cacheGet("queries", queryCacheVersion);
+        if (stored !== undefined) {
+            pyodide.globals.get("load_query_cache")(stored);
+            console.log("Restored the query cache");
+        }
+    }
+    return pyodide;
+}
+
+async function storeQueryCache(pyodide) {
+    if (queryCacheVersion !== null) {
+        await cachePut("queries", queryCacheVersion, pyodide.globals.get("dump_query_cache")());
+    }
+}
+
+const ready = setUp().then((pyodide) => {
+    self.postMessage({ type: "ready" });
+    return pyodide;
+});
+
+self.onmessage = async (event) => {
+    const { type, id, width, height, words } = event.data;
+    if (type !== "generate") {
+        return;
+    }
+    try {
+        const pyodide = await ready;
+        const started = performance.now();
+        const generate = pyodide.globals.get("generate_crossword");
+        const crossword = await generate(width, height, words);
+        const exolve = crossword.as_exolve();
+        crossword.destroy();
+        generate.destroy();
+        self.postMessage({ type: "result", id, crossword: exolve, generationTime: performance.now() - started });
+        await storeQueryCache(pyodide);
+    } catch (error) {
+        self.postMessage({ type: "error", id, message: String(error) });
+    }
+};
@@ -6,9 +6,16 @@ const MiniCssExtractPlugin = require("mini-css-extract-plugin");
 const WorkboxWebpackPlugin = require("workbox-webpack-plugin");
 const WebpackShellPluginNext = require('webpack-shell-plugin-next');
 const CopyPlugin = require("copy-webpack-plugin");
+const { DefinePlugin } = require("webpack");
+const fs = require("fs");
 
 const isProduction = process.env.NODE_ENV == "production";
 
+// The wheel's version comes from pyproject.toml, Pyodide's is pinned here. Both are part of the cached URLs,
+// so a new version is downloaded once and cached again.
+const PACKAGE_VERSION = fs.readFileSync(path.resolve(__dirname, "../pyproject.toml"), "utf8").match(/^version = "(.+)"$/m)[1];
+const PYODIDE_VERSION = "0.23.1";
+
 const stylesHandler = isProduction
   ? MiniCssExtractPlugin.loader
   : "style-loader";
@@ -52,6 +59,10 @@ const config = {
         { from: "../settings.toml", to: "." },
       ],
     }),
+    new DefinePlugin({
+      __PACKAGE_VERSION__: JSON.stringify(PACKAGE_VERSION),
+      __PYODIDE_VERSION__: JSON.stringify(PYODIDE_VERSION),
+    }),
     // Add your plugins here
     // Learn more about plugins from https://webpack.js.org/configuration/plugins/
   ],
@@ -78,9 +89,6 @@ const config = {
       // Learn more about loaders from https://webpack.js.org/loaders/
     ],
   },
-  externals: {
-    pyodide: 'loadPyodide'
-  },
   experiments: {
     asyncWebAssembly: true,
     topLevelAwait: true,
@@ -94,7 +102,39 @@ module.exports = () => {
 
     config.plugins.push(new MiniCssExtractPlugin());
 
-    config.plugins.push(new WorkboxWebpackPlugin.GenerateSW());
+    // The wheel and settings.toml are precached with the bundle, under revisions of their contents.
+    // CDN files have versions in their URLs, so they're served from the cache without asking the network.
+    // The dictionary isn't cached here, DuckDB reads it with range requests and duck.js keeps it in IndexedDB.
+    config.plugins.push(
+      new WorkboxWebpackPlugin.GenerateSW({
+        clientsClaim: true,
+        skipWaiting: true,
+        maximumFileSizeToCacheBytes: 16 * 1024 * 1024,
+        runtimeCaching: [
+          {
+            urlPattern: new RegExp(`^https://cdn\\.jsdelivr\\.net/pyodide/v${PYODIDE_VERSION}/`),
+            handler: "CacheFirst",
+            options: { cacheName: `pyodide-${PYODIDE_VERSION}`, cacheableResponse: { statuses: [0, 200] } },
+          },
+          {
+            urlPattern: /^https:\/\/cdn\.jsdelivr\.net\/npm\/@duckdb\//,
+            handler: "CacheFirst",
+            options: { cacheName: "duckdb-wasm", cacheableResponse: { statuses: [0, 200] } },
+          },
+          {
+            // Wheels of the dependencies installed by micropip never change
+            urlPattern: /^https:\/\/files\.pythonhosted\.org\//,
+            handler: "CacheFirst",
+            options: { cacheName: "pypi-files", cacheableResponse: { statuses: [0, 200] } },
+          },
+          {
+            urlPattern: /^https:\/\/pypi\.org\/pypi\//,
+            handler: "StaleWhileRevalidate",
+            options: { cacheName: "pypi-index" },
+          },
+        ],
+      })
+    );
   } else {
     config.mode = "development";
   }
@@ -0,0 +1,19 @@
+import asyncio
+from time import process_time
+
+from platyrhynchos.commons.logger import configure_logging
+from platyrhynchos.director import get_runner
+
+RUNS = 5
+
+configure_logging()
+
+for runner in ("direct", "beam"):
+    generate_crossword = get_runner(runner)
+    words = 0
+    start = process_time()
+    for _ in range(RUNS):
+        crossword = asyncio.run(generate_crossword(10, 10, 16))
+        words += len(crossword.words)
+    elapsed = process_time() - start
+    print(f"{runner}: {words / RUNS:.1f} words per grid, {words / elapsed:.1f} words per CPU second")
@@ -1,6 +1,7 @@
 import asyncio
 from contextlib import suppress
 
+from platyrhynchos.commons.logger import configure_logging
 from platyrhynchos.director.direct_search import generate_crossword
 
 with suppress(ModuleNotFoundError):
@@ -8,6 +9,8 @@ with suppress(ModuleNotFoundError):
 
     functiontrace.trace()
 
+configure_logging()
+
 crossword = asyncio.run(generate_crossword(10, 10, 16))
 print(crossword)
 print()
@@ -0,0 +1,48 @@
+from time import perf_counter
+
+from platyrhynchos.commons.logger import configure_logging, logger
+from platyrhynchos.commons.settings import LogsSettings
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+
+TURNS = 2000
+
+crossword = CrosswordImprovable.make("TEXT", 10, 10)
+crossword.add("EXTRA", (True, 1))
+crossword.add("TAXI", (False, 3))
+
+
+def silent_turn():
+    """The same turn without any logging"""
+    for colrow in crossword.iter_colrows():
+        list(colrow.yield_regexes())
+
+
+def turn():
+    """The logging-relevant part of a direct search turn: regexes of every ColRow and the crossword dump"""
+    for colrow in crossword.iter_colrows():
+        regexes = list(colrow.yield_regexes())
+        logger.opt(lazy=True).debug("Found {} words for {}", lambda: len(regexes), lambda: colrow)
+    logger.debug("Crossword:\n{}", crossword)
+
+
+def eager_turn():
+    """The same turn with the messages built before the level check"""
+    for colrow in crossword.iter_colrows():
+        regexes = list(colrow.yield_regexes())
+        logger.debug(f"Found {len(regexes)} words for {colrow}")
+    logger.debug("Crossword:\n" + str(crossword))
+
+
+def per_turn(function) -> float:
+    start = perf_counter()
+    for _ in range(TURNS):
+        function()
+    return (perf_counter() - start) / TURNS * 1e6
+
+
+configure_logging(LogsSettings(level="INFO"), lambda _: None)
+print(f"No logging: {per_turn(silent_turn):.1f} µs per turn")
+for level in ("INFO", "DEBUG"):
+    configure_logging(LogsSettings(level=level), lambda _: None)
+    print(f"{level}: {per_turn(turn):.1f} µs per turn, {per_turn(eager_turn):.1f} µs with eager messages")
+    logger.complete()
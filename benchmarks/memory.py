@@ -0,0 +1,55 @@
+import tracemalloc
+
+from platyrhynchos.commons.logger import configure_logging
+from platyrhynchos.commons.settings import LogsSettings
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+
+TURNS = 200
+COPIES = 200
+
+configure_logging(LogsSettings(level="INFO"))
+
+crossword = CrosswordImprovable.make("TEXT", 15, 15)
+crossword.add("EXTRA", (True, 1))
+crossword.add("TAXI", (False, 3))
+
+
+def turn():
+    """
+    The crossword-side part of a direct search turn: sorting the ColRows, then finding their regexes,
+    then adding a word and undoing it
+    """
+    for colrow in sorted(crossword.iter_colrows(), key=lambda colrow: len(list(colrow.cross_words()))):
+        list(colrow.yield_regexes())
+    crossword.add("TEN", (True, 3))
+    crossword.undo()
+
+
+def allocated_per_turn() -> float:
+    """Returns the KiB allocated at the peak of a turn, on average"""
+    turn()
+    tracemalloc.start()
+    peak = 0
+    for _ in range(TURNS):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        turn()
+        peak += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    return peak / TURNS / 1024
+
+
+def retained_by_copies() -> float:
+    """Returns the KiB kept by copies of the crossword read from the binary format, as a beam would keep them"""
+    data = crossword.to_bytes()
+    CrosswordImprovable.from_bytes(data)
+    tracemalloc.start()
+    copies = [CrosswordImprovable.from_bytes(data) for _ in range(COPIES)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copies
+    return current / COPIES / 1024
+
+
+print(f"Turn: {allocated_per_turn():.1f} KiB at peak")
+print(f"Copy: {retained_by_copies():.1f} KiB retained")
@@ -0,0 +1,69 @@
+"""
+Query time and generation speed against synthetic dictionaries of growing size (see `exclusive/synthetic.py`).
+Runs offline, the sizes can be given as arguments, e.g. `python benchmarks/scaling.py 10000 100000 10000000`.
+"""
+import asyncio
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from platyrhynchos.commons.logger import configure_logging
+from platyrhynchos.commons.settings import LogsSettings
+from platyrhynchos.commons.utils import random
+from platyrhynchos.director import direct_search
+from platyrhynchos.exclusive import cpython
+from platyrhynchos.exclusive.synthetic import build_synthetic
+
+SIZES = [int(i) for i in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+RUNS = 3
+
+# Regexes as made by `ColRow`, from a free row to a nearly filled one
+REGEXES = [
+    "^.{0,4}E.{0,5}$",
+    "^.{0,2}A.{1}T.{0,3}$",
+    "^S.{2}R.{0,4}$",
+    "^.{0,3}IN.{0,2}$",
+    "^C.{1}A.{1}N$",
+    "^.{0,1}Q.{0,6}$",
+]
+
+configure_logging(LogsSettings(level="CRITICAL"))
+
+
+async def query_time() -> float:
+    """Returns the seconds of a batch of `REGEXES`, as the cruciverbalist runs them"""
+    cruciverbalist = direct_search.get_cruciverbalist()
+    start = perf_counter()
+    await cruciverbalist._lookup(REGEXES)
+    return perf_counter() - start
+
+
+async def generation() -> tuple[float, float]:
+    """Returns the words per grid and the seconds per grid of the direct search"""
+    words = 0
+    start = perf_counter()
+    for seed in range(RUNS):
+        random.seed(seed)
+        crossword = await direct_search.generate_crossword(10, 10, 16)
+        words += len(crossword.words)
+    return words / RUNS, (perf_counter() - start) / RUNS
+
+
+print(f"{'clues':>10} {'answers':>10} {'build s':>8} {'query ms':>9} {'words':>6} {'grid s':>7}")
+with TemporaryDirectory() as directory:
+    for size in SIZES:
+        path = str(Path(directory) / f"synthetic_{size}.db")
+        start = perf_counter()
+        build_synthetic(path, size)
+        built = perf_counter() - start
+        cpython.use_database(path)
+        direct_search.get_cruciverbalist.cache_clear()
+        (answers,) = cpython.cursor_execute("SELECT count(*) FROM words")[0]
+        # The first batch pages the dictionary in, the second one runs with a new cruciverbalist, so nothing is cached
+        asyncio.run(query_time())
+        direct_search.get_cruciverbalist.cache_clear()
+        queried = asyncio.run(query_time())
+        words, elapsed = asyncio.run(generation())
+        print(f"{size:>10} {answers:>10} {built:>8.1f} {queried * 1000:>9.1f} {words:>6.1f} {elapsed:>7.2f}")
+        cpython.use_database(None)
@@ -1,8 +1,29 @@
-# trunk-ignore(flake8/F401)
-from .commons.logger import logger
+"""
+Platyrhynchos keeps its package import free of side effects: the commonly used names below are only
+imported on first access, so `import platyrhynchos` doesn't load loguru, dynaconf or the database.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-# trunk-ignore(flake8/F401)
-from .crossword.colrow import ColRow
+if TYPE_CHECKING:
+    from .commons.logger import logger
+    from .crossword.colrow import ColRow
+    from .crossword.improvable import CrosswordImprovable
 
-# trunk-ignore(flake8/F401)
-from .crossword.improvable import CrosswordImprovable
+_LAZY_ATTRIBUTES = {
+    "logger": ".commons.logger",
+    "ColRow": ".crossword.colrow",
+    "CrosswordImprovable": ".crossword.improvable",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
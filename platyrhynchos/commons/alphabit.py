@@ -42,6 +42,10 @@ class Alphabit:
         """Generates an Alphabit query to be used in SQL"""
         return (~self.bittarray).to01()
 
+    def to_int(self) -> int:
+        """Generates an integer Alphabit value of a word, as stored in Parquet files (A is the lowest bit)"""
+        return int(self.to_db(), 2)
+
     def as_letters(self) -> str:
         return "".join(letter for letter, bit in zip(self.LETTER_ORDER, self.bittarray) if bit)
 
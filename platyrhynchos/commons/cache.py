@@ -0,0 +1,161 @@
+"""Caches of query results, shared by long-lived processes (e.g. the generation server) or kept for one generation"""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from threading import Lock
+from typing import AbstractSet, Any, Awaitable, Callable, Generic, Hashable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class QueryCache(Generic[T]):
+    """Least recently used cache of query results, counting its hits and misses. It's safe to use from threads."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        """
+        Keyword Arguments:
+            maxsize -- amount of results kept, 0 disables the cache (default: {4096})
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, T] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: T):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def items(self) -> list[tuple[Hashable, T]]:
+        """Returns the cached results from the least recently used one, e.g. to persist them"""
+        with self._lock:
+            return list(self._data.items())
+
+    def update(self, items: Iterable[tuple[Hashable, T]]):
+        """Puts results in the order of `items`, e.g. the ones returned by `items`, without counting them"""
+        for key, value in items:
+            self.put(key, value)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+class DeadEnds:
+    """
+    Letter patterns of ColRows known to have no words, kept for one generation.
+
+    A pattern is dead for the words excluded when no word was found for it, and for any crossword excluding
+    at least those words. The pattern of a ColRow changes when a crossing word adds a letter to it,
+    so it's looked up again then.
+    """
+
+    def __init__(self) -> None:
+        self._dead: dict[Hashable, tuple[frozenset[str], int]] = {}
+        self.skipped = 0
+        self.avoided_queries = 0
+
+    def __len__(self) -> int:
+        return len(self._dead)
+
+    def is_dead(self, pattern: Hashable, excluded: AbstractSet[str]) -> bool:
+        """Tells whether the pattern is known to have no words, counting the skipped lookups"""
+        if (found := self._dead.get(pattern)) is None or not found[0] <= excluded:
+            return False
+        self.skipped += 1
+        self.avoided_queries += found[1]
+        return True
+
+    def add(self, pattern: Hashable, excluded: AbstractSet[str], queries: int):
+        """
+        Arguments:
+            pattern -- letter pattern without words
+            excluded -- words excluded when looking them up
+            queries -- regex lookups skipped every time the pattern is skipped
+        """
+        self._dead[pattern] = (frozenset(excluded), queries)
+
+    def stats(self) -> dict[str, Any]:
+        return {"dead": len(self), "skipped": self.skipped, "avoided_queries": self.avoided_queries}
+
+
+class Prefetcher(Generic[T]):
+    """
+    Lookups started ahead of time for one generation, by letter pattern. At most `limit` of them run at once,
+    the others wait for a free slot. A result is used once, and only for the words excluded when it was started.
+    """
+
+    def __init__(self, limit: int = 4) -> None:
+        self._slots = asyncio.Semaphore(limit)
+        self._pending: dict[Hashable, tuple[frozenset[str], asyncio.Future[T]]] = {}
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def _run(self, lookup: Callable[[], Awaitable[T]]) -> T:
+        async with self._slots:
+            return await lookup()
+
+    def start(self, pattern: Hashable, excluded: AbstractSet[str], lookup: Callable[[], Awaitable[T]]):
+        """
+        Starts a lookup in the background, unless one for the pattern is pending. Needs a running event loop.
+
+        Arguments:
+            pattern -- letter pattern the lookup is for
+            excluded -- words the lookup excludes
+            lookup -- returns the awaitable doing the lookup, called once a slot is free
+        """
+        if pattern in self._pending:
+            return
+        self._pending[pattern] = (frozenset(excluded), asyncio.ensure_future(self._run(lookup)))
+        self.started += 1
+
+    def take(self, pattern: Hashable, excluded: AbstractSet[str]) -> Optional[asyncio.Future[T]]:
+        """Returns the pending lookup of the pattern if it excludes the same words, a stale one is cancelled"""
+        if (found := self._pending.pop(pattern, None)) is None:
+            return None
+        words, future = found
+        if words != excluded:
+            future.cancel()
+            self.wasted += 1
+            return None
+        self.used += 1
+        return future
+
+    def clear(self):
+        """Cancels the lookups that weren't used"""
+        for _, future in self._pending.values():
+            if future.done() and not future.cancelled():
+                # Nobody waits for it, so a failed lookup is dropped instead of reported when it's collected
+                future.exception()
+            future.cancel()
+        self.wasted += len(self._pending)
+        self._pending.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"started": self.started, "used": self.used, "wasted": self.wasted}
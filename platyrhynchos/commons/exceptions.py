@@ -25,6 +25,12 @@ class PartNotFoundException(UninsertableException):
     pass
 
 
+class FormatException(CrosswordException):
+    """Serialized crossword couldn't be read"""
+
+    pass
+
+
 class DatabaseException(Exception):
     """Parent of db-related exceptions"""
 
@@ -1,17 +1,33 @@
 """
 Implements logging using the loguru library. It also intercepts all other loggers and writes their output to out.log
+
+Importing this module leaves the sinks alone, the entry points (scripts, the Pyodide worker, benchmarks) configure
+them from `settings.logs` with `configure_logging`. Code on hot paths checks `debug_enabled()` before building
+debug messages, or passes expensive arguments as callables with `logger.opt(lazy=True)`.
 """
 import logging
 import sys
+from typing import Any, Optional
 
 from loguru import logger
 
-from .settings import settings
-from .utils import app_dir
+from .settings import LogsSettings, frozen_settings
+
+# Lowest level number accepted by the sink, records below it are dropped before any formatting
+_min_level = 0
+_DEBUG = logging.DEBUG
+
+
+def debug_enabled() -> bool:
+    """Tells whether debug records are written at all"""
+    return _min_level <= _DEBUG
 
 
 class InterceptHandler(logging.Handler):
     def emit(self, record):
+        if record.levelno < _min_level:
+            return
+
         # Get corresponding Loguru level if it exists.
         try:
             level = logger.level(record.levelname).name
@@ -27,4 +43,29 @@ class InterceptHandler(logging.Handler):
         logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
 
-logging.basicConfig(handlers=[InterceptHandler()], level=0, force=True)
+def configure_logging(logs: Optional[LogsSettings] = None, sink: Any = sys.stderr) -> int:
+    """
+    Replaces the loguru sinks with a single one and routes the standard logging to it.
+
+    Keyword Arguments:
+        logs -- logging settings (default: {`settings.logs`})
+        sink -- anything loguru accepts as a sink (default: {sys.stderr})
+
+    Returns:
+        the minimum level number
+    """
+    global _min_level  # pylint: disable=global-statement
+    settings = frozen_settings()
+    logs = logs or settings.logs
+    level = logs.level or ("DEBUG" if settings.debug else "INFO")
+    logger.remove()
+    logger.add(
+        sink,
+        level=level,
+        diagnose=logs.diagnose,
+        colorize=logs.colorize or None,
+        enqueue=logs.enqueue and sys.platform != "emscripten",
+    )
+    _min_level = logger.level(level).no
+    logging.basicConfig(handlers=[InterceptHandler()], level=_min_level, force=True)
+    return _min_level
@@ -1,7 +1,9 @@
 """Random reusable stuff"""
 from __future__ import annotations
 
-from typing import Any, Callable, NewType, TypeVar
+import re
+from functools import lru_cache
+from typing import Any, Callable, NewType, Optional, TypeVar
 
 T = TypeVar("T")
 T2 = TypeVar("T2")
@@ -10,6 +12,56 @@ Coord = NewType("Coord", tuple[int, int])
 IsColumn = NewType("IsColumn", bool)
 ColRowId = NewType("ColRowId", int)
 
+# Fields of grids up to this size are interned, so the table stays bounded in long-lived processes
+MAX_INTERNED = 256
+# Columns of interned fields, created on first use and indexed by row, so a lookup builds no tuple
+_coords: list[Optional[list[Optional[Coord]]]] = [None] * MAX_INTERNED
+
+
+def coord(h: int, v: int) -> Coord:
+    """Returns the interned `Coord` of a field, so crosswords share one tuple per field"""
+    if not (0 <= h < MAX_INTERNED and 0 <= v < MAX_INTERNED):
+        return Coord((h, v))
+    if (column := _coords[h]) is None:
+        column = _coords[h] = [None] * MAX_INTERNED
+    if (found := column[v]) is None:
+        found = column[v] = Coord((h, v))
+    return found
+
+
+@lru_cache(maxsize=4 * MAX_INTERNED)
+def line_coords(is_column: bool, nth: int, length: int) -> tuple[Coord, ...]:
+    """Returns the interned coordinates of the first `length` fields of a column or row"""
+    return tuple(coord(nth, i) if is_column else coord(i, nth) for i in range(length))
+
+
+# Tokens of the regexes made by `ColRow._regex_of_part`: a gap of any letters, or a single (escaped) letter
+_PATTERN_TOKEN = re.compile(r"\.\{(\d+)(?:,(\d+))?\}|\\(.)|([^\\.^${}()\[\]|*+?])")
+
+
+def pattern_tokens(regex: str) -> Optional[list[tuple[int, int] | str]]:
+    """
+    Splits an anchored regex made by `ColRow` into its letters and its gaps of `.{n}` or `.{m,n}` letters,
+    e.g. `^.{0,3}AB.{2}$` gives `[(0, 3), "A", "B", (2, 2)]`.
+
+    Returns:
+        letters and (minimum, maximum) pairs of the gaps, or None if the regex has any other syntax
+    """
+    if not (regex.startswith("^") and regex.endswith("$")):
+        return None
+    tokens: list[tuple[int, int] | str] = []
+    position, end = 1, len(regex) - 1
+    for token in _PATTERN_TOKEN.finditer(regex, position, end):
+        if token.start() != position:
+            return None
+        position = token.end()
+        low, high, escaped, plain = token.groups()
+        if low is None:
+            tokens.append(escaped or plain)
+        else:
+            tokens.append((int(low), int(high if high is not None else low)))
+    return tokens if position == end else None
+
 
 class ProxiedDict(dict):
     """A dict that can run a function on every set or get"""
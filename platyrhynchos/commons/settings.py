@@ -1,19 +1,140 @@
+"""
+Loads the settings using Dynaconf.
+
+`settings` is the dynamic Dynaconf object. Hot code should use `frozen_settings()` instead, which returns
+a parsed, immutable snapshot with plain attributes. The snapshot is built once; call `reload_settings()`
+to explicitly re-read the settings sources.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from functools import cache
 from sys import platform
-from tempfile import NamedTemporaryFile
+from typing import Any, Mapping, TypeVar
 
 from dynaconf import Dynaconf
+from dynaconf.loaders import toml_loader
+
+SectionT = TypeVar("SectionT")
 
 
 def load_settings_from_string(settings_text: str):
-    """Load settings from a string. Useful for testing."""
+    """Load settings from a string. Useful for testing. The text is parsed in memory."""
     temp_settings = Dynaconf()
-    with NamedTemporaryFile("w", suffix=".toml") as f:
-        f.write(settings_text)
-        f.flush()
-        temp_settings.load_file(f.name)  # type: ignore
+    toml_loader.load(temp_settings, filename=settings_text)
     return temp_settings
 
 
+def _from_mapping(cls: type[SectionT], data: Mapping[str, Any]) -> SectionT:
+    """
+    Builds a settings dataclass from a mapping. Keys are matched case-insensitively, unknown keys are ignored
+    and missing ones use the dataclass defaults. Fields with a `default_factory` are treated as sections.
+    """
+    data = {str(key).lower(): value for key, value in data.items()}
+    kwargs = {}
+    for section_field in fields(cls):  # type: ignore
+        if section_field.name not in data:
+            continue
+        value = data[section_field.name]
+        if isinstance(section_field.default_factory, type):
+            value = _from_mapping(section_field.default_factory, value)
+        kwargs[section_field.name] = value
+    return cls(**kwargs)
+
+
+@dataclass(frozen=True)
+class ComponentsSettings:
+    cruciverbalist: str = "en_simple"
+    runner: str = ""
+    overwrite_platform: str = ""
+    prefetch: int = 4
+
+
+@dataclass(frozen=True)
+class LogsSettings:
+    level: str = ""
+    diagnose: bool = False
+    colorize: bool = False
+    enqueue: bool = True
+
+
+@dataclass(frozen=True)
+class EnSimpleSettings:
+    db_file: str = "en_simple.db"
+    parquet_file: str = "en_simple.parquet"
+    store: str = "duckdb"
+    read_only: bool = True
+    use_alphabit: bool = True
+    ranked: bool = True
+    top_k: int = 32
+    prune_patterns: bool = True
+    validate_runs: bool = False
+    query_cache_size: int = 4096
+
+
+@dataclass(frozen=True)
+class S3Settings:
+    region: str = ""
+    endpoint: str = ""
+    bucket: str = ""
+    chunk_size: int = 8 * 1024 * 1024
+    download_workers: int = 4
+
+
+@dataclass(frozen=True)
+class BeamSettings:
+    width: int = 4
+    branching: int = 3
+    colrows: int = 4
+
+
+@dataclass(frozen=True)
+class MultiStartSettings:
+    runs: int = 4
+    runner: str = "direct"
+    goal: str = "fill_ratio"
+    target: float = 0.0
+    workers: int = 0
+
+
+@dataclass(frozen=True)
+class RegionSettings:
+    size: int = 15
+    workers: int = 0
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    unix_socket: str = ""
+    concurrency: int = 2
+    max_queue: int = 16
+    latency_window: int = 1000
+
+
+@dataclass(frozen=True)
+class FrozenSettings:
+    """Immutable snapshot of the settings"""
+
+    debug: bool = False
+    components: ComponentsSettings = field(default_factory=ComponentsSettings)
+    logs: LogsSettings = field(default_factory=LogsSettings)
+    en_simple: EnSimpleSettings = field(default_factory=EnSimpleSettings)
+    s3: S3Settings = field(default_factory=S3Settings)
+    beam: BeamSettings = field(default_factory=BeamSettings)
+    multi_start: MultiStartSettings = field(default_factory=MultiStartSettings)
+    region: RegionSettings = field(default_factory=RegionSettings)
+    server: ServerSettings = field(default_factory=ServerSettings)
+    s3_key_id: str = field(default="", repr=False)
+    s3_key_secret: str = field(default="", repr=False)
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> FrozenSettings:
+        """Builds the snapshot from already parsed settings (e.g. `settings.as_dict()`)"""
+        return _from_mapping(cls, data)
+
+
 if platform == "emscripten":
     # Running in the browser, so we can't load settings from a file.
 
@@ -24,3 +145,17 @@ if platform == "emscripten":
     assert hasattr(settings, "debug"), "settings.debug not found"
 else:
     settings = Dynaconf(settings_files=["settings.toml", ".secrets.toml"], environments=True)
+
+
+@cache
+def frozen_settings() -> FrozenSettings:
+    """Returns the settings snapshot. It is built on the first call, later calls return the same object."""
+    return FrozenSettings.from_mapping(settings.as_dict() if isinstance(settings, Dynaconf) else settings)
+
+
+def reload_settings() -> FrozenSettings:
+    """Re-reads the settings sources (if there are any) and rebuilds the snapshot."""
+    if isinstance(settings, Dynaconf):
+        settings.reload()
+    frozen_settings.cache_clear()
+    return frozen_settings()
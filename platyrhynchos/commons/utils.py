@@ -2,16 +2,16 @@
 This library contains all functions and classes that do not implement the logic of the program.
 Rather they are technical tools
 """
+from contextlib import contextmanager
+from contextvars import ContextVar
 from os import makedirs
 from os.path import join as join_path
 from random import Random
-from typing import Literal
+from typing import Any, Iterator, Literal
 
 from platformdirs import PlatformDirs as _PlatformDirs
 
-from .settings import settings
-
-DEBUG = settings.debug
+from .settings import frozen_settings
 
 _APP_DIRS = _PlatformDirs(appname="platyrhynchos")
 
@@ -41,10 +41,37 @@ def app_dir(
     ],
     file_name: str = "",
 ):
-    path = f"./tmp/{name}/" if DEBUG else getattr(_APP_DIRS, name)
+    """
+    Returns a path in one of the application directories, creating the directory if needed.
+    Settings are read on call, so importing this module doesn't load them.
+    """
+    path = f"./tmp/{name}/" if frozen_settings().debug else getattr(_APP_DIRS, name)
     if isinstance(path, str):
         makedirs(path, exist_ok=True)
     return join_path(path, file_name)
 
 
-random = Random("jebać falubaz")
+_RANDOM: ContextVar[Random] = ContextVar("random", default=Random("jebać falubaz"))
+
+
+class _ContextRandom:
+    """Draws from the random number generator of the current context, the shared one unless `seeded_random` is used"""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_RANDOM.get(), name)
+
+
+random = _ContextRandom()
+
+
+@contextmanager
+def seeded_random(seed: int) -> Iterator[Random]:
+    """
+    Makes `random` draw from a new generator with the given seed within the current context, e.g. an asyncio task
+    or a thread, so concurrent runs are reproducible and the shared generator is left alone.
+    """
+    token = _RANDOM.set(Random(seed))
+    try:
+        yield _RANDOM.get()
+    finally:
+        _RANDOM.reset(token)
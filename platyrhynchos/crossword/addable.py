@@ -2,19 +2,88 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cache, cached_property
+from heapq import heapify, heappop
 from json import load
-from random import random, sample, shuffle
-from typing import Callable, Iterable, Optional, TypeVar
+from random import choice, choices, random, randrange, shuffle
+from typing import Callable, Container, Iterable, Iterator, Mapping, Optional, TypeVar
 
 from ..commons.misc import Coord
 from .base import Crossword
 
 CrosswordAddableT = TypeVar("CrosswordAddableT", bound="CrosswordAddable")
 
-with open("words.json", "r", encoding="utf8") as f:
-    WORDS = load(f)
-
-WORDS_ITEMS = set(WORDS.items())
+WORDS_FILE = "words.json"
+
+
+class WordIndex:
+    """
+    Hint/word pairs grouped by the letters they contain.
+    Words are referenced by their position in `items`, so the groups are plain lists of integers.
+    """
+
+    # Sampling gives up after this many draws per requested word
+    MAX_ATTEMPTS = 20
+
+    def __init__(self, items: Iterable[tuple[str, str]]) -> None:
+        self.items: list[tuple[str, str]] = list(items)
+        self.by_letter: dict[str, list[int]] = {}
+        for n, (_, word) in enumerate(self.items):
+            for letter in set(word):
+                self.by_letter.setdefault(letter, []).append(n)
+
+    @classmethod
+    def load(cls, path: str = WORDS_FILE) -> WordIndex:
+        """Builds the index from a JSON file mapping hints to words"""
+        with open(path, "r", encoding="utf8") as f:
+            return cls(load(f).items())
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _draw(self, ids: Iterable[int], k: int, exclude: Container[str]) -> list[tuple[str, str]]:
+        chosen: dict[int, None] = {}
+        for n in ids:
+            if n not in chosen and self.items[n][1] not in exclude:
+                chosen[n] = None
+                if len(chosen) == k:
+                    break
+        return [self.items[n] for n in chosen]
+
+    def sample(self, k: int, exclude: Container[str] = ()) -> list[tuple[str, str]]:
+        """
+        Draws up to `k` distinct random hint/word pairs.
+        Excluded words are rejected while drawing, so no copy of the dictionary is made.
+        """
+        size = len(self.items)
+        if size == 0:
+            return []
+        return self._draw((randrange(size) for _ in range(k * self.MAX_ATTEMPTS)), k, exclude)
+
+    def sample_crossing(
+        self, letter_weights: Mapping[str, int], k: int, exclude: Container[str] = ()
+    ) -> list[tuple[str, str]]:
+        """
+        Draws up to `k` distinct hint/word pairs sharing a letter with a crossword.
+
+        Arguments:
+            letter_weights -- letters of the crossword with the amount of places they can be crossed at
+            k -- amount of words
+
+        Keyword Arguments:
+            exclude -- words that can't be drawn (default: {()})
+        """
+        letters = [letter for letter in letter_weights if letter in self.by_letter]
+        if not letters:
+            return self.sample(k, exclude)
+        drawn = choices(letters, [letter_weights[letter] for letter in letters], k=k * self.MAX_ATTEMPTS)
+        return self._draw((choice(self.by_letter[letter]) for letter in drawn), k, exclude)
+
+
+@cache
+def word_index() -> WordIndex:
+    """Returns the index of `WORDS_FILE`. It's loaded on the first call."""
+    return WordIndex.load(WORDS_FILE)
 
 
 @dataclass(init=True, repr=True)
@@ -50,13 +119,15 @@ class CrosswordAddable(Crossword):
 
     @staticmethod
     def create(am: int, add: bool = False) -> Iterable[CrosswordAddable]:
-        ch = sample(WORDS_ITEMS, k=am)
+        ch = word_index().sample(am)
         for hint, word in ch:
             # print(word, "<-", hint, "\n")
             yield CrosswordAddable.construct(add * "+" + word + " ", hint)
 
     def createFor(self, word_amount: int, add: bool = False) -> Iterable[CrosswordAddable]:
-        ch = sample(WORDS_ITEMS - self.words.keys(), k=word_amount)
+        """Creates crosswords of words that aren't in this one yet and share at least one letter with it"""
+        weights = {letter: len(coords) for letter, coords in self.letter_index.items()}
+        ch = word_index().sample_crossing(weights, word_amount, self.plain_words)
         for hint, word in ch:
             # print(word, "<-", hint, "\n")
             yield CrosswordAddable.construct(add * "+" + word + " ", hint)
@@ -95,6 +166,19 @@ class CrosswordAddable(Crossword):
 
     # Getters
 
+    @cached_property
+    def letter_index(self) -> dict[str, list[Coord]]:
+        """Maps every letter to the coordinates it's found at"""
+        index: dict[str, list[Coord]] = {}
+        for coord, letter in self.letters.items():
+            index.setdefault(letter, []).append(coord)
+        return index
+
+    @cached_property
+    def plain_words(self) -> frozenset[str]:
+        """Words without the "+" clue field and the trailing space added by `create`"""
+        return frozenset(word.strip("+ ") for word in self.words)
+
     def getIntersecting(self, word: str) -> set[str]:
         coords = self.words[word] & self.crossings
         return {w for w, c in self.words.items() if w != word and any(coords & c)}
@@ -126,31 +210,41 @@ class CrosswordAddable(Crossword):
     def combine(self, other: CrosswordAddable, T: float = 0) -> Optional[CrosswordAddable]:
         if self.words.keys() & other.words.keys():
             return None
+        pairs: Iterable[tuple[Coord, Coord]] = self._check_crossings(other)
         if random() > T:
-            found = sorted(
-                self._check_crossings(other),
-                key=lambda x: self._calc_size_change(x[0], x[1], other.max),
-            )
-        else:
-            found = self._check_crossings(other)
-        for p1, p2 in found:
-            # TODO: fix
+            # Pairs are popped from a heap, so only the ones checked before the first match get ordered
+            max_other = other.max
+            heap = [(self._calc_size_change(p1, p2, max_other), n, p1, p2) for n, (p1, p2) in enumerate(pairs)]
+            heapify(heap)
+            pairs = (heappop(heap)[2:] for _ in range(len(heap)))
+        for p1, p2 in pairs:
+            overlap = self._overlap(other, p1, p2)
+            if overlap is None:
+                continue
             c1 = self.relative(p1)
             c2 = other.relative(p2)
-            if all(c1.letters[i] == c2.letters[i] for i in c1.letters.keys() & c2.letters.keys()):
-                csum = CrosswordAddable(
-                    letters=c1.letters | c2.letters,
-                    words_horizontal=c1.words_horizontal | c2.words_horizontal,
-                    clues_vertical=c1.clues_vertical | c2.clues_vertical,
-                    words_vertical=c1.words_vertical | c2.words_vertical,
-                    clues_horizontal=c1.clues_horizontal | c2.clues_horizontal,
-                    crossings={i for i in c1.letters.keys() & c2.letters.keys() if c1.letters[i] == c2.letters[i]}
-                    | c1.crossings
-                    | c2.crossings,
-                )
-                return csum.absolute()
-
-    # TODO: add clues to the rotate function
+            csum = CrosswordAddable(
+                letters=c1.letters | c2.letters,
+                words_horizontal=c1.words_horizontal | c2.words_horizontal,
+                clues_vertical=c1.clues_vertical | c2.clues_vertical,
+                words_vertical=c1.words_vertical | c2.words_vertical,
+                clues_horizontal=c1.clues_horizontal | c2.clues_horizontal,
+                crossings={Coord((v - p1[0], h - p1[1])) for v, h in overlap} | c1.crossings | c2.crossings,
+            )
+            return csum.absolute()
+
+    def relative(self, rel_to: Coord) -> CrosswordAddable:
+        delta_v, delta_h = rel_to
+        moved = super().relative(rel_to)
+        moved.clues_horizontal = {Coord((v - delta_v, h - delta_h)): i for (v, h), i in self.clues_horizontal.items()}
+        moved.clues_vertical = {Coord((v - delta_v, h - delta_h)): i for (v, h), i in self.clues_vertical.items()}
+        return moved
+
+    def rotate(self) -> CrosswordAddable:
+        rotated = super().rotate()
+        rotated.clues_horizontal = {Coord((h, v)): i for (v, h), i in self.clues_vertical.items()}
+        rotated.clues_vertical = {Coord((h, v)): i for (v, h), i in self.clues_horizontal.items()}
+        return rotated
 
     def remove(self, word: str) -> Optional[CrosswordAddable]:
         letter_coords = self.words.get(word, None)
@@ -177,18 +271,37 @@ class CrosswordAddable(Crossword):
     # Other
 
     def _get_crossable(self, letter: str) -> Iterable[Coord]:
-        for (v, h), l in self.letters.items():
-            if l != letter:
+        return self.letter_index.get(letter, [])
+
+    def _check_crossings(self, other: CrosswordAddable) -> Iterator[tuple[Coord, Coord]]:
+        """Yields pairs of coordinates (in `self` and in `other`) holding the same letter, using the letter indexes"""
+        other_index = other.letter_index
+        for letter, coords in self.letter_index.items():
+            for p2 in other_index.get(letter, ()):
+                for p1 in coords:
+                    if self._code_verify(p1, p2):
+                        yield p1, p2
+
+    def _overlap(self, other: CrosswordAddable, p1: Coord, p2: Coord) -> Optional[set[Coord]]:
+        """
+        Checks whether `other` can be placed with its `p2` on `p1` of this crossword.
+        Only the coordinate offset is used, shifted crosswords aren't built.
+
+        Returns:
+            Overlapping coordinates (relative to this crossword) or None if any overlapping letters differ
+        """
+        delta_v, delta_h = p1[0] - p2[0], p1[1] - p2[1]
+        letters = self.letters
+        overlap = set()
+        for (v, h), letter in other.letters.items():
+            coord = Coord((v + delta_v, h + delta_h))
+            found = letters.get(coord)
+            if found is None:
                 continue
-            yield Coord((v, h))
-
-    def _check_crossings(self, other: Crossword):
-        possible_letters = set(self.letters.values()) & set(other.letters.values())
-        for i in possible_letters:
-            for v1, h1, code1 in self._get_crossable(i):
-                for v2, h2, code2 in other._get_crossable(i):
-                    if self._code_verify(code1, code2):
-                        yield (v1, h1), (v2, h2)
+            if found != letter:
+                return None
+            overlap.add(coord)
+        return overlap
 
 
 def main():
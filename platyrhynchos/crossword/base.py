@@ -3,7 +3,7 @@ from dataclasses import dataclass, field
 from functools import cached_property
 from typing import TypeVar
 
-from ..commons.misc import Coord
+from ..commons.misc import Coord, coord
 
 CrosswordT = TypeVar("CrosswordT", bound="Crossword")
 
@@ -40,14 +40,14 @@ class Crossword:
     def relative(self: CrosswordT, rel_to: Coord) -> CrosswordT:
         delta_v, delta_h = rel_to
         return self.__class__(
-            letters={Coord((v - delta_v, h - delta_h)): i for (v, h), i in self.letters.items()},
+            letters={coord(v - delta_v, h - delta_h): i for (v, h), i in self.letters.items()},
             words_vertical={
-                word: {Coord((v - delta_v, h - delta_h)) for (v, h) in i} for word, i in self.words_vertical.items()
+                word: {coord(v - delta_v, h - delta_h) for (v, h) in i} for word, i in self.words_vertical.items()
             },
             words_horizontal={
-                word: {Coord((v - delta_v, h - delta_h)) for (v, h) in i} for word, i in self.words_horizontal.items()
+                word: {coord(v - delta_v, h - delta_h) for (v, h) in i} for word, i in self.words_horizontal.items()
             },
-            crossings={Coord((v - delta_v, h - delta_h)) for (v, h) in self.crossings},
+            crossings={coord(v - delta_v, h - delta_h) for (v, h) in self.crossings},
         )
 
     def absolute(self):
@@ -57,8 +57,8 @@ class Crossword:
 
     def rotate(self: CrosswordT) -> CrosswordT:
         return self.__class__(
-            letters={Coord((j, i)): letter for (i, j), letter in self.letters.items()},
-            words_horizontal={word: {Coord((h, v)) for (v, h) in i} for word, i in self.words_vertical.items()},
-            words_vertical={word: {Coord((h, v)) for (v, h) in i} for word, i in self.words_horizontal.items()},
-            crossings={Coord((j, i)) for (i, j) in self.crossings},
+            letters={coord(j, i): letter for (i, j), letter in self.letters.items()},
+            words_horizontal={word: {coord(h, v) for (v, h) in i} for word, i in self.words_vertical.items()},
+            words_vertical={word: {coord(h, v) for (v, h) in i} for word, i in self.words_horizontal.items()},
+            crossings={coord(j, i) for (i, j) in self.crossings},
         )
@@ -6,27 +6,29 @@ from dataclasses import dataclass
 from typing import Iterator
 
 from ..commons.exceptions import PartNotFoundException
-from ..commons.logger import logger
-from ..commons.misc import Coord
+from ..commons.logger import debug_enabled, logger
+from ..commons.misc import Coord, coord, line_coords
 from .base import Crossword
 
 
-@dataclass(init=True, repr=True)
+@dataclass(init=True, repr=True, slots=True)
 class ColRow:
-    """A reference to the given crossword column or row, compatible with CrosswordImprovable"""
+    """
+    A reference to the given crossword column or row, compatible with CrosswordImprovable.
+    It holds no state of its own, so `CrosswordImprovable` keeps one per column and row.
+    """
 
     crossword: Crossword
     is_column: bool
     dim_num: int
 
-    def get_coords(self) -> list[Coord]:
-        """Returns `Coord` object in the given ColRow"""
+    def get_coords(self) -> tuple[Coord, ...]:
+        """Returns the interned `Coord` objects of the given ColRow"""
+        crossword = self.crossword
+        # Only crosswords without a fixed size compute it from their letters
         if self.is_column:
-            max_v = getattr(self.crossword, "max_v", self.crossword.max[1])
-            return [Coord((self.dim_num, i)) for i in range(max_v)]
-        else:
-            max_h = getattr(self.crossword, "max_h", self.crossword.max[0])
-            return [Coord((i, self.dim_num)) for i in range(max_h)]
+            return line_coords(True, self.dim_num, crossword.max_v if hasattr(crossword, "max_v") else crossword.max[1])
+        return line_coords(False, self.dim_num, crossword.max_h if hasattr(crossword, "max_h") else crossword.max[0])
 
     def get(self) -> list[str | None]:
         """Returns list of letters in the given ColRow, Nones are inserted where no letter was found"""
@@ -105,11 +107,13 @@ class ColRow:
     def yield_regexes(self) -> Iterator[str]:
         """Finds chunks of letters that can be used as queries and transforms them into regex"""
         found = set()
+        debug = debug_enabled()
         for i in self.subparts():
             regex = self._regex_of_part(i)
             if regex not in found:
                 found.add(regex)
-                logger.debug("Found regex for {}: {}", self, regex)
+                if debug:
+                    logger.debug("Found regex for {}: {}", self, regex)
                 yield regex
 
     @staticmethod
@@ -171,6 +175,33 @@ class ColRow:
         else:
             return found
 
+    def perpendicular_runs(self, word: str) -> Iterator[str]:
+        """
+        Yields the runs of letters across the ColRow that inserting the word would make through its new letters,
+        e.g. a new letter next to the end of a crossing word extends it. Single letters aren't runs.
+
+        Raises:
+            PartNotFoundException: the word doesn't fit the ColRow
+        """
+        step_h, step_v = (1, 0) if self.is_column else (0, 1)
+        coords = self.get_coords()
+        for place, letter in enumerate(word, self.pos_of_word(word)):
+            if coords[place] in self.crossword.letters:
+                continue
+            before = self._letters_from(coords[place], -step_h, -step_v)
+            after = self._letters_from(coords[place], step_h, step_v)
+            if before or after:
+                yield "".join(reversed(before)) + letter + "".join(after)
+
+    def _letters_from(self, start: Coord, step_h: int, step_v: int) -> list[str]:
+        """Returns the letters next to `start` in the given direction, up to the first empty field"""
+        found = []
+        h, v = start[0] + step_h, start[1] + step_v
+        while (letter := self.crossword.letters.get(coord(h, v))) is not None:
+            found.append(letter)
+            h, v = h + step_h, v + step_v
+        return found
+
     def cross_words(self) -> Iterator[tuple[str, set[Coord]]]:
         """Yields words that colide with ColRow with their coordinate sets"""
         column, row = (self.dim_num, None) if self.is_column else (None, self.dim_num)
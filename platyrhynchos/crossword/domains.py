@@ -0,0 +1,126 @@
+"""
+Letter domains: masks of the letters a field can still get.
+
+Bits 0-25 stand for the letters A-Z (A is the lowest bit, like in `Alphabit.to_int`), bit 26 for any other character
+(spaces and hyphens of phrases). `LetterMasks` holds the letters found at every position of the dictionary's words
+of every length. A word can only be placed where every field's domain shares a letter with the mask of its position,
+so fields, ColRows and regexes that no word can fill are found without querying the dictionary.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Optional, Sequence
+
+from ..commons.cache import QueryCache
+from ..commons.misc import pattern_tokens
+
+OTHER_BIT = 1 << 26
+LETTERS_DOMAIN = OTHER_BIT - 1
+FULL_DOMAIN = LETTERS_DOMAIN | OTHER_BIT
+
+
+def letter_bit(letter: str) -> int:
+    """Returns the domain bit of a letter"""
+    return 1 << (ord(letter) - 65) if "A" <= letter <= "Z" else OTHER_BIT
+
+
+def domain_letters(domain: int) -> str:
+    """Returns the letters of a domain, `_` stands for other characters"""
+    return "".join(chr(65 + i) for i in range(26) if domain >> i & 1) + ("_" if domain & OTHER_BIT else "")
+
+
+def parse_pattern(regex: str) -> Optional[tuple[int, list[int], int]]:
+    """
+    Splits a regex made by `ColRow` into the optional fields before the letters, the domains of the fields from
+    the first to the last letter and the optional fields after them, e.g. `^.{0,2}A.{1}B$` gives `(2, [A, *, B], 0)`.
+
+    Returns:
+        the parts or None if the regex has any other syntax
+    """
+    if (tokens := pattern_tokens(regex)) is None:
+        return None
+    before, core, after = 0, [], None
+    for token in tokens:
+        # Nothing can follow the optional fields after the letters
+        if after is not None:
+            return None
+        if isinstance(token, str):
+            core.append(letter_bit(token))
+        elif token[0] == token[1]:
+            core.extend([FULL_DOMAIN] * token[0])
+        elif token[0] != 0:
+            return None
+        elif core:
+            after = token[1]
+        else:
+            before = token[1]
+    return before, core, after or 0
+
+
+class LetterMasks:
+    """Letters found at every position of the dictionary's words, by word length"""
+
+    def __init__(self, masks: Mapping[int, Sequence[int]], cache_size: int = 4096) -> None:
+        """
+        Arguments:
+            masks -- word lengths mapped to the domain of every position
+
+        Keyword Arguments:
+            cache_size -- amount of regexes whose allowed letters are kept (default: {4096})
+        """
+        self.masks = {length: tuple(found) for length, found in masks.items() if length > 1}
+        self._regexes: QueryCache[int] = QueryCache(cache_size)
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> LetterMasks:
+        masks: dict[int, list[int]] = {}
+        for word in words:
+            found = masks.setdefault(len(word), [0] * len(word))
+            for position, letter in enumerate(word):
+                found[position] |= letter_bit(letter)
+        return cls(masks)
+
+    def placements(self, fields: Sequence[int], first: Optional[int] = None, last: Optional[int] = None) -> list[int]:
+        """
+        Finds every placement of a word on consecutive fields that fits their domains.
+
+        Arguments:
+            fields -- domains of the fields
+
+        Keyword Arguments:
+            first -- the placements have to start at this field or before it (default: {any field})
+            last -- the placements have to end at this field or after it (default: {any field})
+
+        Returns:
+            letters the placements can put on every field, all 0 if nothing fits
+        """
+        found = [0] * len(fields)
+        first = len(fields) - 1 if first is None else first
+        last = 0 if last is None else last
+        for length, masks in self.masks.items():
+            for start in range(max(0, last - length + 1), min(first, len(fields) - length) + 1):
+                placed = [field & mask for field, mask in zip(fields[start : start + length], masks)]
+                if all(placed):
+                    for position, letters in enumerate(placed, start):
+                        found[position] |= letters
+        return found
+
+    def allowed(self, regex: str) -> int:
+        """
+        Letters the words matching a regex made by `ColRow` can have, computed once per regex.
+
+        Returns:
+            domain of the letters, 0 if no word can match
+        """
+        if (cached := self._regexes.get(regex)) is not None:
+            return cached
+        parts = parse_pattern(regex)
+        if parts is None:
+            return FULL_DOMAIN
+        before, core, after = parts
+        fields = [FULL_DOMAIN] * before + core + [FULL_DOMAIN] * after
+        allowed = 0
+        bounds = (before, before + len(core) - 1) if core else (None, None)
+        for letters in self.placements(fields, *bounds):
+            allowed |= letters
+        self._regexes.put(regex, allowed)
+        return allowed
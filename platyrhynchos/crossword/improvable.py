@@ -1,16 +1,52 @@
 """Implements the improvable crossword class"""
 from __future__ import annotations
 
-from typing import Callable, Iterator, NoReturn, Optional
+from collections import Counter
+from struct import Struct
+from struct import error as StructError
+from typing import Callable, Iterator, NamedTuple, NoReturn, Optional, Sequence
 
-from ..commons.exceptions import TooLargeException, UninsertableException
-from ..commons.misc import ColRowId, Coord, IsColumn, ProxiedDict
+from ..commons.exceptions import CrosswordException, FormatException, TooLargeException, UninsertableException
+from ..commons.misc import ColRowId, Coord, IsColumn, ProxiedDict, coord, line_coords
 from .base import Crossword
 from .colrow import ColRow
+from .domains import FULL_DOMAIN, LetterMasks, letter_bit
 from .exolve_template import EXOLVE_TEMPLATE, Template, char_for_grid
 
 EXOLVE_TEMPLATE: Template
 
+# Binary format, see `CrosswordImprovable.to_bytes`
+_MAGIC = b"PCW1"
+_HEADER = Struct("<4sHHiiHHH")
+_WORD = Struct("<HHBH")
+_EMPTY_FIELD = "\0"
+
+
+def _crossings_of(*directions: dict[str, set[Coord]]) -> set[Coord]:
+    """Finds the fields shared by several words"""
+    shared = Counter(field for words in directions for coords in words.values() for field in coords)
+    return {field for field, amount in shared.items() if amount > 1}
+
+
+def _letter_runs(filled: Sequence[bool]) -> Iterator[tuple[int, int]]:
+    """Yields the first and last field of every run of consecutive filled fields"""
+    start = None
+    for position, is_filled in enumerate([*filled, False]):
+        if is_filled and start is None:
+            start = position
+        elif not is_filled and start is not None:
+            yield start, position - 1
+            start = None
+
+
+class _JournalEntry(NamedTuple):
+    """Changes made by a single `CrosswordImprovable.add`, used to undo it"""
+
+    word: str
+    is_column: bool
+    letters: tuple[Coord, ...]
+    crossings: tuple[Coord, ...]
+
 
 class CrosswordImprovable(Crossword):
     """Crossword subclass used to implement the "smart" insertion algorithm."""
@@ -27,10 +63,10 @@ class CrosswordImprovable(Crossword):
         """
         max_v = max_v or max_h
         return CrosswordImprovable(
-            letters={Coord((i, 0)): j for i, j in enumerate(word)},
+            letters={coord(i, 0): j for i, j in enumerate(word)},
             max_h=max_h,
             max_v=max_v,
-            words_horizontal={word: {Coord((0, i)) for i in range(len(word))}},
+            words_horizontal={word: set(line_coords(False, 0, len(word)))},
         )
 
     def check_size(self, horizontal: int, vertical: int) -> NoReturn | None:
@@ -71,6 +107,9 @@ class CrosswordImprovable(Crossword):
         """
         self.max_h = max_h
         self.max_v = max_v
+        self._journal: list[_JournalEntry] = []
+        self._line_domains: dict[tuple[bool, int], list[int]] = {}
+        self._colrows: dict[tuple[bool, int], ColRow] = {}
         words_vertical = words_vertical or {}
         crossings = crossings or set()
         super().__init__(
@@ -80,13 +119,66 @@ class CrosswordImprovable(Crossword):
             crossings,
         )
 
+    def grid_buffer(self, empty_field: str = ":", coder: Callable[[str], str] = lambda x: x) -> list[str]:
+        """
+        Returns the coded fields of the grid as one row-major list of `max_h * max_v` fields.
+        Letters outside of the grid are skipped.
+        """
+        empty = coder(empty_field)
+        buffer = [empty] * (self.max_h * self.max_v)
+        for (h, v), letter in self.letters.items():
+            if 0 <= h < self.max_h and 0 <= v < self.max_v:
+                buffer[v * self.max_h + h] = coder(letter)
+        return buffer
+
+    def grid_rows(self, empty_field: str = ":", coder: Callable[[str], str] = lambda x: x) -> Iterator[str]:
+        """Yields the rows of the grid, sliced from `grid_buffer`"""
+        buffer = self.grid_buffer(empty_field, coder)
+        for start in range(0, len(buffer), self.max_h):
+            yield "".join(buffer[start : start + self.max_h])
+
+    def line_domains(self, is_column: bool, nth: int, letter_masks: LetterMasks) -> list[int]:
+        """
+        Returns the letters the words placed in a row or column can put on each of its fields (see `domains.py`).
+        A field with a letter allows only that letter, an empty one allows any. Only placements covering a whole run
+        of letters count, as those are the words that can be added, so all are 0 if no such word fits.
+        Results are kept until a letter of the row or column changes, so they're meant for a single `letter_masks`.
+
+        Arguments:
+            is_column -- whether it's a column
+            nth -- index of the column or row
+            letter_masks -- letters of the dictionary's words by length and position
+        """
+        if (found := self._line_domains.get((is_column, nth))) is None:
+            coords = line_coords(is_column, nth, self.max_v if is_column else self.max_h)
+            fields = [letter_bit(self.letters[field]) if field in self.letters else FULL_DOMAIN for field in coords]
+            found = [0] * len(fields)
+            for first, last in _letter_runs([field in self.letters for field in coords]):
+                found = [i | j for i, j in zip(found, letter_masks.placements(fields, first, last))]
+            self._line_domains[(is_column, nth)] = found
+        return found
+
+    def domain(self, coord: Coord, letter_masks: LetterMasks) -> int:
+        """
+        Returns the letters a field can get: its letter, or the letters words placed in its row or column
+        can put on it. An empty domain means no word can cross the field anymore.
+        """
+        if coord in self.letters:
+            return letter_bit(self.letters[coord])
+        h, v = coord
+        row = self.line_domains(False, v, letter_masks)
+        column = self.line_domains(True, h, letter_masks)
+        return (row[h] if h < len(row) else 0) | (column[v] if v < len(column) else 0)
+
+    def _letter_changed(self, coord: Coord):
+        """Forgets the domains of the row and column of a field"""
+        self._line_domains.pop((False, coord[1]), None)
+        self._line_domains.pop((True, coord[0]), None)
+
     def as_exolve_grid(self, empty_field: str = ":", sep: str = "\n", coder: Callable[[str], str] = lambda x: x) -> str:
         """Returns a grid representation of the crossword"""
 
-        return sep.join(
-            "".join((coder(self.letters.get(Coord((h, v)), empty_field)) for h in range(self.max_h)))
-            for v in range(self.max_v)
-        )
+        return sep.join(self.grid_rows(empty_field, coder))
 
     def as_exolve(self) -> str:
         """
@@ -106,14 +198,134 @@ class CrosswordImprovable(Crossword):
         # max_size = self.max_h, self.max_v
         return self.as_exolve_grid()  # + f"\n[{size=} {max_size=}]"
 
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the crossword to a compact binary format:
+
+        - header: magic, `max_h`, `max_v`, origin of the grid, its width and height, number of words
+        - word table: start relative to the origin, direction (1 for columns) and length of every word
+        - grid: UTF-8 letters of the fields in row-major order, empty fields are NUL
+
+        Words are read back from the grid and crossings are the fields shared by words. The journal isn't kept.
+        """
+        if self.letters:
+            min_h, min_v = (min(axis) for axis in zip(*self.letters))
+            max_h, max_v = (max(axis) for axis in zip(*self.letters))
+        else:
+            min_h = min_v = max_h = max_v = 0
+        origin_h, origin_v = min(min_h, 0), min(min_v, 0)
+        width = max(max_h + 1, self.max_h) - origin_h
+        height = max(max_v + 1, self.max_v) - origin_v
+
+        grid = [_EMPTY_FIELD] * (width * height)
+        for (h, v), letter in self.letters.items():
+            grid[(v - origin_v) * width + h - origin_h] = letter
+        words = [
+            _WORD.pack(
+                min(h for h, _ in coords) - origin_h, min(v for _, v in coords) - origin_v, is_column, len(coords)
+            )
+            for is_column, direction in ((False, self.words_horizontal), (True, self.words_vertical))
+            for coords in direction.values()
+        ]
+        header = _HEADER.pack(_MAGIC, self.max_h, self.max_v, origin_h, origin_v, width, height, len(words))
+        return b"".join((header, *words, "".join(grid).encode("utf8")))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CrosswordImprovable:
+        """
+        Reads a crossword serialized by `to_bytes`.
+
+        Raises:
+            FormatException: the data isn't a serialized crossword
+        """
+        try:
+            magic, max_h, max_v, origin_h, origin_v, width, height, word_amount = _HEADER.unpack_from(data)
+            table_end = _HEADER.size + word_amount * _WORD.size
+            table = _WORD.iter_unpack(data[_HEADER.size : table_end])
+            grid = data[table_end:].decode("utf8")
+        except (StructError, UnicodeDecodeError) as exception:
+            raise FormatException(f"Invalid serialized crossword: {exception}") from exception
+        if magic != _MAGIC or len(grid) != width * height:
+            raise FormatException("Invalid serialized crossword: wrong header")
+
+        letters = {
+            coord(origin_h + n % width, origin_v + n // width): letter
+            for n, letter in enumerate(grid)
+            if letter != _EMPTY_FIELD
+        }
+        words_horizontal: dict[str, set[Coord]] = {}
+        words_vertical: dict[str, set[Coord]] = {}
+        for start_h, start_v, is_column, length in table:
+            start = start_v * width + start_h
+            h, v = origin_h + start_h, origin_v + start_v
+            if is_column:
+                words_vertical[grid[start : start + length * width : width]] = {coord(h, v + n) for n in range(length)}
+            else:
+                words_horizontal[grid[start : start + length]] = {coord(h + n, v) for n in range(length)}
+        crossings = _crossings_of(words_horizontal, words_vertical)
+        return cls(letters, max_h, max_v, words_horizontal, words_vertical, crossings)
+
+    def merge(self, other: CrosswordImprovable, origin: Coord = Coord((0, 0))) -> list[str]:
+        """
+        Adds the words of another crossword, with its (0, 0) field put at `origin`. Works in place,
+        every merged word is recorded like an added one, so it can be reverted with `undo`.
+        Words the crossword already has, words outside of it and words clashing with its letters are skipped.
+
+        Arguments:
+            other -- crossword with the words to add
+            origin -- field of this crossword where the other one starts
+
+        Returns:
+            merged words
+        """
+        origin_h, origin_v = origin
+        merged = []
+        for is_column, words in ((False, other.words_horizontal), (True, other.words_vertical)):
+            for word, coords in words.items():
+                placed = [coord(h + origin_h, v + origin_v) for h, v in sorted(coords)]
+                if (
+                    word in self.words_horizontal
+                    or word in self.words_vertical
+                    or any(not (0 <= h < self.max_h and 0 <= v < self.max_v) for h, v in placed)
+                    or any(self.letters.get(field, letter) != letter for field, letter in zip(placed, word))
+                ):
+                    continue
+                self._place(word, is_column, placed)
+                merged.append(word)
+        return merged
+
+    def __reduce__(self):
+        # The letters are a ProxiedDict, whose size check is a closure, so it's rebuilt from the binary format
+        return (CrosswordImprovable.from_bytes, (self.to_bytes(),))
+
+    def copy(self) -> CrosswordImprovable:
+        """
+        Returns a copy of the crossword. Only the mappings are copied, the coordinate sets of words are shared,
+        as they're never modified after `add`. The journal is copied too, so both crosswords can `undo`.
+        """
+        new = CrosswordImprovable(
+            self.letters,
+            self.max_h,
+            self.max_v,
+            dict(self.words_horizontal),
+            dict(self.words_vertical),
+            set(self.crossings),
+        )
+        new._journal = self._journal.copy()
+        new._line_domains = self._line_domains.copy()
+        return new
+
     def rotate(self):
-        """Rotates the crossword, works in place."""
-        self.letters = {Coord((j, i)): letter for (i, j), letter in self.letters.items()}
+        """Rotates the crossword, works in place. Previous additions can't be undone afterwards."""
+        self._journal.clear()
+        self._line_domains.clear()
+        self._colrows.clear()
+        self.letters = {coord(j, i): letter for (i, j), letter in self.letters.items()}
         self.max_h, self.max_v = self.max_v, self.max_h
-        new_horizontal = {word: {Coord((h, v)) for (v, h) in i} for word, i in self.words_vertical.items()}
-        new_vertical = {word: {Coord((h, v)) for (v, h) in i} for word, i in self.words_horizontal.items()}
+        new_horizontal = {word: {coord(h, v) for (v, h) in i} for word, i in self.words_vertical.items()}
+        new_vertical = {word: {coord(h, v) for (v, h) in i} for word, i in self.words_horizontal.items()}
         self.words_horizontal, self.words_vertical = new_horizontal, new_vertical
-        self.crossings = {Coord((j, i)) for (i, j) in self.crossings}
+        self.crossings = {coord(j, i) for (i, j) in self.crossings}
 
     def colrow(self, is_column: IsColumn, nth: ColRowId) -> ColRow:
         """
@@ -124,51 +336,76 @@ class CrosswordImprovable(Crossword):
             nth -- used to determine which to retrieve (it will take the nth one)
 
         Returns:
-            ColRow object
+            ColRow object, the same one on every call
         """
-        colrow = ColRow(self, is_column, nth)
-        for i, j in colrow.get_coords():
-            self.check_size(i, j)
+        if (colrow := self._colrows.get((is_column, nth))) is None:
+            colrow = ColRow(self, is_column, nth)
+            for i, j in colrow.get_coords():
+                self.check_size(i, j)
+            self._colrows[(is_column, nth)] = colrow
         return colrow
 
     def iter_colrows(self) -> Iterator[ColRow]:
-        """Iterate over all colrows in the crossword."""
-        yield from ColRow.iter(self)
+        """Iterate over all colrows in the crossword, rows first."""
+        yield from (self.colrow(IsColumn(False), ColRowId(i)) for i in range(self.max_v))
+        yield from (self.colrow(IsColumn(True), ColRowId(i)) for i in range(self.max_h))
 
     def add(self, word: str, colrow: ColRow | tuple[IsColumn, ColRowId]):
         """
         Adds a word to the crossword row/column. It requires a possible intersection. Works in place.
+        The change is recorded, so it can be reverted with `undo`. If the word can't be inserted,
+        the crossword is left unchanged.
 
         Arguments:
             word -- word to add
-            part -- sublist used to find this word
-            is_column -- True if n is column ID
-            dim_val -- column/row id
-
+            colrow -- ColRow or a pair of `is_column` and its id
         """
         if not isinstance(colrow, ColRow):
             colrow = self.colrow(colrow[0], colrow[-1])
         start_index = colrow.pos_of_word(word)
+        self._place(word, colrow.is_column, colrow.get_coords()[start_index : start_index + len(word)])
 
-        new_word = {word: set()}
-        old_letters = self.letters.copy()
-        old_crossings = self.crossings.copy()
-
+    def _place(self, word: str, is_column: bool, fields: Sequence[Coord]):
+        """Puts the letters of a word on the fields and records it, see `add`"""
+        coords = set()
+        added_letters: list[Coord] = []
+        added_crossings: list[Coord] = []
         try:
-            for place, letter in enumerate(word, start_index):
-                pos = Coord((colrow.dim_num, place)) if colrow.is_column else Coord((place, colrow.dim_num))
+            for pos, letter in zip(fields, word):
+                if pos not in self.letters:
+                    added_letters.append(pos)
+                elif pos not in self.crossings:
+                    added_crossings.append(pos)
                 self.add_letter(pos, letter)
-
-                new_word[word].add(pos)
-        except UninsertableException as exception:
-            self.letters = old_letters
-            self.crossings = old_crossings
+                coords.add(pos)
+        except CrosswordException as exception:
+            for pos in added_letters:
+                if self.letters.pop(pos, None) is not None:
+                    self._letter_changed(pos)
+            self.crossings.difference_update(added_crossings)
             raise exception
+
+        if is_column:
+            self.words_vertical[word] = coords
         else:
-            if colrow.is_column:
-                self.words_vertical |= new_word
-            else:
-                self.words_horizontal |= new_word
+            self.words_horizontal[word] = coords
+        self._journal.append(_JournalEntry(word, is_column, tuple(added_letters), tuple(added_crossings)))
+
+    def undo(self):
+        """
+        Reverts the last `add`. Works in place.
+
+        Raises:
+            CrosswordException: there is nothing to undo
+        """
+        if not self._journal:
+            raise CrosswordException("Nothing to undo")
+        entry = self._journal.pop()
+        del (self.words_vertical if entry.is_column else self.words_horizontal)[entry.word]
+        for pos in entry.letters:
+            del self.letters[pos]
+            self._letter_changed(pos)
+        self.crossings.difference_update(entry.crossings)
 
     def add_letter(self, coord: Coord, letter: str):
         """
@@ -181,6 +418,7 @@ class CrosswordImprovable(Crossword):
         """
         if coord not in self.letters:
             self.letters[coord] = letter
+            self._letter_changed(coord)
         elif self.letters[coord] == letter:
             self.crossings.add(coord)
         else:
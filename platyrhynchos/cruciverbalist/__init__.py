@@ -1,5 +1,17 @@
-from ..commons.settings import settings
 from .base import CruciverbalistBase
 
-if settings.components["cruciverbalist"] == "en_simple":
-    from .en_simple import EnglishSimpleCruciverbalist as Cruciverbalist
+
+def __getattr__(name: str):
+    """Resolves `Cruciverbalist` on first access, so importing the package doesn't read settings."""
+    if name != "Cruciverbalist":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from ..commons.settings import frozen_settings
+
+    chosen = frozen_settings().components.cruciverbalist
+    if chosen == "en_simple":
+        from .en_simple import EnglishSimpleCruciverbalist as Cruciverbalist
+    else:
+        raise AttributeError(f"Unknown cruciverbalist: {chosen}")
+    globals()[name] = Cruciverbalist
+    return Cruciverbalist
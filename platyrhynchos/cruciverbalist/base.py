@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Iterable, Iterator
+from typing import Container, Iterable, Iterator, Optional
 
+from ..commons.cache import DeadEnds, Prefetcher
+from ..commons.exceptions import PartNotFoundException
 from ..commons.logger import logger
 from ..commons.utils import random
 from ..crossword.colrow import ColRow
@@ -22,6 +24,13 @@ class CruciverbalistBase(ABC):
     async def select_by_regex(self, regexes: list[str], previous: list[str] | None = None) -> list[str]:
         return
 
+    async def select_by_regex_batch(self, regexes: list[list[str]]) -> list[list[str]]:
+        """
+        Runs `select_by_regex` for every list of regexes. Subclasses can override it to batch the lookups.
+        Words aren't excluded, so the results can be shared by crosswords with different words.
+        """
+        return [await self.select_by_regex(i) for i in regexes]
+
     @abstractmethod
     def eval_word(self, word: str, colrow: ColRow) -> int:
         return
@@ -30,31 +39,128 @@ class CruciverbalistBase(ABC):
     async def start_word(self, max_size: int) -> str:
         return
 
+    async def start_words(self, max_size: int, amount: int) -> list[str]:
+        """Draws `amount` start words. Subclasses can override it to draw them with one query."""
+        return [await self.start_word(max_size) for _ in range(amount)]
+
+    async def is_dead(self, colrow: ColRow) -> bool:
+        """Tells whether no word can fit the ColRow, so it isn't queried. Subclasses can override it to prune ColRows."""
+        return False
+
+    async def dictionary(self) -> Optional[Container[str]]:
+        """
+        Words the runs of letters across a placed word have to be, None skips the check.
+        Subclasses can override it to reject placements making runs that aren't words.
+        """
+        return None
+
+    @staticmethod
+    def _valid_runs(word: str, colrow: ColRow, dictionary: Container[str]) -> bool:
+        try:
+            return all(run in dictionary for run in colrow.perpendicular_runs(word))
+        except PartNotFoundException:
+            return False
+
     def _eval_word(self, word: str, colrow: ColRow) -> tuple[str, int]:
         return word, self.eval_word(word, colrow)
 
-    async def find_words(self, colrow: ColRow) -> list[tuple[str, ColRow]]:
-        words = await self.select_by_regex(list(colrow.yield_regexes()), colrow.crossword.words.keys())
+    def prefetch(self, colrows: Iterable[ColRow], prefetcher: Prefetcher[list[str]]):
+        """
+        Starts looking up the words of the ColRows in the background, e.g. of the ones crossed by the last added word.
+        `find_words` uses the results if the ColRows and the words of their crosswords don't change meanwhile.
+        """
+        for colrow in colrows:
+            regexes = list(colrow.yield_regexes())
+            excluded = set(colrow.crossword.words)
+            prefetcher.start(
+                tuple(colrow.get()),
+                excluded,
+                lambda regexes=regexes, excluded=excluded: self.select_by_regex(regexes, excluded),
+            )
+
+    async def find_words(
+        self, colrow: ColRow, prefetcher: Optional[Prefetcher[list[str]]] = None
+    ) -> list[tuple[str, ColRow]]:
+        if await self.is_dead(colrow):
+            return []
+        excluded = colrow.crossword.words.keys()
+        if prefetcher is not None and (prefetched := prefetcher.take(tuple(colrow.get()), excluded)) is not None:
+            words = await prefetched
+        else:
+            words = await self.select_by_regex(list(colrow.yield_regexes()), excluded)
+        if (dictionary := await self.dictionary()) is not None:
+            words = [word for word in words if self._valid_runs(word, colrow, dictionary)]
         # if self.SAMPLE_SIZE is not None and self.SAMPLE_SIZE < len(words):
         #     words = random.sample(words, self.SAMPLE_SIZE)
 
         words_len = [self._eval_word(word, colrow) for word in words if word is not None]
 
         return_words = [(word, colrow) for word, _ in sorted(words_len, key=lambda x: x[1])]
-        logger.debug(f"Found {len(return_words)} words for {colrow}")
+        logger.opt(lazy=True).debug("Found {} words for {}", lambda: len(return_words), lambda: colrow)
         return return_words
 
-    async def find_word(self, colrows: ColRow | Iterable[ColRow]) -> tuple[str | None, ColRow | None]:
+    async def find_words_batch(self, colrows: list[ColRow]) -> list[list[tuple[str, ColRow]]]:
+        """Like `find_words`, but for many ColRows (also of different crosswords) with one batched lookup"""
+        dead = [await self.is_dead(colrow) for colrow in colrows]
+        found = await self.select_by_regex_batch(
+            [[] if is_dead else list(colrow.yield_regexes()) for colrow, is_dead in zip(colrows, dead)]
+        )
+        dictionary = await self.dictionary()
+        results = []
+        for colrow, shared in zip(colrows, found):
+            used = colrow.crossword.words.keys()
+            words = [word for word in shared if word is not None and word not in used]
+            if shared and not words:
+                # The shared results may have been cut before the used words were excluded
+                words = await self.select_by_regex(list(colrow.yield_regexes()), used)
+            if dictionary is not None:
+                words = [word for word in words if self._valid_runs(word, colrow, dictionary)]
+            words_len = [self._eval_word(word, colrow) for word in words]
+            results.append([(word, colrow) for word, _ in sorted(words_len, key=lambda x: x[1])])
+        return results
+
+    async def find_word(
+        self,
+        colrows: ColRow | Iterable[ColRow],
+        dead_ends: Optional[DeadEnds] = None,
+        prefetcher: Optional[Prefetcher[list[str]]] = None,
+    ) -> tuple[str | None, ColRow | None]:
+        """
+        Draws a word for the first ColRow that has any.
+
+        Arguments:
+            colrows -- ColRows in the order they're tried
+
+        Keyword Arguments:
+            dead_ends -- letter patterns without words found in this generation, ColRows with them are skipped
+                and new ones are added. Unused with a `dictionary`, as the runs across the words depend on
+                the neighbouring ColRows too (default: {None})
+            prefetcher -- lookups started by `prefetch` in this generation (default: {None})
+        """
         if isinstance(colrows, ColRow):
             colrows = [colrows]
+        if dead_ends is not None and await self.dictionary() is not None:
+            dead_ends = None
         for colrow in colrows:
-            if words := await self.find_words(colrow):
+            if dead_ends is not None:
+                pattern = tuple(colrow.get())
+                excluded = colrow.crossword.words.keys()
+                if dead_ends.is_dead(pattern, excluded):
+                    continue
+            if words := await self.find_words(colrow, prefetcher):
                 weights = [i + 1 for i in range(len(words))]
                 choice = random.choices(words, weights=weights, k=1)[0]
-                logger.debug(f"Choice: {choice}")
+                logger.debug("Choice: {}", choice)
                 return choice
+            if dead_ends is not None:
+                dead_ends.add(pattern, excluded, len(set(colrow.yield_regexes())))
         return None, None
 
-    async def choose_and_fill(self, crossword: CrosswordImprovable) -> tuple[str | None, ColRow | None]:
+    async def choose_and_fill(
+        self,
+        crossword: CrosswordImprovable,
+        dead_ends: Optional[DeadEnds] = None,
+        prefetcher: Optional[Prefetcher[list[str]]] = None,
+    ) -> tuple[str | None, ColRow | None]:
         colrows = self.choose_colrows(crossword)
-        return await self.find_word(colrows)
+        return await self.find_word(colrows, dead_ends, prefetcher)
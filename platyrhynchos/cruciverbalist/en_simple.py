@@ -1,23 +1,38 @@
-from tempfile import NamedTemporaryFile, _TemporaryFileWrapper
-
-from tqdm_loggable.auto import tqdm
+from typing import Container, Optional
 
 from ..commons.alphabit import Alphabit
+from ..commons.cache import QueryCache
 from ..commons.exceptions import DatabaseException
-from ..commons.logger import logger
-from ..commons.settings import settings
+from ..commons.logger import debug_enabled, logger
+from ..commons.settings import frozen_settings
 from ..commons.utils import random
 from ..crossword.colrow import ColRow
-from ..exclusive import download_db, get_random, get_regex, get_regex_w_alphabit
+from ..crossword.domains import LETTERS_DOMAIN, LetterMasks
+from ..crossword.improvable import CrosswordImprovable
+from ..exclusive import (
+    download_db,
+    get_answer_set,
+    get_letter_masks,
+    get_random,
+    get_random_batch,
+    get_regex_batch,
+)
 from .base import CruciverbalistBase
 
 
 class EnglishSimpleCruciverbalist(CruciverbalistBase):
-    DB_FILE = settings.en_simple.db_file
-    RUN_WITH_ALPHABIT = settings.en_simple["use_alphabit"]
-
     def __init__(self) -> None:
         """Prepares the database"""
+        settings = frozen_settings().en_simple
+        self.DB_FILE = settings.parquet_file if settings.store == "parquet" else settings.db_file
+        self.RUN_WITH_ALPHABIT = settings.use_alphabit
+        self.RANKED = settings.ranked
+        self.TOP_K = settings.top_k
+        self.PRUNE_PATTERNS = settings.prune_patterns
+        self.VALIDATE_RUNS = settings.validate_runs
+        self.letter_masks: Optional[LetterMasks] = None
+        self.answer_set: Optional[frozenset[str]] = None
+        self.query_cache: QueryCache[list[str]] = QueryCache(settings.query_cache_size)
         download_db(self.DB_FILE)
         super().__init__()
 
@@ -28,21 +43,104 @@ class EnglishSimpleCruciverbalist(CruciverbalistBase):
         """
         return -len(list(colrow.cross_words())) * random.random()
 
+    async def _lookup(self, regexes: list[str]) -> dict[str, list[str]]:
+        """
+        Returns the words matching every (uppercase) regex. Results are cached, the missing ones are queried
+        in one batch. No words are excluded in the query, so the results can be shared by all crosswords.
+        """
+        found: dict[str, list[str]] = {}
+        missing = []
+        for regex in dict.fromkeys(regexes):
+            if (cached := self.query_cache.get(regex)) is None:
+                missing.append(regex)
+            else:
+                found[regex] = cached
+        if letter_masks := await self._letter_masks():
+            # Regexes no word can match are answered without a query, the others can't have letters no match can have
+            allowed = {regex: letter_masks.allowed(regex) for regex in missing}
+            for regex in [regex for regex in missing if not allowed[regex]]:
+                self.query_cache.put(regex, [])
+                found[regex] = []
+            missing = [regex for regex in missing if allowed[regex]]
+            forbidden = [LETTERS_DOMAIN & ~allowed[regex] for regex in missing]
+        else:
+            forbidden = [0] * len(missing)
+        if missing:
+            alphabits = [Alphabit(i).to_query() if self.RUN_WITH_ALPHABIT else None for i in missing]
+            batch = await get_regex_batch(
+                list(zip(missing, alphabits, forbidden)), limit=self._limit(), ranked=self.RANKED
+            )
+            for regex, words in zip(missing, batch):
+                self.query_cache.put(regex, words)
+                found[regex] = words
+        return found
+
+    def _limit(self) -> int:
+        """Maximum amount of words looked up for a regex"""
+        return self.TOP_K if self.RANKED else 100
+
+    async def _lookup_excluding(self, regex: str, previous: set[str]) -> list[str]:
+        """Looks up the words matching an (uppercase) regex, excluding the `previous` ones in the query, uncached"""
+        alphabit = Alphabit(regex).to_query() if self.RUN_WITH_ALPHABIT else None
+        (words,) = await get_regex_batch(
+            [(regex, alphabit)], previous=sorted(previous), limit=self._limit(), ranked=self.RANKED
+        )
+        return words
+
+    async def _letter_masks(self) -> Optional[LetterMasks]:
+        """Letters of the dictionary's words by length and position, loaded on first use if `prune_patterns` is set"""
+        if self.PRUNE_PATTERNS and self.letter_masks is None:
+            self.letter_masks = LetterMasks(await get_letter_masks())
+        return self.letter_masks
+
+    async def is_dead(self, colrow: ColRow) -> bool:
+        """Tells whether no word of the dictionary fits the ColRow, judged by the letters of its fields"""
+        letter_masks = await self._letter_masks()
+        if letter_masks is None or not isinstance(colrow.crossword, CrosswordImprovable):
+            return False
+        return not any(colrow.crossword.line_domains(colrow.is_column, colrow.dim_num, letter_masks))
+
+    async def dictionary(self) -> Optional[Container[str]]:
+        """All answers, loaded into memory on first use if `validate_runs` is set"""
+        if self.VALIDATE_RUNS and self.answer_set is None:
+            self.answer_set = await get_answer_set()
+        return self.answer_set
+
     async def select_by_regex(self, regexes: list[str], previous: list[str] | None = None) -> list[str]:
         """
         Select compatible words using regex. It accepts a list of regular expressions and checks all one by one.
         """
+        previous = set(previous or ())
         for i in [i.upper() for i in regexes]:
-            if self.RUN_WITH_ALPHABIT:
-                # Returns an alphabit query
+            if self.RUN_WITH_ALPHABIT and debug_enabled():
                 alp = Alphabit(i)
                 logger.debug("Using alphabit: {}; which corresponds to {}", alp.to_query(), alp.as_letters())
-                if ret := await get_regex_w_alphabit(i, alp.to_query(), previous):
-                    return ret
-            elif ret := await get_regex(i, previous):
+            words = (await self._lookup([i]))[i]
+            if ret := [word for word in words if word not in previous]:
                 return ret
+            if len(words) >= self._limit():
+                # The result was cut by the limit, more words may match once the previous ones are excluded
+                if ret := await self._lookup_excluding(i, previous):
+                    return ret
         return []
 
+    async def select_by_regex_batch(self, regexes: list[list[str]]) -> list[list[str]]:
+        """
+        Batched `select_by_regex`. Every round looks up the next regex of all lists without results so far,
+        sending each distinct regex once, so most lists are resolved by a single query.
+        """
+        upper = [[i.upper() for i in regex_list] for regex_list in regexes]
+        results: list[list[str]] = [[] for _ in upper]
+        pending = list(range(len(upper)))
+        depth = 0
+        while pending := [n for n in pending if depth < len(upper[n])]:
+            found = await self._lookup([upper[n][depth] for n in pending])
+            for n in pending:
+                results[n] = found[upper[n][depth]]
+            pending = [n for n in pending if not results[n]]
+            depth += 1
+        return results
+
     def eval_word(self, word: str, colrow: ColRow) -> int:
         """Evaluate the word as an insertion into a ColRow."""
         return len(word) + len(list(colrow.cross_words()))
@@ -54,3 +152,11 @@ class EnglishSimpleCruciverbalist(CruciverbalistBase):
         if not found_words:
             raise DatabaseException("Couldn't find any words.")
         return found_words[0]
+
+    async def start_words(self, max_size: int, amount: int) -> list[str]:
+        """Draws distinct random start words with one query, favouring longer words that fit in `max_size`."""
+        found_words = await get_random_batch(max_size, amount, random.getrandbits(31))
+        if not found_words:
+            raise DatabaseException("Couldn't find any words.")
+        random.shuffle(found_words)
+        return found_words
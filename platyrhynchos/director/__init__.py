@@ -0,0 +1,36 @@
+"""
+Directors drive the crossword generation. `generate_crossword` runs the one selected by `settings.components.runner`.
+"""
+from importlib import import_module
+from typing import Awaitable, Callable, Optional
+
+from ..crossword import CrosswordImprovable
+
+RUNNERS = {
+    "": "direct_search",
+    "direct": "direct_search",
+    "beam": "beam_search",
+    "multi": "multi_start",
+    "region": "region_search",
+}
+
+
+def get_runner(name: Optional[str] = None) -> Callable[[int, int, int], Awaitable[CrosswordImprovable]]:
+    """
+    Returns `generate_crossword` of a director. Its module is imported on first use.
+
+    Keyword Arguments:
+        name -- runner name, one of `RUNNERS` (default: {`settings.components.runner`})
+    """
+    if name is None:
+        from ..commons.settings import frozen_settings
+
+        name = frozen_settings().components.runner
+    if name not in RUNNERS:
+        raise ValueError(f"Unknown runner: {name!r}, choose one of {sorted(RUNNERS)}")
+    return import_module(f".{RUNNERS[name]}", __name__).generate_crossword
+
+
+async def generate_crossword(width: int, height: int, word_amount: int) -> CrosswordImprovable:
+    """Generate a crossword with the given specifications, using the configured director."""
+    return await get_runner()(width, height, word_amount)
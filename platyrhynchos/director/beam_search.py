@@ -0,0 +1,103 @@
+"""
+Beam search director. It keeps the `width` best partial crosswords and expands all of them every turn.
+
+The lookups of all crosswords are sent as one batch (see `CruciverbalistBase.find_words_batch`). Candidate words
+are scored by adding them to their crossword and undoing it, so only the crosswords entering the beam get copied.
+"""
+from __future__ import annotations
+
+from itertools import islice
+from typing import Optional
+
+from ..commons.exceptions import CrosswordException
+from ..commons.logger import logger
+from ..commons.misc import ColRowId, IsColumn
+from ..commons.settings import frozen_settings
+from ..crossword import CrosswordImprovable
+from ..cruciverbalist import CruciverbalistBase
+from .direct_search import get_cruciverbalist
+
+Candidate = tuple[tuple[int, int], int, str, tuple[IsColumn, ColRowId]]
+
+
+def score(crossword: CrosswordImprovable) -> tuple[int, int]:
+    """Crosswords with more words are better, then the ones with more crossings"""
+    return len(crossword.words), len(crossword.crossings)
+
+
+async def expand(
+    cruciverbalist: CruciverbalistBase, beam: list[CrosswordImprovable], colrows: int, branching: int
+) -> list[Candidate]:
+    """
+    Finds words that can be added to the crosswords of the beam.
+
+    Arguments:
+        cruciverbalist -- used to choose ColRows and words
+        beam -- crosswords to expand
+        colrows -- amount of the best ColRows checked in every crossword
+        branching -- amount of the best words tried in every ColRow
+
+    Returns:
+        list of (score after adding, crossword index, word, ColRow as `(is_column, dim_num)`)
+    """
+    chosen = [
+        (n, colrow)
+        for n, crossword in enumerate(beam)
+        for colrow in islice(cruciverbalist.choose_colrows(crossword), colrows)
+    ]
+    found = await cruciverbalist.find_words_batch([colrow for _, colrow in chosen])
+    candidates: list[Candidate] = []
+    for (n, colrow), words in zip(chosen, found):
+        crossword = beam[n]
+        # Words are sorted from the worst
+        for word, _ in reversed(words[-branching:]):
+            try:
+                crossword.add(word, colrow)
+            except CrosswordException:
+                continue
+            candidates.append((score(crossword), n, word, (IsColumn(colrow.is_column), ColRowId(colrow.dim_num))))
+            crossword.undo()
+    return candidates
+
+
+def select(beam: list[CrosswordImprovable], candidates: list[Candidate], width: int) -> list[CrosswordImprovable]:
+    """Builds the next beam from the `width` best candidates, skipping ones that lead to the same grid"""
+    new_beam: list[CrosswordImprovable] = []
+    seen: set[frozenset] = set()
+    for _, n, word, colrow in sorted(candidates, key=lambda candidate: candidate[0], reverse=True):
+        crossword = beam[n].copy()
+        crossword.add(word, colrow)
+        grid = frozenset(crossword.letters.items())
+        if grid in seen:
+            continue
+        seen.add(grid)
+        new_beam.append(crossword)
+        if len(new_beam) == width:
+            break
+    return new_beam
+
+
+async def generate_crossword(
+    width: int, height: int, word_amount: int, start_word: Optional[str] = None
+) -> CrosswordImprovable:
+    """
+    Generate a crossword with the given specifications, exploring several partial crosswords at once.
+    A random start word is drawn if none is given.
+    """
+    settings = frozen_settings().beam
+    cruciverbalist = get_cruciverbalist()
+    logger.info("I'm starting beam search. Requested size is {}x{} with {} words", width, height, word_amount)
+    start_word = start_word or await cruciverbalist.start_word(min(width, height))
+    logger.info("Starting crossword with {}", start_word)
+    beam = [CrosswordImprovable.make(start_word, width, height)]
+
+    while len(beam[0].words) < word_amount:
+        candidates = await expand(cruciverbalist, beam, settings.colrows, settings.branching)
+        if not candidates:
+            logger.error("No more words found, I'm terminating at {} words", len(beam[0].words))
+            break
+        beam = select(beam, candidates, settings.width)
+        logger.opt(lazy=True).debug("Beam scores: {}", lambda: [score(crossword) for crossword in beam])
+    else:
+        logger.success("I finished generating the crossword with requested specifications.")
+    return beam[0]
@@ -1,27 +1,68 @@
+from functools import cache
+from typing import Optional
+
+from ..commons.cache import DeadEnds, Prefetcher
 from ..commons.logger import logger
+from ..commons.settings import frozen_settings
 from ..crossword import CrosswordImprovable
-from ..cruciverbalist import Cruciverbalist, CruciverbalistBase
+from ..crossword.colrow import ColRow
+from ..cruciverbalist import CruciverbalistBase
+
+
+@cache
+def get_cruciverbalist() -> CruciverbalistBase:
+    """Creates the configured cruciverbalist on first use. This is where the database gets prepared."""
+    from ..cruciverbalist import Cruciverbalist
+
+    return Cruciverbalist()
+
+
+def __getattr__(name: str):
+    # Backwards compatibility for `direct_search.cruciverbalist`, now constructed lazily
+    if name == "cruciverbalist":
+        return get_cruciverbalist()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-cruciverbalist: CruciverbalistBase = Cruciverbalist()
+def changed_colrows(crossword: CrosswordImprovable, word: str, colrow: ColRow) -> list[ColRow]:
+    """Returns the ColRow of a word that was just added and the ones crossing it at its letters"""
+    fields = sorted(crossword.words[word])
+    if colrow.is_column:
+        return [colrow, *(crossword.colrow(False, v) for _, v in fields)]
+    return [colrow, *(crossword.colrow(True, h) for h, _ in fields)]
 
 
-async def generate_crossword(width: int, height: int, word_amount: int) -> CrosswordImprovable:
-    """Generate a crossword with the given specifications."""
+async def generate_crossword(
+    width: int, height: int, word_amount: int, start_word: Optional[str] = None
+) -> CrosswordImprovable:
+    """Generate a crossword with the given specifications. A random start word is drawn if none is given."""
+    cruciverbalist = get_cruciverbalist()
     logger.info("I'm starting crossword generation. Requested size is {}x{} with {} words", width, height, word_amount)
-    start_word = await cruciverbalist.start_word(min(width, height))
+    start_word = start_word or await cruciverbalist.start_word(min(width, height))
     logger.info("Found word: {}", start_word)
     crossword = CrosswordImprovable.make(start_word, width, height)
     # logger.debug("Crossword:\n"+str(crossword))
     logger.info("Starting crossword with {}", start_word)
 
-    while len(crossword.words) < word_amount:
-        word, colrow = await cruciverbalist.choose_and_fill(crossword)
-        if word is None:
-            logger.error("No more words found, I'm terminating at {} words", len(crossword.words))
-            break
-        logger.info("I'm adding {} to {}", word, colrow)
-        crossword.add(word, colrow)  # type: ignore
-        logger.debug("Crossword:\n" + str(crossword))
-    else:
-        logger.success("I finished generating the crossword with requested specifications.")
+    dead_ends = DeadEnds()
+    limit = frozen_settings().components.prefetch
+    prefetcher: Optional[Prefetcher[list[str]]] = Prefetcher(limit) if limit > 0 else None
+    try:
+        while len(crossword.words) < word_amount:
+            word, colrow = await cruciverbalist.choose_and_fill(crossword, dead_ends, prefetcher)
+            if word is None:
+                logger.error("No more words found, I'm terminating at {} words", len(crossword.words))
+                break
+            logger.info("I'm adding {} to {}", word, colrow)
+            crossword.add(word, colrow)  # type: ignore
+            if prefetcher is not None:
+                cruciverbalist.prefetch(changed_colrows(crossword, word, colrow), prefetcher)  # type: ignore
+            logger.debug("Crossword:\n{}", crossword)
+        else:
+            logger.success("I finished generating the crossword with requested specifications.")
+    finally:
+        if prefetcher is not None:
+            prefetcher.clear()
+            logger.info("Prefetched {} lookups, {} were used", prefetcher.started, prefetcher.used)
+    logger.info("Skipped {} dead ColRows, avoiding {} regex lookups", dead_ends.skipped, dead_ends.avoided_queries)
     return crossword
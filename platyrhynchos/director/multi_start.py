@@ -0,0 +1,126 @@
+"""
+Multi-start director. It runs several independent generations with different start words and seeds,
+scores the results with a goal function and returns the best crossword.
+
+On CPython the runs are spread over processes, in Pyodide they run as asyncio tasks.
+Once a crossword reaches the target score, the runs that haven't finished are cancelled.
+Processes can't be interrupted, so a run that has already started finishes in the background.
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from sys import platform
+from typing import Callable, Optional
+
+from ..commons.exceptions import CrosswordException, DatabaseException
+from ..commons.logger import logger
+from ..commons.settings import frozen_settings
+from ..commons.utils import random, seeded_random
+from ..crossword import CrosswordImprovable
+from . import get_runner
+from .direct_search import get_cruciverbalist
+
+Goal = Callable[[CrosswordImprovable], float]
+
+
+def fill_ratio(crossword: CrosswordImprovable) -> float:
+    """Filled-in fields to all fields ratio"""
+    return len(crossword.letters) / (crossword.max_h * crossword.max_v)
+
+
+def crossings(crossword: CrosswordImprovable) -> float:
+    """Intersections to letters ratio"""
+    return len(crossword.crossings) / len(crossword.letters) if crossword.letters else 0.0
+
+
+def words(crossword: CrosswordImprovable) -> float:
+    """Amount of words"""
+    return float(len(crossword.words))
+
+
+GOALS: dict[str, Goal] = {"fill_ratio": fill_ratio, "crossings": crossings, "words": words}
+
+
+async def _run(runner: str, width: int, height: int, word_amount: int, start_word: str, seed: int):
+    with seeded_random(seed):
+        return await get_runner(runner)(width, height, word_amount, start_word=start_word)
+
+
+def _run_in_process(runner: str, width: int, height: int, word_amount: int, start_word: str, seed: int):
+    return asyncio.run(_run(runner, width, height, word_amount, start_word, seed))
+
+
+async def generate_crossword(
+    width: int,
+    height: int,
+    word_amount: int,
+    runs: Optional[int] = None,
+    goal: Optional[Goal] = None,
+    target: Optional[float] = None,
+    workers: Optional[int] = None,
+) -> CrosswordImprovable:
+    """
+    Generate a crossword with the given specifications, returning the best of several runs.
+
+    Arguments:
+        width -- maximum columns
+        height -- maximum rows
+        word_amount -- requested amount of words
+
+    Keyword Arguments:
+        runs -- amount of independent runs (default: {`settings.multi_start.runs`})
+        goal -- scores crosswords, higher is better (default: {`settings.multi_start.goal` from `GOALS`})
+        target -- stop once a crossword scores at least this much (default: {`settings.multi_start.target`})
+        workers -- processes to use, 1 runs everything as tasks (default: {`settings.multi_start.workers`})
+
+    Raises:
+        CrosswordException: none of the runs finished
+    """
+    settings = frozen_settings().multi_start
+    if settings.runner not in ("", "direct", "beam"):
+        raise ValueError(f"Multi-start can't run {settings.runner!r}")
+    runs = runs or settings.runs
+    goal = goal or GOALS[settings.goal]
+    target = target if target is not None else settings.target or None
+    workers = workers if workers is not None else settings.workers
+
+    start_words = await get_cruciverbalist().start_words(min(width, height), runs)
+    arguments = [(settings.runner, width, height, word_amount, i, random.getrandbits(32)) for i in start_words]
+    logger.info("I'm starting {} runs with start words {}", len(arguments), start_words)
+
+    executor = None
+    if platform == "emscripten" or workers == 1:
+        futures = [asyncio.ensure_future(_run(*i)) for i in arguments]
+    else:
+        loop = asyncio.get_running_loop()
+        # Spawned, as forked processes would share the DuckDB connection
+        executor = ProcessPoolExecutor(max_workers=workers or None, mp_context=get_context("spawn"))
+        futures = [loop.run_in_executor(executor, _run_in_process, *i) for i in arguments]
+
+    best, best_score = None, float("-inf")
+    try:
+        for future in asyncio.as_completed(futures):
+            try:
+                crossword = await future
+            except (CrosswordException, DatabaseException) as exception:
+                logger.warning("A run failed: {}", exception)
+                continue
+            score = goal(crossword)
+            logger.debug("A run finished with {} words, scored {}", len(crossword.words), score)
+            if score > best_score:
+                best, best_score = crossword, score
+            if target is not None and best_score >= target:
+                logger.info("Target score {} reached, cancelling the remaining runs", target)
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    if best is None:
+        raise CrosswordException("None of the runs finished")
+    logger.success("Best crossword has {} words and scored {}", len(best.words), best_score)
+    return best
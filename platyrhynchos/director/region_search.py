@@ -0,0 +1,149 @@
+"""
+Region director for large grids. The grid is split into regions separated by empty lines, each region is filled
+by an independent greedy generation with its own sub-crossword, then the regions are merged into the grid
+and a final greedy pass over the boundary ColRows (the ones passing through several regions) adds words
+across the empty lines, joining the regions.
+
+On CPython the regions are filled in processes, each with its own cruciverbalist and query cache.
+In Pyodide they're filled as asyncio tasks.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from sys import platform
+from typing import Optional
+
+from ..commons.cache import DeadEnds
+from ..commons.exceptions import CrosswordException, DatabaseException
+from ..commons.logger import logger
+from ..commons.misc import Coord
+from ..commons.settings import frozen_settings
+from ..commons.utils import random, seeded_random
+from ..crossword import CrosswordImprovable
+from . import direct_search
+
+Region = tuple[Coord, int, int]
+
+
+def _spans(length: int, size: int) -> list[tuple[int, int]]:
+    """Splits a line into parts of about `size` fields with a field between every two, as (start, length) pairs"""
+    amount = max(1, round((length + 1) / (size + 1)))
+    usable = length - amount + 1
+    bounds = [usable * i // amount for i in range(amount + 1)]
+    return [(bounds[i] + i, bounds[i + 1] - bounds[i]) for i in range(amount)]
+
+
+def split(width: int, height: int, size: int) -> list[Region]:
+    """
+    Splits the grid into regions of about `size` x `size` fields, separated by empty lines.
+
+    Returns:
+        origin, width and height of every region, row by row
+    """
+    return [
+        (Coord((h, v)), region_width, region_height)
+        for v, region_height in _spans(height, size)
+        for h, region_width in _spans(width, size)
+    ]
+
+
+def boundary(regions: list[Region]) -> set[tuple[bool, int]]:
+    """Finds the ColRows passing through several regions, as pairs of `is_column` and its id"""
+    rows = Counter(v for (_, origin_v), _, height in regions for v in range(origin_v, origin_v + height))
+    columns = Counter(h for (origin_h, _), width, _ in regions for h in range(origin_h, origin_h + width))
+    return {(False, v) for v, amount in rows.items() if amount > 1} | {
+        (True, h) for h, amount in columns.items() if amount > 1
+    }
+
+
+async def _fill(width: int, height: int, word_amount: int, seed: int) -> CrosswordImprovable:
+    with seeded_random(seed):
+        return await direct_search.generate_crossword(width, height, word_amount)
+
+
+def _fill_in_process(width: int, height: int, word_amount: int, seed: int) -> CrosswordImprovable:
+    return asyncio.run(_fill(width, height, word_amount, seed))
+
+
+async def generate_crossword(
+    width: int,
+    height: int,
+    word_amount: int,
+    start_word: Optional[str] = None,
+    size: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> CrosswordImprovable:
+    """
+    Generate a crossword with the given specifications, filling its regions in parallel.
+
+    Arguments:
+        width -- maximum columns
+        height -- maximum rows
+        word_amount -- requested amount of words
+
+    Keyword Arguments:
+        start_word -- ignored, every region draws its own (default: {None})
+        size -- fields of a side of a region (default: {`settings.region.size`})
+        workers -- processes to use, 1 fills the regions as tasks (default: {`settings.region.workers`})
+
+    Raises:
+        CrosswordException: none of the regions could be filled
+    """
+    settings = frozen_settings().region
+    size = size or settings.size
+    workers = workers if workers is not None else settings.workers
+    regions = split(width, height, size)
+    # Every pair of neighbouring regions should be joined by a word of the final pass
+    region_words = max(len(regions), word_amount - len(regions) + 1)
+    amounts = [max(1, region_words * w * h // (width * height)) for _, w, h in regions]
+    arguments = [(w, h, amount, random.getrandbits(32)) for (_, w, h), amount in zip(regions, amounts)]
+    logger.info("I'm filling {} regions of a {}x{} grid", len(regions), width, height)
+    # The database is prepared before the workers start, so they don't all download it at once
+    cruciverbalist = direct_search.get_cruciverbalist()
+
+    executor = None
+    if platform == "emscripten" or workers == 1 or len(regions) == 1:
+        futures = [asyncio.ensure_future(_fill(*i)) for i in arguments]
+    else:
+        loop = asyncio.get_running_loop()
+        # Spawned, as forked processes would share the DuckDB connection
+        executor = ProcessPoolExecutor(max_workers=workers or None, mp_context=get_context("spawn"))
+        futures = [loop.run_in_executor(executor, _fill_in_process, *i) for i in arguments]
+    try:
+        filled = await asyncio.gather(*futures, return_exceptions=True)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    crossword = CrosswordImprovable({}, width, height, {})
+    for (origin, _, _), region in zip(regions, filled):
+        if isinstance(region, (CrosswordException, DatabaseException)):
+            logger.warning("Region at {} failed: {}", origin, region)
+        elif isinstance(region, BaseException):
+            raise region
+        else:
+            merged = crossword.merge(region, origin)
+            logger.debug("Merged {} words of the region at {}", len(merged), origin)
+    if not crossword.words:
+        raise CrosswordException("None of the regions could be filled")
+
+    logger.info("Joining the regions, starting from {} words", len(crossword.words))
+    dead_ends = DeadEnds()
+    joining = boundary(regions)
+    while len(crossword.words) < word_amount:
+        colrows = [
+            colrow
+            for colrow in cruciverbalist.choose_colrows(crossword)
+            if not joining or (colrow.is_column, colrow.dim_num) in joining
+        ]
+        word, colrow = await cruciverbalist.find_word(colrows, dead_ends)
+        if word is None:
+            logger.error("No more words found, I'm terminating at {} words", len(crossword.words))
+            break
+        crossword.add(word, colrow)  # type: ignore
+    else:
+        logger.success("I finished generating the crossword with requested specifications.")
+    return crossword
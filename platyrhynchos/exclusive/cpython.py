@@ -1,33 +1,147 @@
+import asyncio
 from contextlib import suppress
+from functools import cache
+from importlib.util import find_spec
 from os import remove
 from os.path import isfile
-from tempfile import NamedTemporaryFile, _TemporaryFileWrapper
 
 import duckdb
-import requests
-from tqdm_loggable.auto import tqdm
 
-from ..commons.alphabit import Alphabit
 from ..commons.exceptions import DatabaseException
 from ..commons.logger import logger
-from ..commons.settings import settings
-from ..commons.utils import app_dir
+from ..commons.settings import frozen_settings
+from ..commons.utils import app_dir, random
+from . import preprocess, queries
+from .download import S3Downloader
 
-try:
-    import boto3
-except ImportError:
-    boto3 = None
+# boto3 is only imported when the database has to be downloaded
+HAS_BOTO3 = find_spec("boto3") is not None
+
+_connection: duckdb.DuckDBPyConnection | None = None
+# Database file replacing the downloaded one, see `use_database`
+_database_override: str | None = None
+
+
+def _uses_parquet() -> bool:
+    return frozen_settings().en_simple.store == "parquet"
+
+
+@cache
+def _db_path() -> str:
+    """Path of the words database, resolved on first use so importing this module does no I/O."""
+    if _database_override is not None:
+        return _database_override
+    return app_dir("user_cache_dir", "words.parquet" if _uses_parquet() else "words.db")
+
+
+def _tables(conn: duckdb.DuckDBPyConnection, catalog: str) -> set[str]:
+    return {
+        name
+        for (name,) in conn.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_catalog = ?", [catalog]
+        ).fetchall()
+    }
+
+
+def _create_words_view(conn: duckdb.DuckDBPyConnection):
+    """Creates the `words` view of the queries, over `answers` if the dictionary was preprocessed"""
+    tables = _tables(conn, "memory")
+    source = "answers" if "answers" in tables else "clues"
+    if source not in tables:
+        return
+    columns = conn.execute(
+        "SELECT column_name, data_type FROM information_schema.columns WHERE table_catalog = 'memory' "
+        "AND table_name = ?",
+        [source],
+    ).fetchall()
+    conn.execute(queries.words_view(source, dict(columns)))
+
+
+def _open_connection() -> duckdb.DuckDBPyConnection:
+    conn = duckdb.connect()
+    if _uses_parquet():
+        if isfile(_db_path()):
+            conn.execute(f"CREATE VIEW clues AS SELECT * FROM read_parquet('{_db_path()}')")
+    else:
+        read_only = frozen_settings().en_simple.read_only and isfile(_db_path())
+        conn.execute(f"ATTACH '{_db_path()}' AS dictionary" + (" (READ_ONLY)" if read_only else ""))
+        catalogs = {table: "dictionary" for table in _tables(conn, "dictionary") & {"clues", "answers", "answer_clues"}}
+        # Answer tables of `en-preprocess` are kept in their own file
+        if isfile(preprocessed := preprocess.preprocessed_path(_db_path())):
+            conn.execute(f"ATTACH '{preprocessed}' AS preprocessed (READ_ONLY)")
+            catalogs |= {table: "preprocessed" for table in _tables(conn, "preprocessed") & {"answers", "answer_clues"}}
+        for table, catalog in catalogs.items():
+            conn.execute(f"CREATE VIEW {table} AS SELECT * FROM {catalog}.{table}")
+    _create_words_view(conn)
+    return conn
 
-_db_path = app_dir("user_cache_dir", "words.db")
+
+def connection() -> duckdb.DuckDBPyConnection:
+    """
+    Returns the database connection shared by all queries, opening it on first use.
+
+    The connection is in memory and only holds views, so they're visible to all cursors.
+    With the `parquet` store, `clues` is a view over `read_parquet`, so the dataset isn't materialized.
+    Otherwise the DuckDB file is attached as `dictionary`, read-only if `read_only` is set and the file exists,
+    so DuckDB only pages in the blocks of the columns a query touches. Queries select from the `words` view
+    (see `queries.words_view`).
+    """
+    global _connection
+    if _connection is None:
+        _connection = _open_connection()
+    return _connection
+
+
+def close_connection():
+    """Closes the shared connection, e.g. before the database file is replaced"""
+    global _connection
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+    _length_counts.cache_clear()
+    _letter_masks.cache_clear()
+    _answer_set.cache_clear()
+
+
+def use_database(path: str | None):
+    """
+    Points the queries at another database file, e.g. a synthetic dictionary (see `synthetic.py`).
+    The file has the format of the configured store, None goes back to the downloaded one.
+    """
+    global _database_override
+    close_connection()
+    _database_override = path
+    _db_path.cache_clear()
 
 
 def cursor_execute(sql, **kwargs):
-    cursor = duckdb.connect(database=_db_path).cursor()
+    cursor = connection().cursor()
     res = cursor.execute(sql, kwargs).fetchall() if kwargs else cursor.execute(sql).fetchall()
     cursor.close()
     return res
 
 
+@cache
+def _length_counts() -> dict[int, int]:
+    """Amount of answers of every length, counted once per connection"""
+    return dict(cursor_execute(queries.length_counts_query()))
+
+
+@cache
+def _letter_masks() -> dict[int, list[int]]:
+    """Letters at every position of the answers of every length, found once per connection"""
+    masks: dict[int, list[int]] = {}
+    for length, position, mask in cursor_execute(queries.letter_masks_query()):
+        masks.setdefault(length, [0] * length)[position] = mask
+    return masks
+
+
+@cache
+def _answer_set() -> frozenset[str]:
+    """All answers, loaded once per connection"""
+    return frozenset(answer for (answer,) in cursor_execute(queries.answers_query()))
+
+
 def convert_result_to_list(func):
     async def wrapper(*args, **kwargs):
         return [i[0] for i in await func(*args, **kwargs)]
@@ -35,26 +149,47 @@ def convert_result_to_list(func):
     return wrapper
 
 
+def _has_s3_credentials() -> bool:
+    settings = frozen_settings()
+    return bool(settings.s3_key_id and settings.s3_key_secret)
+
+
 def download_db(file):
+    """
+    Makes sure the words database is present and current, then checks it.
+    With boto3 and S3 credentials available, the local copy is compared with `file` in S3
+    and only downloaded if it's missing or outdated (see `S3Downloader`).
+    """
+    if HAS_BOTO3 and _has_s3_credentials():
+        _get_from_s3(file)
     try:
-        cursor_execute("SELECT answer, alphabit FROM clues LIMIT 1")
-    except duckdb.CatalogException:
-        if boto3 is None:
-            log_mess = f"Database in {_db_path} exists, but does not have a valid clues table. Please run the GetGerghoWords pipeline with `--duckdb_path={_db_path}` to fix this."
-            logger.error(log_mess)
-            raise DatabaseException(log_mess)
+        cursor_execute("SELECT answer, alphabit FROM words LIMIT 1")
+    except (duckdb.CatalogException, duckdb.BinderException, duckdb.IOException) as exception:
+        close_connection()
+        if isfile(preprocessed := preprocess.preprocessed_path(_db_path())):
+            log_mess = (
+                f"The `words` view over the `answers` table in {preprocessed} can't be queried for answers and "
+                "alphabits. Run `en-preprocess` again to fix this."
+            )
         else:
-            with suppress(FileNotFoundError):
-                remove(_db_path)
-            _get_from_s3(file)
+            log_mess = (
+                f"The `words` view over the `clues` table in {_db_path()} can't be queried for answers and alphabits. "
+                "Set the S3 credentials to download the database or run the GetGerghoWords pipeline with "
+                f"`--duckdb_path={_db_path()}` to fix this."
+            )
+        logger.error(log_mess)
+        raise DatabaseException(log_mess) from exception
     else:
         logger.info("Database found and checked")
         return
 
 
 def _get_from_s3(file):
-    """Download `file` from S3. Requires ENV variables to be set."""
-    logger.info("Downloading database")
+    """Download `file` from S3, unless the local copy is current. Requires ENV variables to be set."""
+    import boto3
+    from tqdm_loggable.auto import tqdm
+
+    settings = frozen_settings()
     assert settings.s3.region and settings.s3.endpoint and settings.s3.bucket, "S3 settings not set"
     assert settings.s3_key_id and settings.s3_key_secret, "S3 credentials not set"
     s3_client = boto3.client(
@@ -64,42 +199,104 @@ def _get_from_s3(file):
         aws_access_key_id=settings.s3_key_id,
         aws_secret_access_key=settings.s3_key_secret,
     )
-    size = s3_client.head_object(Bucket=settings.s3.bucket, Key=file).get("ContentLength")
+    downloader = S3Downloader(
+        s3_client, settings.s3.bucket, chunk_size=settings.s3.chunk_size, workers=settings.s3.download_workers
+    )
+    remote = downloader.head(file)
+    if downloader.is_current(_db_path(), remote):
+        logger.info("Database is up to date")
+        return
+
+    logger.info("Downloading database")
+    close_connection()
     with tqdm(
-        total=size,
+        total=remote.size,
         unit="B",
         unit_scale=True,
         unit_divisor=1024,
     ) as pbar:
-        s3_client.download_file(
-            Key=file,
-            Bucket=settings.s3.bucket,
-            Filename=_db_path,
-            Callback=pbar.update,
-        )
+        downloader.fetch(remote, _db_path(), progress=pbar.update)
     logger.info("Database downloaded")
+    with suppress(FileNotFoundError):
+        remove(preprocess.preprocessed_path(_db_path()))
+        logger.info("Removed the answer tables of the previous database, run `en-preprocess` to rebuild them")
 
 
 @convert_result_to_list
 async def get_regex_w_alphabit(regex: str, alphabit: str, previous: list[str] = None):
-    previous = ["'A'"] if previous is None else [f"'{i}'" for i in previous]
-    return cursor_execute(
-        f"select answer from clues where bit_count('{alphabit}'::BIT | alphabit)=length(alphabit) and regexp_matches(answer, '{regex}') and length(answer) > 1 and length(answer) > 1 and answer not in ({','.join(previous)}) limit 100"
-    )
+    return cursor_execute(queries.regex_query(regex, previous, alphabit))
 
 
 @convert_result_to_list
-async def get_regex(regex: str, previous: list[str] = []):
-    # sourcery skip: assign-if-exp
-    if previous is None:
-        previous = ["'A'"]
-    else:
-        previous = [f"'{i}'" for i in previous]
-    return cursor_execute(
-        f"select answer from clues where regexp_matches(answer, '{regex}') and length(answer) > 1 and answer not in ({','.join(previous)}) limit 100"
-    )
+async def get_regex(regex: str, previous: list[str] = None):
+    return cursor_execute(queries.regex_query(regex, previous))
 
 
-@convert_result_to_list
-async def get_random(max_size: int):
-    return cursor_execute(f"select answer from clues where length(answer) > 1 and length(answer) < {max_size} limit 1")
+async def get_regex_batch(
+    requests: list[tuple[str, str | None]], previous: list[str] = None, limit: int = 100, ranked: bool = False
+) -> list[list[str]]:
+    """
+    Runs several regex queries in one round trip.
+
+    Arguments:
+        requests -- pairs of a regex and an optional Alphabit query, optionally followed by an integer alphabit
+            of forbidden letters
+
+    Keyword Arguments:
+        previous -- answers to exclude (default: {None})
+        limit -- maximum amount of answers per request (default: {100})
+        ranked -- return the best answers, ordered from the worst, see `queries.regex_query` (default: {False})
+
+    Returns:
+        list of found answers for every request
+    """
+    sqls = [
+        queries.regex_query(regex, previous, alphabit, limit, ranked, *forbidden)
+        for regex, alphabit, *forbidden in requests
+    ]
+    results: list[list[str]] = [[] for _ in sqls]
+    if sqls:
+        # Run in a thread with its own cursor, so prefetched lookups overlap with the rest of the turn
+        for index, answer in await asyncio.to_thread(cursor_execute, queries.batch_query(sqls)):
+            results[index].append(answer)
+    return results
+
+
+async def get_random_batch(max_size: int, amount: int, seed: int | None = None) -> list[str]:
+    """
+    Draws up to `amount` distinct random answers fitting in `max_size` with one query, favouring longer ones.
+
+    Keyword Arguments:
+        seed -- the same seed draws the same answers (default: {drawn from `commons.utils.random`})
+
+    Returns:
+        answers grouped by length
+    """
+    seed = random.getrandbits(31) if seed is None else seed
+    sqls = queries.random_batch_queries(_length_counts(), max_size, amount, seed)
+    return [answer for _, answer in cursor_execute(queries.batch_query(sqls))] if sqls else []
+
+
+async def get_random(max_size: int) -> list[str]:
+    return await get_random_batch(max_size, 1)
+
+
+async def get_letter_masks() -> dict[int, list[int]]:
+    """Returns the letters used at every position of the answers of every length (see `crossword/domains.py`)"""
+    return _letter_masks()
+
+
+async def get_answer_set() -> frozenset[str]:
+    """Returns all answers as a set, for membership checks without queries"""
+    return _answer_set()
+
+
+def export_parquet(path: str):
+    """
+    Writes the `words` view to a Parquet file that can be queried directly (see the `parquet` store).
+    Rows are ordered by length and written in small row groups, so length filters skip most of the file.
+    """
+    cursor_execute(
+        f"COPY (SELECT * FROM words ORDER BY length, answer) TO '{path}' "
+        f"(FORMAT PARQUET, ROW_GROUP_SIZE {preprocess.ROW_GROUP_SIZE})"
+    )
@@ -0,0 +1,195 @@
+"""
+Implements resumable, verified downloads of the dictionary from S3.
+
+The object is fetched in ranges by a pool of threads into a `.part` file, whose finished ranges are recorded
+in a `.part.json` state file, so an interrupted download continues where it stopped. After the size and checksum
+are verified, the file is atomically renamed into place and its ETag is saved in a `.json` file next to it.
+That ETag and the size are compared with the remote object to skip downloads of files that are already current.
+"""
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from hashlib import md5
+from os import remove, replace
+from os.path import getsize, isfile
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from ..commons.exceptions import DatabaseException
+from ..commons.logger import logger
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class RemoteObject:
+    """ETag and size of an S3 object"""
+
+    key: str
+    etag: str
+    size: int
+
+    @property
+    def md5(self) -> Optional[str]:
+        """MD5 of the object, if the ETag contains it (it doesn't for multipart uploads)"""
+        etag = self.etag.strip('"')
+        return None if "-" in etag else etag
+
+
+@dataclass
+class _PartState:
+    """Progress of a partial download, saved as JSON"""
+
+    etag: str
+    size: int
+    chunk_size: int
+    done: list[int] = field(default_factory=list)
+
+    def matches(self, remote: RemoteObject, chunk_size: int) -> bool:
+        return (self.etag, self.size, self.chunk_size) == (remote.etag, remote.size, chunk_size)
+
+
+def _read_json(path: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_json(path: str, data: dict[str, Any]):
+    """Writes JSON atomically, so a crash never leaves a half-written state file"""
+    with open(f"{path}.tmp", "w", encoding="utf8") as f:
+        json.dump(data, f)
+    replace(f"{path}.tmp", path)
+
+
+class S3Downloader:
+    """Downloads S3 objects into local files, skipping current ones and resuming partial ones."""
+
+    def __init__(self, client, bucket: str, chunk_size: int = CHUNK_SIZE, workers: int = 4) -> None:
+        """
+        Arguments:
+            client -- boto3 S3 client
+            bucket -- name of the bucket
+
+        Keyword Arguments:
+            chunk_size -- size of the ranges fetched by a single request (default: {CHUNK_SIZE})
+            workers -- number of ranges fetched in parallel (default: {4})
+        """
+        self.client = client
+        self.bucket = bucket
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def head(self, key: str) -> RemoteObject:
+        """Gets the ETag and size of an object"""
+        response = self.client.head_object(Bucket=self.bucket, Key=key)
+        return RemoteObject(key=key, etag=response["ETag"], size=response["ContentLength"])
+
+    @staticmethod
+    def is_current(path: str, remote: RemoteObject) -> bool:
+        """Checks whether the file in `path` was downloaded from the current version of the remote object"""
+        meta = _read_json(f"{path}.json")
+        return (
+            meta is not None
+            and isfile(path)
+            and meta.get("etag") == remote.etag
+            and meta.get("size") == remote.size == getsize(path)
+        )
+
+    def fetch(
+        self,
+        remote: RemoteObject,
+        path: str,
+        progress: Callable[[int], Any] = lambda _: None,
+    ):
+        """
+        Downloads the object to `path`, resuming a previous partial download if it's for the same object version.
+
+        Arguments:
+            remote -- object to download (see `head`)
+            path -- destination file
+
+        Keyword Arguments:
+            progress -- called with the amount of bytes fetched after every range (default: {no-op})
+
+        Raises:
+            DatabaseException: the downloaded file didn't match the remote size or checksum
+        """
+        part_path, state_path = f"{path}.part", f"{path}.part.json"
+        state_data = _read_json(state_path)
+        state = _PartState(**state_data) if state_data else None
+        if state is None or not state.matches(remote, self.chunk_size) or not isfile(part_path):
+            state = _PartState(etag=remote.etag, size=remote.size, chunk_size=self.chunk_size)
+            with open(part_path, "wb") as f:
+                f.truncate(remote.size)
+            _write_json(state_path, asdict(state))
+        else:
+            logger.info("Resuming download of {} ({} ranges already fetched)", remote.key, len(state.done))
+            progress(min(len(state.done) * self.chunk_size, remote.size))
+
+        chunk_amount = -(-remote.size // self.chunk_size)
+        missing = sorted(set(range(chunk_amount)) - set(state.done))
+        lock = Lock()
+
+        def fetch_chunk(index: int):
+            start = index * self.chunk_size
+            end = min(start + self.chunk_size, remote.size) - 1
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=remote.key, Range=f"bytes={start}-{end}", IfMatch=remote.etag
+            )
+            data = response["Body"].read()
+            if len(data) != end - start + 1:
+                raise DatabaseException(f"Range {start}-{end} of {remote.key} returned {len(data)} bytes")
+            with open(part_path, "r+b") as f:
+                f.seek(start)
+                f.write(data)
+            with lock:
+                state.done.append(index)
+                _write_json(state_path, asdict(state))
+            progress(len(data))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # list() re-raises the first exception of a failed range
+            list(executor.map(fetch_chunk, missing))
+
+        self._verify(part_path, remote)
+        replace(part_path, path)
+        _write_json(f"{path}.json", {"etag": remote.etag, "size": remote.size})
+        remove(state_path)
+
+    @staticmethod
+    def _verify(part_path: str, remote: RemoteObject):
+        """Checks the size and, if possible, the MD5 of a finished download. Broken downloads are removed."""
+        error = None
+        if getsize(part_path) != remote.size:
+            error = f"expected {remote.size} bytes, got {getsize(part_path)}"
+        elif remote.md5 is not None:
+            digest = md5()
+            with open(part_path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    digest.update(chunk)
+            if digest.hexdigest() != remote.md5:
+                error = f"expected MD5 {remote.md5}, got {digest.hexdigest()}"
+        if error is not None:
+            for i in (part_path, f"{part_path}.json"):
+                with suppress(FileNotFoundError):
+                    remove(i)
+            raise DatabaseException(f"Download of {remote.key} is corrupted: {error}")
+
+    def download(self, key: str, path: str, progress: Callable[[int], Any] = lambda _: None) -> bool:
+        """
+        Makes sure `path` contains the current version of the object.
+
+        Returns:
+            True if the file was downloaded, False if it was already current
+        """
+        remote = self.head(key)
+        if self.is_current(path, remote):
+            return False
+        self.fetch(remote, path, progress)
+        return True
@@ -0,0 +1,90 @@
+"""
+Offline preprocessing of the dictionary, run with `en-preprocess`.
+
+The raw `clues` table holds answers as they were scraped, with punctuation, varying case and duplicates.
+This builds two tables from it, in a separate file (see `preprocessed_path`), so the downloaded file stays as it is
+and its S3 checks (see `download.py`) keep passing:
+- `answers`, the unique normalized answers with their length, integer alphabit, letters and crossability score,
+  sorted by length, so DuckDB's zone maps let length filters skip whole row groups. Runtime queries use it if it exists.
+  The crossability score is the mean frequency of the answer's letters among all letters of the answers,
+  so answers made of common letters, which are easier to cross, score higher. Spaces and hyphens count as 0.
+- `answer_clues`, mapping the normalized answers back to their clues.
+"""
+from os.path import splitext
+
+import duckdb
+
+from ..commons.logger import logger
+
+# Rows per row group of exported Parquet files, small enough for length filters to skip most of them
+ROW_GROUP_SIZE = 16384
+
+# Uppercase letters, single spaces and hyphens (they're shown as blocked fields and dashes in the grid)
+NORMALIZED_ANSWER = "upper(trim(regexp_replace(regexp_replace(answer, '[^A-Za-z -]', '', 'g'), ' +', ' ', 'g')))"
+
+# Same as `Alphabit.to_int`: A is the lowest bit
+ALPHABIT = (
+    "coalesce(list_sum(list_distinct(list_transform(regexp_extract_all(answer, '[A-Z]'), "
+    "letter -> (1 << (ascii(letter) - 65))::UINTEGER))), 0)::UINTEGER"
+)
+
+
+def preprocessed_path(path: str) -> str:
+    """Path of the file with the answer tables of the dictionary in `path`"""
+    return f"{splitext(path)[0]}.answers.db"
+
+
+def build_answers(conn: duckdb.DuckDBPyConnection):
+    """Builds the `answer_clues` and `answers` tables from `clues`, replacing previous ones"""
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TABLE answer_clues AS
+        SELECT DISTINCT {NORMALIZED_ANSWER} AS answer, clue FROM clues ORDER BY answer
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TABLE answers AS
+        WITH unique_answers AS (
+            SELECT DISTINCT answer FROM answer_clues WHERE length(answer) > 1
+        ),
+        answer_letters AS (
+            SELECT answer, unnest(regexp_extract_all(answer, '[A-Z]')) AS letter FROM unique_answers
+        ),
+        frequencies AS (
+            SELECT letter, count(*) / sum(count(*)) OVER () AS frequency FROM answer_letters GROUP BY letter
+        ),
+        scores AS (
+            SELECT answer, sum(frequency) AS score FROM answer_letters JOIN frequencies USING (letter) GROUP BY answer
+        )
+        SELECT
+            answer,
+            length(answer)::USMALLINT AS length,
+            {ALPHABIT} AS alphabit,
+            string_split(answer, '') AS letters,
+            (coalesce(score, 0) / length(answer))::REAL AS score
+        FROM unique_answers LEFT JOIN scores USING (answer)
+        ORDER BY length, answer
+        """
+    )
+
+
+def preprocess(path: str):
+    """
+    Builds the answer tables of the DuckDB file at `path` into the file at `preprocessed_path(path)`.
+    The shared connection is closed first, as that file has to be opened for writing.
+    """
+    from .cpython import close_connection
+
+    close_connection()
+    conn = duckdb.connect(preprocessed_path(path))
+    try:
+        conn.execute(f"ATTACH '{path}' AS dictionary (READ_ONLY)")
+        conn.execute("CREATE TEMP VIEW clues AS SELECT * FROM dictionary.clues")
+        build_answers(conn)
+        conn.execute("CHECKPOINT")
+        (clues,) = conn.execute("SELECT count(*) FROM clues").fetchone()
+        (answers,) = conn.execute("SELECT count(*) FROM answers").fetchone()
+        logger.info("Preprocessed {} clues into {} unique answers", clues, answers)
+    finally:
+        conn.close()
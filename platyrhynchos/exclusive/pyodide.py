@@ -1,4 +1,74 @@
-from _duckdb import get_random, get_regex, get_regex_w_alphabit
+"""
+Query functions used in the browser. The SQL is built in Python (see `queries.py`) and run by the persistent
+DuckDB-WASM connection of the web worker, registered as the `_duckdb` module, which sets up the `words` view.
+"""
+# pylint: disable=import-error
+from _duckdb import query_batch, query_column
+from pyodide.ffi import to_js
+
+from ..commons.utils import random
+from . import queries
+
+_length_counts: dict[int, int] | None = None
+_letter_masks: dict[int, list[int]] | None = None
+_answer_set: frozenset[str] | None = None
+
+
+async def get_regex_w_alphabit(regex: str, alphabit: str, previous: list[str] = None) -> list[str]:
+    return (await query_column(queries.regex_query(regex, previous, alphabit))).to_py()
+
+
+async def get_regex(regex: str, previous: list[str] = None) -> list[str]:
+    return (await query_column(queries.regex_query(regex, previous))).to_py()
+
+
+async def get_regex_batch(
+    requests: list[tuple[str, str | None]], previous: list[str] = None, limit: int = 100, ranked: bool = False
+) -> list[list[str]]:
+    """Runs several regex queries in one round trip to the worker's DuckDB, see `cpython.get_regex_batch`"""
+    sqls = [
+        queries.regex_query(regex, previous, alphabit, limit, ranked, *forbidden)
+        for regex, alphabit, *forbidden in requests
+    ]
+    return (await query_batch(to_js(sqls))).to_py() if sqls else []
+
+
+async def get_random_batch(max_size: int, amount: int, seed: int | None = None) -> list[str]:
+    """Draws random answers with one round trip, see `cpython.get_random_batch`"""
+    global _length_counts
+    if _length_counts is None:
+        sql = queries.packed_query(queries.length_counts_query(), ("length", "amount"), queries.LENGTH_COUNTS_WIDTHS)
+        _length_counts = dict(
+            queries.unpack(row, queries.LENGTH_COUNTS_WIDTHS) for row in (await query_column(sql)).to_py()
+        )
+    seed = random.getrandbits(31) if seed is None else seed
+    sqls = queries.random_batch_queries(_length_counts, max_size, amount, seed)
+    return [answer for found in (await query_batch(to_js(sqls))).to_py() for answer in found] if sqls else []
+
+
+async def get_random(max_size: int) -> list[str]:
+    return await get_random_batch(max_size, 1)
+
+
+async def get_letter_masks() -> dict[int, list[int]]:
+    """Letters at every position of the answers of every length, found with the first call"""
+    global _letter_masks
+    if _letter_masks is None:
+        columns = ("length", "position", "mask")
+        sql = queries.packed_query(queries.letter_masks_query(), columns, queries.LETTER_MASKS_WIDTHS)
+        _letter_masks = {}
+        for row in (await query_column(sql)).to_py():
+            length, position, mask = queries.unpack(row, queries.LETTER_MASKS_WIDTHS)
+            _letter_masks.setdefault(length, [0] * length)[position] = mask
+    return _letter_masks
+
+
+async def get_answer_set() -> frozenset[str]:
+    """All answers as a set, loaded with the first call"""
+    global _answer_set
+    if _answer_set is None:
+        _answer_set = frozenset((await query_column(queries.answers_query())).to_py())
+    return _answer_set
 
 
 def download_db(url: str):
@@ -0,0 +1,230 @@
+"""
+SQL of the word queries. It's built in Python for both platforms, so CPython and the Pyodide worker run the same queries.
+They select from the `words` view (see `words_view`), which has the answer, its length, its integer alphabit
+(see `Alphabit.to_int`) and its crossability score (see `preprocess.py`).
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from random import Random
+from typing import Iterable, Mapping, Optional
+
+from ..commons.misc import pattern_tokens
+
+
+def quote(value: str) -> str:
+    """Quotes a string as an SQL literal"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def words_view(source: str, columns: Mapping[str, str]) -> str:
+    """
+    Creates the `words` view all queries select from. Preprocessed answers (see `preprocess.py`) are used as they are,
+    raw clues get their length and integer alphabit computed on the fly, from a BIT `alphabit` or a string
+    `alphabit_raw` (like in `app/src/duck.js`). Answers without a crossability score get 0.
+
+    Arguments:
+        source -- table or view with the answers
+        columns -- column names of `source` mapped to their types
+    """
+    score = "score" if "score" in columns else "0.0::REAL AS score"
+    if "length" in columns:
+        return f"CREATE VIEW words AS SELECT answer, length, alphabit, {score} FROM {source}"
+    if "alphabit" not in columns:
+        # Parquet files made for the browser store the alphabit as a string of bits
+        alphabit = "alphabit_raw::BIT::UINTEGER"
+    elif columns["alphabit"].upper() == "BIT":
+        alphabit = "alphabit::UINTEGER"
+    else:
+        alphabit = "alphabit"
+    return (
+        f"CREATE VIEW words AS SELECT answer, length(answer) AS length, {alphabit} AS alphabit, {score} "
+        f"FROM {source} WHERE length(answer) > 1"
+    )
+
+
+@dataclass(frozen=True)
+class PatternBounds:
+    """Answer length bounds and literal parts implied by a regex"""
+
+    min_length: int
+    max_length: int
+    literals: tuple[str, ...]
+
+
+def pattern_bounds(regex: str) -> Optional[PatternBounds]:
+    """
+    Derives the length bounds and the literal parts of an anchored regex made of letters and `.{n}`/`.{m,n}` gaps,
+    e.g. `^.{0,3}AB.{2}C.{0,4}$` gives lengths 5 to 12 and literals `AB` and `C`.
+
+    Returns:
+        the bounds or None if the regex has any other syntax
+    """
+    if (tokens := pattern_tokens(regex)) is None:
+        return None
+    min_length = max_length = 0
+    literals, literal = [], ""
+    for token in tokens:
+        if isinstance(token, str):
+            literal += token
+            min_length += 1
+            max_length += 1
+            continue
+        if literal:
+            literals.append(literal)
+            literal = ""
+        min_length += token[0]
+        max_length += token[1]
+    if literal:
+        literals.append(literal)
+    return PatternBounds(min_length, max_length, tuple(literals))
+
+
+def pattern_conditions(regex: str) -> list[str]:
+    """
+    Cheap SQL conditions implied by a regex (see `pattern_bounds`), checked before it.
+    The length filter is pushed into the scan, so row groups of other lengths are skipped.
+    """
+    bounds = pattern_bounds(regex)
+    if bounds is None:
+        return []
+    conditions = [f"length between {max(bounds.min_length, 2)} and {bounds.max_length}"]
+    # Longer literals are rarer, so they're checked first
+    conditions.extend(f"contains(answer, {quote(i)})" for i in sorted(bounds.literals, key=len, reverse=True))
+    return conditions
+
+
+def alphabit_condition(alphabit: str) -> str:
+    """SQL condition checking an Alphabit query (see `Alphabit.to_query`) against the integer alphabit column"""
+    required = ~int(alphabit, 2) & ((1 << len(alphabit)) - 1)
+    return f"alphabit & {required} = {required}"
+
+
+def regex_query(
+    regex: str,
+    previous: Optional[Iterable[str]] = None,
+    alphabit: Optional[str] = None,
+    limit: int = 100,
+    ranked: bool = False,
+    forbidden: int = 0,
+) -> str:
+    """
+    Selects answers matching a regex. Conditions derived from the regex (see `pattern_conditions`)
+    filter most answers out before the regex gets evaluated.
+
+    Ranked queries return the `limit` best answers instead of the first ones found. Answers are ranked like
+    `EnglishSimpleCruciverbalist.eval_word` ranks them, by length, and then by their crossability score.
+    They're ordered from the worst to the best, like `CruciverbalistBase.find_words` orders them.
+
+    Arguments:
+        regex -- regular expression the answers have to match
+
+    Keyword Arguments:
+        previous -- answers to exclude (default: {None})
+        alphabit -- Alphabit query to prefilter the answers with (default: {None})
+        limit -- maximum amount of answers (default: {100})
+        ranked -- return the best answers (default: {False})
+        forbidden -- integer alphabit of letters the answers can't have (default: {0})
+    """
+    conditions = pattern_conditions(regex)
+    if alphabit is not None:
+        conditions.append(alphabit_condition(alphabit))
+    if forbidden:
+        conditions.append(f"alphabit & {forbidden} = 0")
+    conditions.append(f"regexp_matches(answer, {quote(regex)})")
+    if previous:
+        conditions.append(f"answer not in ({','.join(map(quote, previous))})")
+    if ranked:
+        return (
+            f"select answer from (select answer, length, score from words where {' and '.join(conditions)} "
+            f"order by length desc, score desc, answer limit {limit}) order by length, score, answer desc"
+        )
+    return f"select answer from words where {' and '.join(conditions)} limit {limit}"
+
+
+def letter_masks_query() -> str:
+    """
+    Finds the letters used at every position of the answers of every length, as integer alphabits with bit 26 set
+    for other characters (see `crossword/domains.py`), ordered by length and position
+    """
+    letter = "substr(answer, position + 1, 1)"
+    mask = f"bit_or(CASE WHEN {letter} BETWEEN 'A' AND 'Z' THEN 1 << (ascii({letter}) - 65) ELSE {1 << 26} END)"
+    return (
+        f"select length, position, {mask} as mask "
+        "from (select answer, length, unnest(range(length)) as position from words) group by 1, 2 "
+        "order by length, position"
+    )
+
+
+def answers_query() -> str:
+    """Selects every answer once, to check words in memory"""
+    return "select distinct answer from words"
+
+
+def length_counts_query() -> str:
+    """Counts the answers of every length, ordered by length"""
+    return "select length, count(*) as amount from words group by 1 order by length"
+
+
+# Bits of the columns after the first one in `packed_query`
+LETTER_MASKS_WIDTHS = (16, 27)
+LENGTH_COUNTS_WIDTHS = (40,)
+
+
+def packed_query(sql: str, columns: Iterable[str], widths: tuple[int, ...]) -> str:
+    """
+    Packs the non-negative integer columns of a query into a single BIGINT column, so the browser, which reads
+    results by column, gets whole rows with one query. The last column gets the lowest bits (see `unpack`).
+
+    Arguments:
+        sql -- the query
+        columns -- names of the columns to pack
+        widths -- bits of every column but the first, which gets the remaining ones
+    """
+    columns = list(columns)
+    shifts = [sum(widths[i:]) for i in range(len(widths) + 1)]
+    return f"select {' | '.join(f'({name}::BIGINT << {shift})' for name, shift in zip(columns, shifts))} from ({sql})"
+
+
+def unpack(value: int, widths: tuple[int, ...]) -> tuple[int, ...]:
+    """Splits a value of `packed_query` back into the columns"""
+    value = int(value)
+    found = []
+    for width in reversed(widths):
+        found.append(value & ((1 << width) - 1))
+        value >>= width
+    return value, *reversed(found)
+
+
+def allocate_lengths(counts: Mapping[int, int], max_size: int, amount: int, rng: Random) -> dict[int, int]:
+    """
+    Splits `amount` draws between the answer lengths that fit in `max_size`. Lengths are weighted by their total
+    amount of letters, so longer answers, which can be crossed in more places, are drawn more often.
+
+    Returns:
+        mapping of lengths to the amount of answers to draw
+    """
+    lengths = [length for length, found in counts.items() if 1 < length <= max_size and found]
+    if not lengths:
+        return {}
+    return dict(Counter(rng.choices(lengths, [counts[length] * length for length in lengths], k=amount)))
+
+
+def sample_query(length: int, amount: int, seed: int) -> str:
+    """Draws `amount` random answers of the given length, always the same ones for a seed"""
+    return (
+        f"select answer from (select answer from words where length = {length}) "
+        f"using sample reservoir({amount} rows) repeatable ({seed})"
+    )
+
+
+def random_batch_queries(counts: Mapping[int, int], max_size: int, amount: int, seed: int) -> list[str]:
+    """Queries drawing `amount` answers fitting in `max_size`, one per drawn length (see `allocate_lengths`)"""
+    allocation = allocate_lengths(counts, max_size, amount, Random(seed))
+    return [sample_query(length, drawn, seed + length) for length, drawn in sorted(allocation.items())]
+
+
+def batch_query(queries: list[str]) -> str:
+    """Joins single column queries into one, tagging every row with the index of its query as `q`"""
+    return " union all ".join(f"select {i} as q, * from ({sql})" for i, sql in enumerate(queries))
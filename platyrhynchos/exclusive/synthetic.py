@@ -0,0 +1,146 @@
+"""
+Synthetic dictionaries, for offline tests and for benchmarking how queries scale with the dictionary size.
+
+`synthetic_clues` fills a `clues` table with the schema of the downloaded database, BIT alphabit included.
+Answer lengths and letters are drawn from the distributions of English crossword answers, and some of the longer
+answers are phrases with a space. Every draw is a hash of the row, the position and the seed, so the same seed
+gives the same table regardless of the amount of threads DuckDB spreads the work over. On one thread, 1M clues take
+~7 s, and ~15 s with the answer tables `build_synthetic` adds (the build time of `benchmarks/scaling.py`).
+The letters are drawn independently, so like in the real data short answers repeat (as different clues)
+while long ones are almost all unique.
+"""
+import duckdb
+
+from ..commons.logger import logger
+from .preprocess import ALPHABIT, build_answers
+
+# Per mille of the letters of English text
+LETTER_FREQUENCIES = {
+    "E": 124,
+    "T": 91,
+    "A": 82,
+    "O": 75,
+    "I": 70,
+    "N": 67,
+    "S": 63,
+    "H": 61,
+    "R": 60,
+    "D": 43,
+    "L": 40,
+    "C": 28,
+    "U": 28,
+    "M": 24,
+    "W": 24,
+    "F": 22,
+    "G": 20,
+    "Y": 20,
+    "P": 19,
+    "B": 15,
+    "V": 10,
+    "K": 8,
+    "J": 2,
+    "X": 2,
+    "Q": 1,
+    "Z": 1,
+}
+
+# Per mille of the answers of every length in crossword dictionaries
+LENGTH_FREQUENCIES = {
+    2: 10,
+    3: 160,
+    4: 200,
+    5: 170,
+    6: 120,
+    7: 100,
+    8: 75,
+    9: 50,
+    10: 35,
+    11: 25,
+    12: 15,
+    13: 12,
+    14: 10,
+    15: 10,
+    16: 3,
+    17: 2,
+    18: 1,
+    19: 1,
+    20: 1,
+}
+
+# Per mille of the answers of at least `MIN_PHRASE_LENGTH` letters that are two words
+PHRASE_FREQUENCY = 200
+MIN_PHRASE_LENGTH = 7
+
+_LETTER_BAG = "".join(letter * amount for letter, amount in LETTER_FREQUENCIES.items())
+_LENGTH_BAG = [length for length, amount in LENGTH_FREQUENCIES.items() for _ in range(amount)]
+
+
+def _draw(bound: int, *keys: str) -> str:
+    """SQL drawing an integer from 1 to `bound`, determined by the keys"""
+    return f"(1 + hash({', '.join(keys)}) % {bound})::INTEGER"
+
+
+def synthetic_clues(conn: duckdb.DuckDBPyConnection, answers: int, seed: int = 0):
+    """
+    Creates the `clues` table with random answers, replacing a previous one.
+
+    Arguments:
+        conn -- connection to create the table with
+        answers -- amount of rows, i.e. clues
+
+    Keyword Arguments:
+        seed -- the same seed makes the same table (default: {0})
+    """
+    seed = int(seed)
+    letter = f"substr('{_LETTER_BAG}', {_draw(len(_LETTER_BAG), 'i', 'p + 2', str(seed))}, 1)"
+    conn.execute(
+        f"""
+        CREATE OR REPLACE TABLE clues AS
+        WITH lengths AS (
+            SELECT i, {_LENGTH_BAG}[{_draw(len(_LENGTH_BAG), 'i', '0', str(seed))}] AS length
+            FROM range({int(answers)}) AS rows(i)
+        ),
+        spaces AS (
+            SELECT i, length, CASE
+                WHEN length >= {MIN_PHRASE_LENGTH} AND {_draw(1000, 'i', '1', str(seed))} <= {PHRASE_FREQUENCY}
+                THEN 2 + hash(i, -1, {seed}) % (length - 4)
+                ELSE -1
+            END AS space
+            FROM lengths
+        ),
+        drawn AS (
+            SELECT i, array_to_string(
+                list_transform(range(length), p -> CASE WHEN p = space THEN ' ' ELSE {letter} END), ''
+            ) AS answer
+            FROM spaces
+        )
+        SELECT
+            'Synthetic clue ' || i AS clue,
+            answer,
+            lpad(bin({ALPHABIT}), 26, '0')::BIT AS alphabit
+        FROM drawn
+        """
+    )
+
+
+def build_synthetic(path: str, answers: int, seed: int = 0, preprocessed: bool = True):
+    """
+    Writes a synthetic dictionary to the DuckDB file at `path`, replacing its tables.
+
+    Arguments:
+        path -- database file
+        answers -- amount of clues
+
+    Keyword Arguments:
+        seed -- the same seed makes the same dictionary (default: {0})
+        preprocessed -- also build the answer tables of `en-preprocess` (default: {True})
+    """
+    conn = duckdb.connect(path)
+    try:
+        synthetic_clues(conn, answers, seed)
+        if preprocessed:
+            build_answers(conn)
+        conn.execute("CHECKPOINT")
+        logger.info("Wrote {} synthetic clues to {}", answers, path)
+    finally:
+        conn.close()
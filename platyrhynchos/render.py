@@ -0,0 +1,134 @@
+"""
+Batch rendering of many crosswords.
+
+Puzzles are written to the output file one at a time, rows are sliced from the flat grid buffer of every crossword
+and LaTeX files are compiled by a bounded pool of `xelatex` subprocesses, awaited asynchronously.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, TextIO
+
+from .commons.logger import logger
+from .crossword.addable import CrosswordAddable
+from .crossword.exolve_template import EXOLVE_TEMPLATE, Template, char_for_grid
+from .crossword.improvable import CrosswordImprovable
+from .visualize import write_code
+
+LATEX_COMMAND = ("xelatex", "-interaction=batchmode")
+
+# The template is split around the grid, so rows can be written without substituting them into one string
+_EXOLVE_HEAD, _EXOLVE_TAIL = EXOLVE_TEMPLATE.template.split("$grid")
+_EXOLVE_ROW_SEP = "\n    "
+
+
+def write_exolve(crossword: CrosswordImprovable, out: TextIO):
+    """Writes the same text as `CrosswordImprovable.as_exolve` to `out`, row by row"""
+    # pylint: disable=unpacking-non-sequence
+    size_x, size_y = crossword.max
+    out.write(Template(_EXOLVE_HEAD).substitute(width=size_x + 1, height=size_y + 1))
+    for n, row in enumerate(crossword.grid_rows(empty_field=".", coder=char_for_grid)):
+        if n:
+            out.write(_EXOLVE_ROW_SEP)
+        out.write(row)
+    out.write(_EXOLVE_TAIL)
+
+
+def write_exolve_batch(crosswords: Iterable[CrosswordImprovable], path: str | Path) -> int:
+    """
+    Streams the Exolve representations of the crosswords to a file.
+
+    Arguments:
+        crosswords -- crosswords to write, can be a generator
+        path -- output file
+
+    Returns:
+        number of written crosswords
+    """
+    written = 0
+    with open(path, "w", encoding="utf8") as out:
+        for crossword in crosswords:
+            write_exolve(crossword, out)
+            written += 1
+    return written
+
+
+async def compile_latex(
+    paths: Iterable[str | Path],
+    workers: int = 0,
+    output_dir: Optional[str | Path] = None,
+    command: Sequence[str] = LATEX_COMMAND,
+) -> list[int]:
+    """
+    Compiles LaTeX files in parallel, running at most `workers` compilers at once.
+
+    Arguments:
+        paths -- LaTeX files to compile
+
+    Keyword Arguments:
+        workers -- maximum number of running compilers, 0 uses the number of CPUs (default: {0})
+        output_dir -- directory for the results, the directory of each file if not given (default: {None})
+        command -- compiler and its options, the output directory and file are appended (default: {LATEX_COMMAND})
+
+    Returns:
+        return codes of the compilers, in the order of `paths`
+    """
+    slots = asyncio.Semaphore(workers or os.cpu_count() or 1)
+
+    async def run(path: Path) -> int:
+        async with slots:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                f"-output-directory={output_dir or path.parent}",
+                str(path),
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            code = await process.wait()
+        if code:
+            logger.warning("Compiling {} failed with code {}", path, code)
+        return code
+
+    return await asyncio.gather(*(run(Path(path)) for path in paths))
+
+
+async def render_latex(
+    crosswords: Iterable[CrosswordAddable],
+    directory: str | Path,
+    per_file: int = 10,
+    workers: int = 0,
+    command: Sequence[str] = LATEX_COMMAND,
+) -> list[Path]:
+    """
+    Writes the crosswords to LaTeX files of `per_file` crosswords each and compiles them to PDFs.
+    Each file is written as soon as its crosswords are drawn from `crosswords`.
+
+    Arguments:
+        crosswords -- crosswords to render, can be a generator
+        directory -- directory for the LaTeX files and the PDFs
+
+    Keyword Arguments:
+        per_file -- crosswords per file (default: {10})
+        workers -- maximum number of running compilers, 0 uses the number of CPUs (default: {0})
+        command -- compiler and its options (default: {LATEX_COMMAND})
+
+    Returns:
+        paths of the compiled PDFs, files that failed to compile are skipped
+    """
+    output = Path(directory)
+    output.mkdir(parents=True, exist_ok=True)
+    crosswords = iter(crosswords)
+    sources = []
+    while True:
+        path = output / f"crosswords_{len(sources) + 1}.tex"
+        with open(path, "w", encoding="utf8") as out:
+            written = write_code(islice(crosswords, per_file), out)
+        if not written:
+            path.unlink()
+            break
+        sources.append(path)
+    codes = await compile_latex(sources, workers, output, command)
+    return [path.with_suffix(".pdf") for path, code in zip(sources, codes) if code == 0]
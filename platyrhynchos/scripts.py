@@ -6,7 +6,14 @@ from os import remove as remove_file
 from .commons.utils import app_dir
 
 
+def _configure_logging():
+    from .commons.logger import configure_logging
+
+    configure_logging()
+
+
 def en_simple_prep():
+    _configure_logging()
     from .cruciverbalist.en_simple import EnglishSimpleCruciverbalist
 
     with suppress(FileNotFoundError):
@@ -14,14 +21,43 @@ def en_simple_prep():
     EnglishSimpleCruciverbalist()
 
 
+def en_simple_preprocess():
+    _configure_logging()
+    from .cruciverbalist.en_simple import EnglishSimpleCruciverbalist
+    from .exclusive.cpython import _db_path
+    from .exclusive.preprocess import preprocess
+
+    EnglishSimpleCruciverbalist()
+    preprocess(_db_path())
+
+
+def en_simple_parquet():
+    _configure_logging()
+    from .cruciverbalist.en_simple import EnglishSimpleCruciverbalist
+    from .exclusive.cpython import export_parquet
+
+    EnglishSimpleCruciverbalist()
+    path = app_dir("user_cache_dir", "en_simple.parquet")
+    export_parquet(path)
+    print(f"Parquet dictionary written to {path}")
+
+
 async def direct_run_routine():
     from asyncio import run
 
-    from .director.direct_search import generate_crossword
+    from .director import generate_crossword
 
     crossword = await generate_crossword(10, 10, 12)
     print(crossword, "\n", "\n".join(crossword.words))
 
 
 def direct_run():
+    _configure_logging()
     asyncio.run(direct_run_routine())
+
+
+def serve():
+    _configure_logging()
+    from .server import GenerationServer
+
+    asyncio.run(GenerationServer().serve_forever())
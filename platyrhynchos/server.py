@@ -0,0 +1,244 @@
+"""
+Long-lived generation service, started with `serve`.
+
+It keeps the cruciverbalist, its database connection and query cache warm between requests.
+The protocol is minimal HTTP/1.1 (one request per connection) over TCP or a Unix socket:
+
+- `POST /generate` with a JSON body `{"width": 10, "height": 10, "words": 12, "seed": 1}` (all optional)
+  returns `{"exolve": ..., "words": [...], "seed": ..., "generation_time": ...}`
+- `GET /metrics` returns request counters, latency percentiles (in seconds) and cache hit rates
+- `GET /health` returns `{"status": "ok"}`
+
+At most `concurrency` generations run at once, each in its own thread. Up to `max_queue` further requests wait for them,
+the ones beyond that are rejected with 503. Seeds make generations reproducible only with `concurrency = 1`,
+as the threads share the random generator.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Optional
+
+from .commons.exceptions import CrosswordException, DatabaseException
+from .commons.logger import logger
+from .commons.settings import ServerSettings, frozen_settings
+from .commons.utils import random, seeded_random
+from .crossword import CrosswordImprovable
+
+Runner = Callable[..., Awaitable[CrosswordImprovable]]
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Limits of a single generation request
+MAX_SIZE = 50
+MAX_WORDS = 200
+
+
+class RequestError(Exception):
+    """Request can't be served, `status` is the HTTP status code"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class Metrics:
+    """Request counters and latencies of the last `window` requests"""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queued = 0
+        self.running = 0
+
+    def observe(self, latency: float):
+        self.latencies.append(latency)
+
+    def as_dict(self) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queued": self.queued,
+            "running": self.running,
+            "latency": {
+                "p50": percentile(ordered, 0.5),
+                "p90": percentile(ordered, 0.9),
+                "p99": percentile(ordered, 0.99),
+                "max": ordered[-1] if ordered else 0.0,
+            },
+        }
+
+
+def _parse_int(params: dict[str, Any], name: str, default: int, maximum: int) -> int:
+    value = params.get(name, default)
+    if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= maximum:
+        raise RequestError(400, f"{name} has to be an integer between 1 and {maximum}")
+    return value
+
+
+class GenerationServer:
+    """Serves crossword generation requests, see the module docstring for the protocol"""
+
+    def __init__(self, settings: Optional[ServerSettings] = None, runner: Optional[Runner] = None) -> None:
+        """
+        Keyword Arguments:
+            settings -- server settings (default: {`settings.server`})
+            runner -- director generating the crosswords (default: {selected by `settings.components.runner`})
+        """
+        self.settings = settings or frozen_settings().server
+        self.runner = runner
+        self.metrics = Metrics(self.settings.latency_window)
+        self._slots = asyncio.Semaphore(self.settings.concurrency)
+
+    async def warm_up(self):
+        """Prepares the cruciverbalist and its database before the first request"""
+        from .director import get_runner
+        from .director.direct_search import get_cruciverbalist
+
+        if self.runner is None:
+            self.runner = get_runner()
+            await asyncio.to_thread(get_cruciverbalist)
+        logger.info("Generation server is warm")
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Hit rates of the caches of the cruciverbalist, if it was created and has any"""
+        from .director.direct_search import get_cruciverbalist
+
+        if get_cruciverbalist.cache_info().currsize == 0:
+            return {}
+        query_cache = getattr(get_cruciverbalist(), "query_cache", None)
+        return {"query": query_cache.stats()} if query_cache is not None else {}
+
+    def _generate(self, width: int, height: int, words: int, seed: int) -> CrosswordImprovable:
+        """Runs a generation in the calling thread"""
+        assert self.runner is not None
+        with seeded_random(seed):
+            return asyncio.run(self.runner(width, height, words))
+
+    async def generate(self, params: dict[str, Any]) -> dict[str, Any]:
+        """
+        Generates a crossword, waiting for a free slot if all are taken.
+
+        Raises:
+            RequestError: the parameters are wrong or the queue is full
+        """
+        width = _parse_int(params, "width", 10, MAX_SIZE)
+        height = _parse_int(params, "height", width, MAX_SIZE)
+        words = _parse_int(params, "words", 12, MAX_WORDS)
+        seed = params.get("seed")
+        if seed is None:
+            seed = random.getrandbits(31)
+        elif not isinstance(seed, int) or isinstance(seed, bool):
+            raise RequestError(400, "seed has to be an integer")
+
+        if self._slots.locked() and self.metrics.queued >= self.settings.max_queue:
+            self.metrics.rejected += 1
+            raise RequestError(503, "Too many requests are waiting")
+        self.metrics.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.metrics.queued -= 1
+        self.metrics.running += 1
+        try:
+            started = perf_counter()
+            crossword = await asyncio.to_thread(self._generate, width, height, words, seed)
+            generation_time = perf_counter() - started
+        finally:
+            self.metrics.running -= 1
+            self._slots.release()
+        return {
+            "exolve": crossword.as_exolve(),
+            "words": list(crossword.words),
+            "seed": seed,
+            "generation_time": generation_time,
+        }
+
+    async def route(self, method: str, path: str, body: bytes) -> dict[str, Any]:
+        if method == "GET" and path == "/health":
+            return {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            return self.metrics.as_dict() | {"caches": self.cache_stats()}
+        if method == "POST" and path == "/generate":
+            try:
+                params = json.loads(body or b"{}")
+            except ValueError as exception:
+                raise RequestError(400, f"Invalid JSON: {exception}") from exception
+            if not isinstance(params, dict):
+                raise RequestError(400, "The body has to be a JSON object")
+            return await self.generate(params)
+        raise RequestError(404, f"No route for {method} {path}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves a single HTTP request"""
+        started = perf_counter()
+        status, payload = 200, {}
+        timed = False
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            if len(request_line) != 3:
+                raise RequestError(400, "Malformed request line")
+            method, path, _ = request_line
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if not headers.get("content-length", "0").isdigit():
+                raise RequestError(400, "Invalid Content-Length")
+            body = await reader.readexactly(int(headers.get("content-length", "0")))
+            timed = path.split("?")[0] == "/generate"
+            if timed:
+                self.metrics.requests += 1
+            payload = await self.route(method, path.split("?")[0], body)
+        except RequestError as exception:
+            status, payload = exception.status, {"error": str(exception)}
+        except (CrosswordException, DatabaseException, asyncio.IncompleteReadError) as exception:
+            status, payload = 500, {"error": str(exception)}
+        except Exception as exception:  # pylint: disable=broad-except
+            # Every accepted request gets a response, whatever failed in the generation
+            logger.exception("Failed to serve a request")
+            status, payload = 500, {"error": f"{type(exception).__name__}: {exception}"}
+        if timed:
+            if status == 200:
+                self.metrics.observe(perf_counter() - started)
+            elif status != 503:
+                self.metrics.failed += 1
+
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Warms up and starts listening on the configured TCP address or Unix socket"""
+        await self.warm_up()
+        if self.settings.unix_socket:
+            server = await asyncio.start_unix_server(self.handle, path=self.settings.unix_socket)
+            logger.info("Listening on {}", self.settings.unix_socket)
+        else:
+            server = await asyncio.start_server(self.handle, self.settings.host, self.settings.port)
+            logger.info("Listening on http://{}:{}", self.settings.host, self.settings.port)
+        return server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
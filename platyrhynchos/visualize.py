@@ -1,6 +1,8 @@
 """Old LaTeX rendering library"""
-import os
+import asyncio
+from io import StringIO
 from string import ascii_letters
+from typing import Iterable, Optional, TextIO
 
 from .crossword.addable import CrosswordAddable
 
@@ -45,12 +47,23 @@ def cleanhint(s: str) -> str:
     return s
 
 
+def _letter_buffer(cross: CrosswordAddable, rows: int, columns: int) -> list[Optional[str]]:
+    """Returns the letters as one row-major list, with `None` for empty fields"""
+    buffer: list[Optional[str]] = [None] * (rows * columns)
+    for (i, j), letter in cross.letters.items():
+        if 0 <= i < rows and 0 <= j < columns:
+            buffer[i * columns + j] = letter
+    return buffer
+
+
 def gen_table(cross: CrosswordAddable):
     SYMBOLS = ascii_letters + EMPTY + "ąęóśłżźćń"
 
     hintnum = 0
     maxV, maxH = cross.max
-    minV, minH = cross.min
+    columns = maxH + 1
+    buffer = _letter_buffer(cross, maxV + 1, columns)
+    clued = cross.clues_horizontal.keys() | cross.clues_vertical.keys()
 
     table = []
     hintsH = []
@@ -58,14 +71,16 @@ def gen_table(cross: CrosswordAddable):
 
     for i in range(maxV + 1):
         t = []
-        for j in range(maxH + 1):
+        for j, add_symbol in enumerate(buffer[i * columns : (i + 1) * columns]):
             # Przetwarzanie wstępne
-            add_symbol = cross.letters.get((i, j))
             add_symbol = _cleantable.get(add_symbol, add_symbol)
 
             # Obsługa podpowiedzi
-            new_clues_horizontal = cross.clues_horizontal.get((i, j))
-            new_clues_vertical = cross.clues_vertical.get((i, j))
+            if (i, j) in clued:
+                new_clues_horizontal = cross.clues_horizontal.get((i, j))
+                new_clues_vertical = cross.clues_vertical.get((i, j))
+            else:
+                new_clues_horizontal = new_clues_vertical = None
 
             if new_clues_horizontal or new_clues_vertical:
                 hintnum += 1
@@ -108,29 +123,40 @@ def _gen_code(cross: CrosswordAddable):
     return rtable, rhintsH, rhintsV
 
 
-def gen_code(cross: list[CrosswordAddable]) -> str:
-    strings = [HEADER + "\n\n"]
-    for n, i in enumerate(cross):
+def write_code(cross: Iterable[CrosswordAddable], out: TextIO) -> int:
+    """
+    Writes a LaTeX document with the crosswords to `out`, one crossword at a time.
+
+    Arguments:
+        cross -- crosswords to write, can be a generator
+        out -- text stream to write to
+
+    Returns:
+        number of written crosswords
+    """
+    out.write(HEADER + "\n\n")
+    n = 0
+    for n, i in enumerate(cross, 1):
         rtable, rhintsH, rhintsV = _gen_code(i)
-        strings.append(
-            "\n\n".join(
-                (
-                    r"\section*{Krzyżówka %d}" % (n + 1),
-                    rtable,
-                    r"\newpage",
-                    rhintsH,
-                    rhintsV,
-                )
-            )
-        )
-    return r"\newpage".join(strings) + "\n\n" + FOOTER
+        out.write(r"\newpage")
+        out.write("\n\n".join((r"\section*{Krzyżówka %d}" % n, rtable, r"\newpage", rhintsH, rhintsV)))
+    out.write("\n\n" + FOOTER)
+    return n
+
+
+def gen_code(cross: list[CrosswordAddable]) -> str:
+    code = StringIO()
+    write_code(cross, code)
+    return code.getvalue()
 
 
 # \maxsizebox{\textwidth}{\textheight}{
 
 
 def render(code: str) -> None:
+    from .render import compile_latex
+
     with open("tmp/cross.tex", "w", encoding="utf8") as f:
         f.write(code)
 
-    os.system("xelatex tmp/cross.tex -quiet -output-directory=tmp")
+    asyncio.run(compile_latex(["tmp/cross.tex"], output_dir="tmp"))
@@ -0,0 +1,36 @@
+"""Test doubles shared by the test modules"""
+import re
+
+from platyrhynchos.crossword.colrow import ColRow
+from platyrhynchos.cruciverbalist import CruciverbalistBase
+
+WORDS = ["TEXT", "EXTRA", "NEXT", "TAXI", "EXIT", "AXE", "TEA", "ANT", "NET", "TEN", "EAT", "ART", "TAR", "RAT"]
+
+
+class ListCruciverbalist(CruciverbalistBase):
+    """Deterministic cruciverbalist with an in-memory word list, counting its lookups and batches"""
+
+    def __init__(self, words: list[str]) -> None:
+        self.words = words
+        self.lookups = 0
+        self.batches = 0
+
+    def eval_colrow(self, colrow: ColRow) -> float:
+        return -len(list(colrow.cross_words()))
+
+    async def select_by_regex(self, regexes: list[str], previous: list[str] | None = None) -> list[str]:
+        self.lookups += 1
+        for regex in regexes:
+            if found := [word for word in self.words if re.match(regex, word) and word not in (previous or ())]:
+                return found
+        return []
+
+    async def select_by_regex_batch(self, regexes: list[list[str]]) -> list[list[str]]:
+        self.batches += 1
+        return await super().select_by_regex_batch(regexes)
+
+    def eval_word(self, word: str, colrow: ColRow) -> int:
+        return len(word)
+
+    async def start_word(self, max_size: int) -> str:
+        return self.words[0]
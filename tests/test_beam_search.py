@@ -0,0 +1,59 @@
+import pytest
+from conftest import WORDS, ListCruciverbalist
+
+from platyrhynchos import director
+from platyrhynchos.commons import settings
+from platyrhynchos.commons.settings import ComponentsSettings, FrozenSettings
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+from platyrhynchos.director import beam_search, direct_search
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.fixture
+def cruciverbalist(monkeypatch):
+    cruciverbalist = ListCruciverbalist(WORDS)
+    monkeypatch.setattr(beam_search, "get_cruciverbalist", lambda: cruciverbalist)
+    return cruciverbalist
+
+
+def assert_consistent(crossword):
+    for word, coords in crossword.words.items():
+        assert "".join(crossword.letters[coord] for coord in sorted(coords)) == word
+
+
+@pytest.mark.asyncio
+async def test_beam_reaches_word_amount(cruciverbalist):
+    crossword = await beam_search.generate_crossword(6, 6, 5)
+    assert len(crossword.words) == 5
+    assert_consistent(crossword)
+    # One batched lookup per turn
+    assert cruciverbalist.batches == 4
+
+
+@pytest.mark.asyncio
+async def test_expand_leaves_beam_unchanged(cruciverbalist):
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    letters = dict(crossword.letters)
+    candidates = await beam_search.expand(cruciverbalist, [crossword], 4, 3)
+    assert candidates
+    assert crossword.letters == letters
+    assert list(crossword.words) == ["TEXT"]
+    assert all(words == 2 for (words, _), *_ in candidates)
+
+
+@pytest.mark.asyncio
+async def test_direct_search_with_prefetch(monkeypatch, cruciverbalist):
+    monkeypatch.setattr(direct_search, "get_cruciverbalist", lambda: cruciverbalist)
+    crossword = await direct_search.generate_crossword(6, 6, 5)
+    assert len(crossword.words) == 5
+    assert_consistent(crossword)
+
+
+def test_runner_from_settings(monkeypatch):
+    frozen = FrozenSettings(components=ComponentsSettings(runner="beam"))
+    monkeypatch.setattr(settings, "frozen_settings", lambda: frozen)
+    assert director.get_runner() is beam_search.generate_crossword
+    assert director.get_runner("") is direct_search.generate_crossword
+    with pytest.raises(ValueError):
+        director.get_runner("unknown")
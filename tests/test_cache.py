@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from platyrhynchos.commons.cache import DeadEnds, Prefetcher, QueryCache
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_query_cache():
+    cache = QueryCache(maxsize=2)
+    cache.put("a", ["A"])
+    cache.put("b", ["B"])
+    assert cache.get("a") == ["A"]
+    cache.put("c", ["C"])
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_query_cache_items():
+    cache = QueryCache(maxsize=2)
+    cache.update([("a", ["A"]), ("b", ["B"]), ("c", ["C"])])
+    assert cache.items() == [("b", ["B"]), ("c", ["C"])]
+    restored = QueryCache(maxsize=2)
+    restored.update(cache.items())
+    assert restored.get("b") == ["B"]
+    assert restored.items() == [("c", ["C"]), ("b", ["B"])]
+
+
+def test_dead_ends_need_excluded_words():
+    dead_ends = DeadEnds()
+    dead_ends.add(("A", None), {"AB", "CD"}, queries=2)
+    assert not dead_ends.is_dead(("A", None), {"AB"})
+    assert not dead_ends.is_dead(("A", "B"), {"AB", "CD"})
+    assert dead_ends.is_dead(("A", None), {"AB", "CD", "EF"})
+    assert dead_ends.stats() == {"dead": 1, "skipped": 1, "avoided_queries": 2}
+
+
+@pytest.mark.asyncio
+async def test_prefetcher_limit():
+    running, most = 0, 0
+
+    async def lookup():
+        nonlocal running, most
+        running += 1
+        most = max(most, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return []
+
+    prefetcher = Prefetcher(limit=2)
+    for pattern in range(5):
+        prefetcher.start(pattern, set(), lookup)
+    await asyncio.gather(*(prefetcher.take(pattern, set()) for pattern in range(5)))
+    assert most == 2
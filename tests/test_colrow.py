@@ -0,0 +1,17 @@
+import pytest
+
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+
+
+def test_perpendicular_runs():
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    crossword.add("EAT", (True, 1))
+    assert list(crossword.colrow(True, 0).perpendicular_runs("TAR")) == ["AA", "RT"]
+    assert list(crossword.colrow(True, 3).perpendicular_runs("TEN")) == []
+    assert list(crossword.colrow(False, 1).perpendicular_runs("AN")) == ["XN"]
+
+
+def test_coords_use_the_grid_size(monkeypatch):
+    monkeypatch.setattr(CrosswordImprovable, "max", property(lambda _: pytest.fail("Computed the size from letters")))
+    crossword = CrosswordImprovable({}, 3, 2, {})
+    assert sorted(len(colrow.get_coords()) for colrow in crossword.iter_colrows()) == [2, 2, 2, 3, 3]
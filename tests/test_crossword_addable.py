@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from platyrhynchos.crossword import addable
+from platyrhynchos.crossword.addable import CrosswordAddable, WordIndex
+
+WORDS = {
+    "Not any more": "EXTINCT",
+    "Additional": "EXTRA",
+    "Written words": "TEXT",
+    "Following": "NEXT",
+    "Broken": "KAPUT",
+    "Takes photos": "CAMERA",
+    "Hum": "ZZZ",
+}
+
+
+@pytest.fixture
+def words_file(tmp_path, monkeypatch):
+    path = tmp_path / "words.json"
+    path.write_text(json.dumps(WORDS), encoding="utf8")
+    addable.word_index.cache_clear()
+    monkeypatch.setattr(addable, "WORDS_FILE", str(path))
+    yield path
+    addable.word_index.cache_clear()
+
+
+def test_index_groups():
+    index = WordIndex(WORDS.items())
+    assert len(index) == len(WORDS)
+    assert {index.items[n][1] for n in index.by_letter["X"]} == {"EXTINCT", "EXTRA", "TEXT", "NEXT"}
+    assert {index.items[n][1] for n in index.by_letter["Z"]} == {"ZZZ"}
+    assert index.by_letter["Z"] == [len(WORDS) - 1]
+
+
+def test_sample_excludes():
+    index = WordIndex(WORDS.items())
+    drawn = index.sample(len(WORDS), exclude={"TEXT", "NEXT"})
+    assert len(drawn) == len(set(drawn)) == len(WORDS) - 2
+    assert not {"TEXT", "NEXT"} & {word for _, word in drawn}
+
+
+def test_sample_crossing_shares_letters():
+    index = WordIndex(WORDS.items())
+    drawn = index.sample_crossing({"X": 1}, 10, exclude={"EXTRA"})
+    assert {word for _, word in drawn} == {"EXTINCT", "TEXT", "NEXT"}
+
+
+def test_create_loads_lazily(words_file):
+    crosswords = list(CrosswordAddable.create(3, add=True))
+    assert len(crosswords) == 3
+    assert all(word.strip("+ ") in WORDS.values() for c in crosswords for word in c.words)
+    assert addable.word_index.cache_info().misses == 1
+
+
+def test_create_for_crosses(words_file):
+    crossword = next(CrosswordAddable.createFrom({"Written words": "+TEXT "}))
+    assert crossword.plain_words == {"TEXT"}
+    created = list(crossword.createFor(10, add=True))
+    words = {word.strip("+ ") for c in created for word in c.words}
+    assert "TEXT" not in words
+    assert "ZZZ" not in words
+    assert words
+    for other in created:
+        assert crossword.combine(other.rotate()) is not None
+
+
+def test_letter_index():
+    crossword = CrosswordAddable.construct("TEXT", "Written words")
+    assert crossword.letter_index == {"T": [(0, 0), (0, 3)], "E": [(0, 1)], "X": [(0, 2)]}
+    assert crossword.letter_index is crossword.letter_index
+
+
+def test_overlap():
+    text = CrosswordAddable.construct("TEXT", "Written words")
+    extra = CrosswordAddable.construct("EXTRA", "Additional").rotate()
+    # EXTRA crossing TEXT at its X shares only that field
+    assert text._overlap(extra, (0, 2), (1, 0)) == {(0, 2)}
+    # Laid along TEXT, EXTRA shares EXT with it
+    assert text._overlap(extra.rotate(), (0, 1), (0, 0)) == {(0, 1), (0, 2), (0, 3)}
+    # TAXI laid along TEXT from their T puts A on E
+    assert text._overlap(CrosswordAddable.construct("TAXI", "Cab"), (0, 0), (0, 0)) is None
+
+
+def test_combine_tries_smallest_first(monkeypatch):
+    text = CrosswordAddable.construct("TEXT", "Written words")
+    other = CrosswordAddable.construct("EXTINCT", "Not any more").rotate()
+    expected = sorted(text._check_crossings(other), key=lambda x: text._calc_size_change(x[0], x[1], other.max))
+    tried = []
+    monkeypatch.setattr(CrosswordAddable, "_overlap", lambda self, other, p1, p2: tried.append((p1, p2)))
+    assert text.combine(other, T=-1) is None
+    assert tried == expected
+
+
+def test_clues_survive_rotate_and_relative():
+    crossword = CrosswordAddable.construct("TEXT", "Written words")
+    rotated = crossword.rotate()
+    assert rotated.clues_vertical == {(0, 0): "Written words"} and rotated.clues_horizontal == {}
+    assert rotated.rotate().clues_horizontal == crossword.clues_horizontal
+    moved = crossword.relative((0, 2))
+    assert moved.clues_horizontal == {(0, -2): "Written words"}
+    combined = crossword.combine(CrosswordAddable.construct("EXTRA", "Additional").rotate())
+    assert set(combined.clues_horizontal.values()) == {"Written words"}
+    assert set(combined.clues_vertical.values()) == {"Additional"}
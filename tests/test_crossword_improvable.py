@@ -1,3 +1,9 @@
+import pickle
+
+import pytest
+
+from platyrhynchos.commons.exceptions import CrosswordException, FormatException, TooLargeException
+from platyrhynchos.commons.misc import MAX_INTERNED, coord
 from platyrhynchos.crossword.improvable import CrosswordImprovable
 
 
@@ -49,3 +55,128 @@ def test_rotate_3x2():
     }
     assert crossword.words_vertical == {"ABC": {(0, 0), (1, 0), (2, 0)}, "DEF": {(0, 1), (1, 1), (2, 1)}}
     assert crossword.words_horizontal == {}
+
+
+def test_make_coords_match_letters():
+    crossword = CrosswordImprovable.make("ABC", 5)
+    assert crossword.words_horizontal == {"ABC": set(crossword.letters)}
+    assert crossword.letters == {(0, 0): "A", (1, 0): "B", (2, 0): "C"}
+
+
+def test_add_and_undo():
+    crossword = CrosswordImprovable.make("ABC", 5)
+    crossword.add("BAD", (True, 1))
+    assert crossword.words_vertical == {"BAD": {(1, 0), (1, 1), (1, 2)}}
+    assert crossword.crossings == {(1, 0)}
+
+    crossword.undo()
+    assert crossword.letters == {(0, 0): "A", (1, 0): "B", (2, 0): "C"}
+    assert crossword.words_vertical == {}
+    assert crossword.crossings == set()
+
+
+def test_failed_add_changes_nothing():
+    crossword = CrosswordImprovable.make("ABC", 5)
+    crossword.add("BAD", (True, 1))
+    with pytest.raises(CrosswordException):
+        crossword.add("EBBED", (False, 1))
+    assert crossword.letters == {(0, 0): "A", (1, 0): "B", (2, 0): "C", (1, 1): "A", (1, 2): "D"}
+    assert crossword.words == {"ABC": {(0, 0), (1, 0), (2, 0)}, "BAD": {(1, 0), (1, 1), (1, 2)}}
+    assert crossword.crossings == {(1, 0)}
+
+
+def test_undo_without_add():
+    with pytest.raises(CrosswordException):
+        CrosswordImprovable.make("ABC", 5).undo()
+
+
+def test_copy_is_independent():
+    crossword = CrosswordImprovable.make("ABC", 5)
+    copied = crossword.copy()
+    copied.add("BAD", (True, 1))
+    assert "BAD" not in crossword.words
+    assert (1, 1) not in crossword.letters
+    copied.undo()
+    assert copied.letters == crossword.letters
+    with pytest.raises(TooLargeException):
+        copied.add_letter((6, 0), "X")
+
+
+def assert_same(crossword, other):
+    assert other.letters == crossword.letters
+    assert other.words_horizontal == crossword.words_horizontal
+    assert other.words_vertical == crossword.words_vertical
+    assert other.crossings == crossword.crossings
+    assert (other.max_h, other.max_v) == (crossword.max_h, crossword.max_v)
+
+
+def test_bytes_round_trip():
+    crossword = CrosswordImprovable.make("TEXT", 6, 5)
+    crossword.add("EXTRA", (True, 1))
+    crossword.add("TAŻ", (False, 3))
+    crossword.add("TEN", (True, 3))
+    data = crossword.to_bytes()
+    assert_same(crossword, CrosswordImprovable.from_bytes(data))
+    assert len(data) < len(pickle.dumps(crossword.words))
+
+
+def test_bytes_outside_of_grid():
+    crossword = CrosswordImprovable({(-1, 0): "A", (5, 2): "B"}, 5, 3, {})
+    assert_same(crossword, CrosswordImprovable.from_bytes(crossword.to_bytes()))
+    assert_same(
+        CrosswordImprovable({}, 2, 2, {}), CrosswordImprovable.from_bytes(CrosswordImprovable({}, 2, 2, {}).to_bytes())
+    )
+
+
+@pytest.mark.parametrize("data", [b"", b"XXXX" + bytes(18), CrosswordImprovable.make("ABC", 5).to_bytes()[:-1]])
+def test_bytes_invalid(data):
+    with pytest.raises(FormatException):
+        CrosswordImprovable.from_bytes(data)
+
+
+def test_pickle_uses_bytes():
+    crossword = CrosswordImprovable.make("ABC", 5)
+    crossword.add("BAD", (True, 1))
+    assert_same(crossword, pickle.loads(pickle.dumps(crossword)))
+
+
+def test_colrows_are_reused():
+    crossword = CrosswordImprovable.make("TEXT", 6, 4)
+    colrow = crossword.colrow(True, 1)
+    assert crossword.colrow(True, 1) is colrow
+    assert colrow in list(crossword.iter_colrows())
+    assert len(list(crossword.iter_colrows())) == 10
+    crossword.add("EAT", colrow)
+    assert colrow.get() == ["E", "A", "T", None]
+    assert crossword.copy().colrow(True, 1).crossword is not crossword
+
+    crossword.rotate()
+    assert crossword.colrow(False, 1) is not colrow
+    assert crossword.colrow(False, 1).get() == ["E", "A", "T", None]
+
+
+def test_coords_are_interned():
+    first = CrosswordImprovable.make("TEXT", 6)
+    second = CrosswordImprovable.from_bytes(first.to_bytes())
+    assert all(any(coord is other for other in first.letters) for coord in second.letters)
+    assert first.colrow(False, 0).get_coords() is second.colrow(False, 0).get_coords()
+    assert coord(2, 3) is coord(2, 3) == (2, 3)
+    # Fields outside of the interned grids are equal tuples, but not kept
+    assert coord(-1, MAX_INTERNED) is not coord(-1, MAX_INTERNED)
+    assert coord(-1, MAX_INTERNED) == (-1, MAX_INTERNED)
+
+
+def test_merge():
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    crossword.add("EAT", (True, 1))
+    grid = CrosswordImprovable({}, 10, 10, {})
+    assert grid.merge(crossword, (4, 5)) == ["TEXT", "EAT"]
+    assert grid.words["EAT"] == {(5, 5), (5, 6), (5, 7)}
+    assert grid.crossings == {(5, 5)}
+    # Known words, clashing letters and words outside of the grid are skipped
+    assert grid.merge(crossword, (4, 5)) == []
+    assert grid.merge(CrosswordImprovable.make("AXE", 6), (4, 6)) == []
+    assert grid.merge(CrosswordImprovable.make("NEXT", 6), (7, 0)) == []
+    grid.undo()
+    assert list(grid.words) == ["TEXT"]
+    assert grid.crossings == set()
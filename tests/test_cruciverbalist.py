@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from conftest import WORDS, ListCruciverbalist
+
+from platyrhynchos.commons.cache import DeadEnds, Prefetcher
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+from platyrhynchos.director import direct_search
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class DictionaryCruciverbalist(ListCruciverbalist):
+    async def dictionary(self):
+        return set(self.words)
+
+
+class FirstWordCruciverbalist(ListCruciverbalist):
+    """Returns only the first word found by batches, like a lookup with a limit"""
+
+    async def select_by_regex_batch(self, regexes: list[list[str]]) -> list[list[str]]:
+        return [found[:1] for found in await super().select_by_regex_batch(regexes)]
+
+
+@pytest.mark.asyncio
+async def test_find_words_batch_excludes_after_limit():
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    colrow = crossword.colrow(True, 0)
+    (found,) = await FirstWordCruciverbalist(["TEXT", "TAR"]).find_words_batch([colrow])
+    assert found == [("TAR", colrow)]
+
+
+@pytest.mark.asyncio
+async def test_find_word_skips_dead_ends():
+    cruciverbalist = ListCruciverbalist(["TEXT", "EAT"])
+    crossword = CrosswordImprovable.make("TEXT", 4, 3)
+    crossword.add("EAT", (True, 1))
+    dead_ends = DeadEnds()
+    colrows = list(crossword.iter_colrows())
+    assert await cruciverbalist.find_word(colrows, dead_ends) == (None, None)
+    lookups, skipped = cruciverbalist.lookups, dead_ends.skipped
+    assert lookups > 0 and len(dead_ends) == lookups
+    assert await cruciverbalist.find_word(colrows, dead_ends) == (None, None)
+    assert cruciverbalist.lookups == lookups
+    assert dead_ends.skipped == skipped + len(colrows)
+    assert dead_ends.avoided_queries >= dead_ends.skipped
+
+    # Removing EAT changes the pattern of its column, so it's looked up again
+    crossword.undo()
+    word, _ = await cruciverbalist.find_word(list(crossword.iter_colrows()), dead_ends)
+    assert word == "EAT"
+
+
+@pytest.mark.asyncio
+async def test_find_words_validates_runs():
+    words = ["TEXT", "EAT", "TAR", "TEA", "EA", "AT"]
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    crossword.add("EAT", (True, 1))
+    colrow = crossword.colrow(True, 0)
+    assert {word for word, _ in await ListCruciverbalist(words).find_words(colrow)} == {"TAR", "TEA"}
+    assert [word for word, _ in await DictionaryCruciverbalist(words).find_words(colrow)] == ["TEA"]
+    (found,) = await DictionaryCruciverbalist(words).find_words_batch([colrow])
+    assert [word for word, _ in found] == ["TEA"]
+
+
+@pytest.mark.asyncio
+async def test_dead_ends_with_run_validation():
+    cruciverbalist = DictionaryCruciverbalist(["TEXT", "EAT", "TAR"])
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    crossword.add("EAT", (True, 1))
+    first, last = crossword.colrow(True, 0), crossword.colrow(True, 3)
+    assert first.get() == last.get()
+    dead_ends = DeadEnds()
+    # TAR makes runs that aren't words next to EAT, but not at the other end of TEXT
+    assert await cruciverbalist.find_word(first, dead_ends) == (None, None)
+    assert await cruciverbalist.find_word(last, dead_ends) == ("TAR", last)
+
+
+@pytest.mark.asyncio
+async def test_find_words_uses_prefetched():
+    cruciverbalist = ListCruciverbalist(WORDS)
+    crossword = CrosswordImprovable.make("TEXT", 6, 6)
+    word, colrow = await cruciverbalist.find_word(crossword.colrow(True, 1))
+    crossword.add(word, colrow)
+    prefetcher = Prefetcher(limit=2)
+    changed = direct_search.changed_colrows(crossword, word, colrow)
+    assert changed[0] is colrow and len(changed) == len(word) + 1
+    before = cruciverbalist.lookups
+    cruciverbalist.prefetch(changed, prefetcher)
+    await asyncio.sleep(0)
+    lookups = cruciverbalist.lookups
+    assert lookups - before == len(prefetcher) == prefetcher.started > 0
+
+    expected = await cruciverbalist.find_words(changed[1])
+    assert await cruciverbalist.find_words(changed[1], prefetcher) == expected
+    assert cruciverbalist.lookups == lookups + 1
+    assert prefetcher.used == 1
+
+    # Results looked up before another word was added aren't used
+    crossword.add("AXE", (False, 3))
+    await cruciverbalist.find_words(changed[2], prefetcher)
+    assert prefetcher.used == 1 and prefetcher.wasted == 1
+    prefetcher.clear()
+    assert len(prefetcher) == 0
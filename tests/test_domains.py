@@ -0,0 +1,125 @@
+import pytest
+
+from platyrhynchos.commons.cache import QueryCache
+from platyrhynchos.crossword.domains import (
+    FULL_DOMAIN,
+    LETTERS_DOMAIN,
+    LetterMasks,
+    domain_letters,
+    letter_bit,
+    parse_pattern,
+)
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+from platyrhynchos.cruciverbalist import en_simple
+from platyrhynchos.exclusive import queries
+
+pytest_plugins = ("pytest_asyncio",)
+
+WORDS = ["TEXT", "EXTRA", "NEXT", "TAXI", "AXE", "A B"]
+
+
+@pytest.mark.parametrize(
+    "regex, expected",
+    [
+        ("^.{0,2}A.{1}B$", (2, [letter_bit("A"), FULL_DOMAIN, letter_bit("B")], 0)),
+        ("^.{0,3}XT.{0,4}$", (3, [letter_bit("X"), letter_bit("T")], 4)),
+        ("^.{0,5}$", (5, [], 0)),
+        (r"^A\ B$", (0, [letter_bit("A"), letter_bit(" "), letter_bit("B")], 0)),
+        ("^A.B$", None),
+        ("^.{0,2}A.{0,2}B$", None),
+        ("^A*$", None),
+    ],
+)
+def test_parse_pattern(regex, expected):
+    assert parse_pattern(regex) == expected
+
+
+def test_parsers_agree():
+    crossword = CrosswordImprovable.make("A BULL", 8, 8)
+    crossword.add("TAXI", (True, 2))
+    regexes = {regex for colrow in crossword.iter_colrows() for regex in colrow.yield_regexes()}
+    assert regexes
+    for regex in regexes:
+        before, core, after = parse_pattern(regex)
+        bounds = queries.pattern_bounds(regex)
+        assert (bounds.min_length, bounds.max_length) == (len(core), before + len(core) + after)
+
+
+def test_allowed_letters():
+    masks = LetterMasks.from_words(WORDS)
+    assert domain_letters(masks.allowed("^.{0,3}XT.{0,4}$")) == "AENRTX"
+    assert masks.allowed("^.{0,3}Q.{0,4}$") == 0
+    # No word has an X as its first letter
+    assert masks.allowed("^X.{0,4}$") == 0
+    assert domain_letters(masks.allowed("^.{0,3}$")) == "ABEX_"
+
+
+def test_line_domains_follow_letters():
+    masks = LetterMasks.from_words(WORDS)
+    crossword = CrosswordImprovable.make("TEXT", 4, 5)
+    assert [domain_letters(i) for i in crossword.line_domains(False, 0, masks)] == ["T", "E", "X", "T"]
+    before = crossword.domain((0, 1), masks)
+
+    crossword.add("EXTRA", (True, 1))
+    # Row 1 only fits AXE and column 0 only fits words going down from its T
+    assert domain_letters(crossword.domain((0, 1), masks)) == "AE"
+    # No word has a T on its first or second field
+    assert not any(crossword.line_domains(False, 2, masks))
+    crossword.undo()
+    assert crossword.domain((0, 1), masks) == before
+
+
+def test_line_domains_need_a_crossing():
+    masks = LetterMasks.from_words(WORDS)
+    crossword = CrosswordImprovable.make("TEXT", 8, 5)
+    crossword.add("TAXI", (True, 0))
+    # Words fit the empty fields of row 3, but none of them can cross its I
+    assert masks.placements([FULL_DOMAIN] * 7) != [0] * 7
+    assert not any(crossword.line_domains(False, 3, masks))
+    assert [domain_letters(i) for i in crossword.line_domains(False, 1, masks)] == ["A", "X_", "BE", "", "", "", "", ""]
+
+
+@pytest.fixture
+def cruciverbalist(monkeypatch):
+    requests = []
+
+    async def get_regex_batch(batch, limit=100, ranked=False):
+        requests.extend(batch)
+        return [[] for _ in batch]
+
+    async def get_letter_masks():
+        return LetterMasks.from_words(WORDS).masks
+
+    monkeypatch.setattr(en_simple, "get_regex_batch", get_regex_batch)
+    monkeypatch.setattr(en_simple, "get_letter_masks", get_letter_masks)
+    cruciverbalist = en_simple.EnglishSimpleCruciverbalist.__new__(en_simple.EnglishSimpleCruciverbalist)
+    cruciverbalist.RUN_WITH_ALPHABIT = False
+    cruciverbalist.RANKED = False
+    cruciverbalist.TOP_K = 10
+    cruciverbalist.PRUNE_PATTERNS = True
+    cruciverbalist.letter_masks = None
+    cruciverbalist.query_cache = QueryCache(100)
+    cruciverbalist.requests = requests
+    return cruciverbalist
+
+
+@pytest.mark.asyncio
+async def test_dead_patterns_skip_queries(cruciverbalist):
+    crossword = CrosswordImprovable.make("TEXT", 4, 5)
+    crossword.add("EXTRA", (True, 1))
+    assert await cruciverbalist.find_words(crossword.colrow(False, 2)) == []
+    assert cruciverbalist.requests == []
+
+    await cruciverbalist.select_by_regex(["^.{0,3}XT.{0,4}$", "^Q.{0,3}$"])
+    regex, _, forbidden = cruciverbalist.requests[0]
+    assert len(cruciverbalist.requests) == 1 and regex == "^.{0,3}XT.{0,4}$"
+    assert forbidden == LETTERS_DOMAIN & ~LetterMasks.from_words(WORDS).allowed(regex)
+    assert cruciverbalist.query_cache.get("^Q.{0,3}$") == []
+
+
+@pytest.mark.asyncio
+async def test_line_without_crossing_word_is_dead(cruciverbalist):
+    crossword = CrosswordImprovable.make("TEXT", 8, 5)
+    crossword.add("TAXI", (True, 0))
+    assert await cruciverbalist.is_dead(crossword.colrow(False, 3))
+    assert not await cruciverbalist.is_dead(crossword.colrow(False, 1))
@@ -0,0 +1,103 @@
+import json
+from hashlib import md5
+
+import pytest
+
+from platyrhynchos.commons.exceptions import DatabaseException
+from platyrhynchos.exclusive.download import S3Downloader
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+BUCKET = "letterfowl-test"
+KEY = "en_simple.db"
+CONTENT = bytes(range(256)) * 40  # 10240 bytes, 10 ranges of 1 KiB
+CHUNK_SIZE = 1024
+
+
+class CountingClient:
+    """Wraps the S3 client and records requested ranges"""
+
+    def __init__(self, client):
+        self.client = client
+        self.ranges = []
+
+    def head_object(self, **kwargs):
+        return self.client.head_object(**kwargs)
+
+    def get_object(self, **kwargs):
+        self.ranges.append(kwargs["Range"])
+        return self.client.get_object(**kwargs)
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        client.put_object(Bucket=BUCKET, Key=KEY, Body=CONTENT)
+        yield CountingClient(client)
+
+
+@pytest.fixture
+def downloader(s3_client):
+    return S3Downloader(s3_client, BUCKET, chunk_size=CHUNK_SIZE, workers=3)
+
+
+def test_download(downloader, tmp_path):
+    path = str(tmp_path / "words.db")
+    assert downloader.download(KEY, path)
+    assert open(path, "rb").read() == CONTENT
+    assert len(downloader.client.ranges) == 10
+    assert sorted(i.name for i in tmp_path.iterdir()) == ["words.db", "words.db.json"]
+
+
+def test_skips_current_file(downloader, tmp_path):
+    path = str(tmp_path / "words.db")
+    downloader.download(KEY, path)
+    downloader.client.ranges.clear()
+    assert not downloader.download(KEY, path)
+    assert downloader.client.ranges == []
+
+
+def test_redownloads_changed_object(downloader, tmp_path):
+    path = str(tmp_path / "words.db")
+    downloader.download(KEY, path)
+    downloader.client.client.put_object(Bucket=BUCKET, Key=KEY, Body=CONTENT[::-1])
+    assert downloader.download(KEY, path)
+    assert open(path, "rb").read() == CONTENT[::-1]
+
+
+def test_resumes_partial_download(downloader, tmp_path):
+    path = str(tmp_path / "words.db")
+    remote = downloader.head(KEY)
+    with open(f"{path}.part", "wb") as f:
+        f.write(CONTENT[: 4 * CHUNK_SIZE])
+        f.truncate(len(CONTENT))
+    with open(f"{path}.part.json", "w", encoding="utf8") as f:
+        json.dump({"etag": remote.etag, "size": remote.size, "chunk_size": CHUNK_SIZE, "done": [0, 1, 2, 3]}, f)
+
+    assert downloader.download(KEY, path)
+    assert open(path, "rb").read() == CONTENT
+    assert sorted(downloader.client.ranges) == sorted(
+        f"bytes={i * CHUNK_SIZE}-{(i + 1) * CHUNK_SIZE - 1}" for i in range(4, 10)
+    )
+
+
+def test_detects_corruption(downloader, tmp_path):
+    path = str(tmp_path / "words.db")
+    remote = downloader.head(KEY)
+    with open(f"{path}.part", "wb") as f:
+        f.write(b"\0" * len(CONTENT))
+    with open(f"{path}.part.json", "w", encoding="utf8") as f:
+        json.dump({"etag": remote.etag, "size": remote.size, "chunk_size": CHUNK_SIZE, "done": list(range(10))}, f)
+
+    with pytest.raises(DatabaseException):
+        downloader.download(KEY, path)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_md5_from_etag(downloader):
+    assert downloader.head(KEY).md5 == md5(CONTENT).hexdigest()
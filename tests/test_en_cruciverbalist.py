@@ -5,6 +5,7 @@ import pytest
 from platyrhynchos import CrosswordImprovable
 from platyrhynchos.commons.alphabit import MAX_ALPHABIT, Alphabit
 from platyrhynchos.cruciverbalist.en_simple import EnglishSimpleCruciverbalist
+from platyrhynchos.exclusive import cpython
 from platyrhynchos.exclusive.cpython import cursor_execute
 
 pytest_plugins = ("pytest_asyncio",)
@@ -23,6 +24,14 @@ SAMPLE_WORDS = [
 ]
 
 
+@pytest.fixture(scope="module", autouse=True)
+def database(tmp_path_factory):
+    """Keeps the downloaded database under pytest's temporary directory, not in the application directories"""
+    cpython.use_database(str(tmp_path_factory.mktemp("database") / "words.db"))
+    yield
+    cpython.use_database(None)
+
+
 @pytest.fixture
 def crossword1():
     return CrosswordImprovable(
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).parents[1]
+
+# Budget for the cumulative import time of `platyrhynchos` (in microseconds, as reported by `-X importtime`)
+IMPORT_BUDGET_US = 50_000
+
+
+def run_python(code: str, cwd: Path = REPO_ROOT, *flags: str) -> subprocess.CompletedProcess:
+    env = os.environ | {"PYTHONPATH": str(REPO_ROOT)}
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def cumulative_import_time(module: str) -> int:
+    """Returns the cumulative import time of `module` in microseconds"""
+    stderr = run_python(f"import {module}", REPO_ROOT, "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if name.strip() == module:
+            return int(cumulative_us)
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_import_under_budget():
+    assert cumulative_import_time("platyrhynchos") < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize("module", ["loguru", "dynaconf", "duckdb", "boto3", "requests", "tqdm"])
+def test_import_skips_heavy_modules(module):
+    result = run_python(f"import sys, platyrhynchos; print({module!r} in sys.modules)")
+    assert result.stdout.strip() == "False"
+
+
+def test_lazy_attributes():
+    result = run_python("import platyrhynchos; print(platyrhynchos.CrosswordImprovable.__name__)")
+    assert result.stdout.strip() == "CrosswordImprovable"
+
+
+def test_director_import_does_no_io(tmp_path):
+    result = run_python("import sys, platyrhynchos.director.direct_search; print('duckdb' in sys.modules)", tmp_path)
+    assert result.stdout.strip() == "False"
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,63 @@
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from platyrhynchos.commons import logger as logger_module
+from platyrhynchos.commons.logger import configure_logging, debug_enabled, logger
+from platyrhynchos.commons.settings import LogsSettings
+from platyrhynchos.crossword.colrow import ColRow
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+
+
+@pytest.fixture
+def written():
+    messages = []
+    yield messages
+    configure_logging()
+
+
+def test_level_checked_before_formatting(written, monkeypatch):
+    configure_logging(LogsSettings(level="INFO", enqueue=False), written.append)
+    assert not debug_enabled()
+
+    def fail():
+        raise AssertionError("Formatted a dropped record")
+
+    logger.opt(lazy=True).debug("{}", fail)
+    monkeypatch.setattr(ColRow, "__repr__", lambda _: fail())
+    crossword = CrosswordImprovable.make("TEXT", 5)
+    for colrow in crossword.iter_colrows():
+        list(colrow.yield_regexes())
+    logger.info("Kept {}", 1)
+    assert [message.record["message"] for message in written] == ["Kept 1"]
+
+
+def test_standard_logging_intercepted(written, monkeypatch):
+    configure_logging(LogsSettings(level="WARNING", enqueue=False), written.append)
+    monkeypatch.setattr(logger_module.sys, "_getframe", lambda _: pytest.fail("Walked frames of a dropped record"))
+    logging.getLogger("other").info("Dropped")
+    monkeypatch.undo()
+    logging.getLogger("other").warning("Kept")
+    assert [message.record["message"] for message in written] == ["Kept"]
+
+
+def test_enqueued_sink(written):
+    configure_logging(LogsSettings(level="DEBUG", enqueue=True), written.append)
+    assert debug_enabled()
+    logger.debug("Queued {}", "record")
+    logger.complete()
+    assert [message.record["message"] for message in written] == ["Queued record"]
+
+
+def test_import_keeps_sinks():
+    code = (
+        "import sys; from loguru import logger; logger.remove(); logger.add(sys.stdout, format='{message}'); "
+        "import platyrhynchos.director.direct_search; logger.info('Kept')"
+    )
+    env = os.environ | {"PYTHONPATH": str(Path(__file__).parents[1])}
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "Kept"
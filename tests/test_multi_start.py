@@ -0,0 +1,90 @@
+import asyncio
+import pickle
+import time
+from random import Random
+
+import pytest
+
+from platyrhynchos.commons.exceptions import CrosswordException, TooLargeException
+from platyrhynchos.commons.utils import random
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+from platyrhynchos.director import multi_start
+
+pytest_plugins = ("pytest_asyncio",)
+
+START_WORDS = ["AB", "ABCD", "ABC", "SLOW"]
+
+
+class StartWords:
+    async def start_words(self, max_size: int, amount: int) -> list[str]:
+        return START_WORDS[:amount]
+
+
+async def fake_runner(width, height, word_amount, start_word=None):
+    if start_word == "SLOW":
+        await asyncio.sleep(10)
+    if start_word == "AB":
+        raise CrosswordException("No words")
+    return CrosswordImprovable.make(start_word, width, height)
+
+
+@pytest.fixture
+def fake_runs(monkeypatch):
+    monkeypatch.setattr(multi_start, "get_cruciverbalist", lambda: StartWords())
+    monkeypatch.setattr(multi_start, "get_runner", lambda _: fake_runner)
+
+
+def test_goals():
+    crossword = CrosswordImprovable.make("ABCD", 4, 2)
+    crossword.add("BE", (True, 1))
+    assert multi_start.fill_ratio(crossword) == 5 / 8
+    assert multi_start.crossings(crossword) == 1 / 5
+    assert multi_start.words(crossword) == 2
+
+
+@pytest.mark.asyncio
+async def test_best_of_runs(fake_runs):
+    crossword = await multi_start.generate_crossword(5, 5, 3, runs=3, workers=1)
+    assert list(crossword.words) == ["ABCD"]
+
+
+@pytest.mark.asyncio
+async def test_target_cancels_stragglers(fake_runs):
+    started = time.monotonic()
+    crossword = await multi_start.generate_crossword(5, 5, 3, runs=4, target=3 / 25, workers=1)
+    assert time.monotonic() - started < 5
+    assert len(crossword.letters) >= 3
+
+
+@pytest.mark.asyncio
+async def test_all_runs_failed(fake_runs):
+    with pytest.raises(CrosswordException):
+        await multi_start.generate_crossword(5, 5, 3, runs=1, workers=1)
+
+
+@pytest.mark.asyncio
+async def test_runs_have_their_own_random(monkeypatch):
+    async def drawing_runner(width, height, word_amount, start_word=None):
+        draws = []
+        for _ in range(3):
+            draws.append(random.random())
+            await asyncio.sleep(0)
+        return draws
+
+    monkeypatch.setattr(multi_start, "get_runner", lambda _: drawing_runner)
+    state = random.getstate()
+    first, second = await asyncio.gather(*(multi_start._run("direct", 5, 5, 3, "AB", 1) for _ in range(2)))
+    reference = Random(1)
+    assert first == second == [reference.random() for _ in range(3)]
+    assert random.getstate() == state
+
+
+def test_pickle_keeps_size_check():
+    crossword = CrosswordImprovable.make("ABC", 5)
+    crossword.add("BAD", (True, 1))
+    unpickled = pickle.loads(pickle.dumps(crossword))
+    assert unpickled.letters == crossword.letters
+    assert unpickled.words == crossword.words
+    assert unpickled.crossings == crossword.crossings
+    with pytest.raises(TooLargeException):
+        unpickled.add_letter((6, 0), "X")
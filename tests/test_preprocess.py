@@ -0,0 +1,109 @@
+from collections import Counter
+
+import duckdb
+import pytest
+
+from platyrhynchos.commons.alphabit import Alphabit
+from platyrhynchos.exclusive import cpython, queries
+from platyrhynchos.exclusive.preprocess import preprocess, preprocessed_path
+
+pytest_plugins = ("pytest_asyncio",)
+
+CLUES = [
+    ("Gone for good", "extinct"),
+    ("No longer existing", "EXTINCT"),
+    ("Clumsy person", "A BULL IN A CHINA SHOP!"),
+    ("Clumsy person (2)", "a  bull in a china-shop"),
+    ("Letter", "X"),
+    ("Written words", "TEXT"),
+]
+
+
+def write_clues(path):
+    conn = duckdb.connect(path)
+    conn.execute("CREATE TABLE clues (clue VARCHAR, answer VARCHAR, alphabit BIT)")
+    conn.executemany(
+        "INSERT INTO clues VALUES (?, ?, ?::BIT)", [(clue, answer, Alphabit(answer).to_db()) for clue, answer in CLUES]
+    )
+    conn.close()
+
+
+@pytest.fixture
+def preprocessed_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "words.db")
+    write_clues(path)
+
+    monkeypatch.setattr(cpython, "_db_path", lambda: path)
+    preprocess(path)
+    yield path
+    cpython.close_connection()
+
+
+def test_answers_table(preprocessed_db):
+    answers = cpython.cursor_execute("SELECT answer, length, alphabit, letters FROM answers")
+    assert [i[0] for i in answers] == ["TEXT", "EXTINCT", "A BULL IN A CHINA SHOP", "A BULL IN A CHINA-SHOP"]
+    for answer, length, alphabit, letters in answers:
+        assert length == len(answer)
+        assert alphabit == Alphabit(answer).to_int()
+        assert "".join(letters) == answer
+
+
+def test_downloaded_file_is_unchanged(tmp_path, monkeypatch):
+    path = str(tmp_path / "words.db")
+    write_clues(path)
+    with open(path, "rb") as f:
+        downloaded = f.read()
+
+    monkeypatch.setattr(cpython, "_db_path", lambda: path)
+    preprocess(path)
+    with open(path, "rb") as f:
+        assert f.read() == downloaded
+    assert preprocessed_path(path) == str(tmp_path / "words.answers.db")
+    assert cpython.cursor_execute("SELECT count(*) FROM answers") == [(4,)]
+    cpython.close_connection()
+
+
+def test_answer_clues(preprocessed_db):
+    assert cpython.cursor_execute("SELECT clue FROM answer_clues WHERE answer = 'EXTINCT' ORDER BY clue") == [
+        ("Gone for good",),
+        ("No longer existing",),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_queries_use_answers(preprocessed_db):
+    assert "answers" in cpython.cursor_execute("SELECT sql FROM duckdb_views() WHERE view_name = 'words'")[0][0]
+    assert sorted(await cpython.get_regex_w_alphabit("^.{0,3}XT.{0,4}$", Alphabit("XT").to_query())) == [
+        "EXTINCT",
+        "TEXT",
+    ]
+
+
+def test_words_view_of_raw_clues():
+    sql = queries.words_view("clues", {"answer": "VARCHAR", "alphabit": "BIT"})
+    assert "alphabit::UINTEGER" in sql and "length(answer) > 1" in sql
+
+
+def test_crossability_score(preprocessed_db):
+    scores = dict(cpython.cursor_execute("SELECT answer, score FROM answers"))
+    letters = Counter(letter for answer in scores for letter in answer if letter.isalpha())
+    for answer, score in scores.items():
+        expected = sum(letters[letter] for letter in answer if letter.isalpha()) / letters.total() / len(answer)
+        assert score == pytest.approx(expected)
+    assert scores["A BULL IN A CHINA SHOP"] == scores["A BULL IN A CHINA-SHOP"]
+
+
+@pytest.mark.asyncio
+async def test_ranked_batch(preprocessed_db):
+    regexes = [("^.{0,3}XT.{0,4}$", None), ("^.{0,30}$", None)]
+    assert await cpython.get_regex_batch(regexes, limit=2, ranked=True) == [
+        ["TEXT", "EXTINCT"],
+        ["A BULL IN A CHINA-SHOP", "A BULL IN A CHINA SHOP"],
+    ]
+    assert await cpython.get_regex_batch(regexes[:1], limit=1, ranked=True) == [["EXTINCT"]]
+
+
+def test_ranked_query_of_raw_clues():
+    sql = queries.words_view("clues", {"answer": "VARCHAR", "alphabit": "BIT"})
+    assert "0.0::REAL AS score" in sql
+    assert "order by length desc, score desc" in queries.regex_query("^A.$", ranked=True, limit=5)
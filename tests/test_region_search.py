@@ -0,0 +1,64 @@
+import pytest
+from conftest import WORDS, ListCruciverbalist
+
+from platyrhynchos.commons.utils import random
+from platyrhynchos.director import direct_search, get_runner, region_search
+
+pytest_plugins = ("pytest_asyncio",)
+
+SEED = 0
+
+
+class RotatingCruciverbalist(ListCruciverbalist):
+    """Draws start words in turn"""
+
+    def __init__(self, words: list[str]) -> None:
+        super().__init__(words)
+        self.started = 0
+
+    async def start_word(self, max_size: int) -> str:
+        self.started += 1
+        return [word for word in self.words if len(word) <= max_size][self.started % 3]
+
+
+def test_split():
+    assert region_search.split(10, 10, 15) == [((0, 0), 10, 10)]
+    regions = region_search.split(31, 20, 15)
+    assert regions == [((0, 0), 15, 20), ((16, 0), 15, 20)]
+    assert region_search.boundary(regions) == {(False, v) for v in range(20)}
+    assert len(region_search.split(40, 40, 15)) == 9
+
+
+@pytest.mark.asyncio
+async def test_regions_are_merged_and_joined(monkeypatch):
+    random.seed(SEED)
+    cruciverbalist = RotatingCruciverbalist(WORDS)
+    monkeypatch.setattr(direct_search, "get_cruciverbalist", lambda: cruciverbalist)
+    crossword = await region_search.generate_crossword(13, 6, 8, size=6, workers=1)
+    assert (crossword.max_h, crossword.max_v) == (13, 6)
+    assert len(crossword.words) == 8
+    # Both regions were filled and the final pass only added words to the rows passing through both
+    assert {h < 6 for h, _ in crossword.letters} == {True, False}
+    assert not any(h == 6 for coords in crossword.words_vertical.values() for h, _ in coords)
+    for word, coords in crossword.words.items():
+        assert "".join(crossword.letters[coord] for coord in sorted(coords)) == word
+
+
+@pytest.mark.asyncio
+async def test_database_prepared_before_filling(monkeypatch):
+    calls = []
+    cruciverbalist = RotatingCruciverbalist(WORDS)
+    fill = region_search._fill
+
+    async def recorded_fill(*args):
+        calls.append("fill")
+        return await fill(*args)
+
+    monkeypatch.setattr(direct_search, "get_cruciverbalist", lambda: calls.append("prepare") or cruciverbalist)
+    monkeypatch.setattr(region_search, "_fill", recorded_fill)
+    await region_search.generate_crossword(13, 6, 8, size=6, workers=1)
+    assert calls[:2] == ["prepare", "fill"]
+
+
+def test_runner_name():
+    assert get_runner("region") is region_search.generate_crossword
@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+from platyrhynchos import render, visualize
+from platyrhynchos.crossword.addable import CrosswordAddable
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+
+pytest_plugins = ("pytest_asyncio",)
+
+# Fake compiler writing an empty PDF, failing for files with "fail" in the name
+FAKE_LATEX = (
+    sys.executable,
+    "-c",
+    "import pathlib, sys; out, src = sys.argv[1].split('=', 1)[1], pathlib.Path(sys.argv[2]);"
+    "sys.exit(1) if 'fail' in src.name else (pathlib.Path(out) / (src.stem + '.pdf')).write_text('')",
+)
+
+
+def test_grid_rows():
+    crossword = CrosswordImprovable.make("TEXT", 5)
+    crossword.add("EXTRA", (True, 1))
+    assert list(crossword.grid_rows(".")) == ["TEXT.", ".X...", ".T...", ".R...", ".A..."]
+    assert crossword.as_exolve_grid(".", sep="/") == "TEXT./.X.../.T.../.R.../.A..."
+
+
+def test_exolve_batch(tmp_path):
+    crosswords = [CrosswordImprovable.make("TEXT", 4, 2), CrosswordImprovable.make("NEXT", 5, 5)]
+    crosswords[1].add("EXTRA", (True, 1))
+    path = tmp_path / "batch.exolve"
+    assert render.write_exolve_batch(iter(crosswords), path) == 2
+    assert path.read_text(encoding="utf8") == "".join(crossword.as_exolve() for crossword in crosswords)
+
+
+def test_latex_table():
+    crossword = next(CrosswordAddable.createFrom({"Written words": "TEXT"}))
+    table, hints_horizontal, hints_vertical = visualize.gen_table(crossword)
+    assert table == ["|[1]T\t|E\t|X\t|T\t|."]
+    assert hints_horizontal == [r"\Clue{1}{}{Written words}"]
+    assert not hints_vertical
+    assert visualize.gen_code([crossword]).count(r"\section*") == 1
+
+
+@pytest.mark.asyncio
+async def test_render_latex(tmp_path):
+    crosswords = CrosswordAddable.createFrom({str(n): "TEXT" for n in range(5)})
+    pdfs = await render.render_latex(crosswords, tmp_path, per_file=2, workers=2, command=FAKE_LATEX)
+    assert [pdf.name for pdf in pdfs] == ["crosswords_1.pdf", "crosswords_2.pdf", "crosswords_3.pdf"]
+    assert all(pdf.exists() for pdf in pdfs)
+    assert (tmp_path / "crosswords_3.tex").read_text(encoding="utf8").count(r"\section*") == 1
+
+
+@pytest.mark.asyncio
+async def test_compile_latex_codes(tmp_path):
+    sources = [tmp_path / "ok.tex", tmp_path / "fail.tex"]
+    assert await render.compile_latex(sources, workers=1, command=FAKE_LATEX) == [0, 1]
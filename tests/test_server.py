@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+from platyrhynchos.commons.settings import ServerSettings
+from platyrhynchos.commons.utils import random
+from platyrhynchos.crossword.improvable import CrosswordImprovable
+from platyrhynchos.server import GenerationServer, percentile
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def fake_runner(width, height, word_amount):
+    await asyncio.sleep(0.01)
+    crossword = CrosswordImprovable.make("TEXT", width, height)
+    crossword.add("EXTRA", (True, 1))
+    return crossword
+
+
+async def slow_runner(width, height, word_amount):
+    await asyncio.sleep(0.3)
+    return CrosswordImprovable.make("TEXT", width, height)
+
+
+async def random_runner(width, height, word_amount):
+    words = []
+    for _ in range(5):
+        words.append(random.choice(["TEXT", "NEXT", "TAXI", "EXIT"]))
+        await asyncio.sleep(0.001)
+    return CrosswordImprovable.make("".join(words), len(words) * 4, height)
+
+
+async def request(server, method, path, body=None, unix_socket=None):
+    if unix_socket:
+        reader, writer = await asyncio.open_unix_connection(unix_socket)
+    else:
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+@pytest.mark.asyncio
+async def test_generate_and_metrics():
+    generation_server = GenerationServer(ServerSettings(port=0), runner=fake_runner)
+    async with await generation_server.start() as server:
+        status, payload = await request(server, "POST", "/generate", {"width": 6, "height": 5, "seed": 3})
+        assert status == 200
+        assert payload["seed"] == 3
+        assert payload["words"] == ["TEXT", "EXTRA"]
+        assert "exolve-grid" in payload["exolve"]
+
+        assert (await request(server, "POST", "/generate", {"width": "big"}))[0] == 400
+        assert (await request(server, "GET", "/nothing"))[0] == 404
+
+        status, metrics = await request(server, "GET", "/metrics")
+        assert status == 200
+        assert metrics["requests"] == 2
+        assert metrics["failed"] == 1
+        assert metrics["latency"]["p50"] > 0
+
+
+async def failing_runner(width, height, word_amount):
+    raise KeyError("missing")
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error():
+    generation_server = GenerationServer(ServerSettings(port=0), runner=failing_runner)
+    async with await generation_server.start() as server:
+        status, payload = await request(server, "POST", "/generate", {})
+        assert status == 500
+        assert payload == {"error": "KeyError: 'missing'"}
+        assert generation_server.metrics.requests == generation_server.metrics.failed == 1
+        assert generation_server.metrics.running == 0
+
+
+@pytest.mark.asyncio
+async def test_same_seed_same_crossword():
+    generation_server = GenerationServer(ServerSettings(port=0, concurrency=4), runner=random_runner)
+    async with await generation_server.start() as server:
+        responses = await asyncio.gather(*(request(server, "POST", "/generate", {"seed": 5}) for _ in range(4)))
+        assert len({tuple(payload["words"]) for _, payload in responses}) == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_limit():
+    generation_server = GenerationServer(ServerSettings(port=0, concurrency=1, max_queue=1), runner=slow_runner)
+    async with await generation_server.start() as server:
+        responses = await asyncio.gather(*(request(server, "POST", "/generate", {}) for _ in range(4)))
+        assert sorted(status for status, _ in responses) == [200, 200, 503, 503]
+        assert generation_server.metrics.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_unix_socket(tmp_path):
+    path = str(tmp_path / "server.sock")
+    generation_server = GenerationServer(ServerSettings(unix_socket=path), runner=fake_runner)
+    async with await generation_server.start() as server:
+        assert await request(server, "GET", "/health", unix_socket=path) == (200, {"status": "ok"})
+
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
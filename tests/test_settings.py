@@ -1,7 +1,9 @@
+from dataclasses import FrozenInstanceError
+
 from dynaconf.vendor.tomllib import TOMLDecodeError
 from pytest import raises
 
-from platyrhynchos.commons.settings import load_settings_from_string
+from platyrhynchos.commons.settings import FrozenSettings, frozen_settings, load_settings_from_string
 
 
 def test_load_settings_from_string_with_valid_input():
@@ -49,3 +51,43 @@ def test_load_settings_from_string_2():
     assert settings.db_name == "prod_db"
     assert settings.db_host == "example.com"
     assert settings.db_port == 5433
+
+
+def test_load_settings_from_string_doesnt_write_files(tmp_path, monkeypatch):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    load_settings_from_string("[DEFAULT]\ndebug = true")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_frozen_settings_from_string():
+    settings_text = """
+    [DEFAULT]
+    debug = true
+    unknown_key = 1
+
+    [DEFAULT.components]
+    cruciverbalist = "en_simple"
+    runner = "direct"
+
+    [DEFAULT.en_simple]
+    use_alphabit = false
+    """
+    frozen = FrozenSettings.from_mapping(load_settings_from_string(settings_text)["DEFAULT"])
+    assert frozen.debug == True
+    assert frozen.components.runner == "direct"
+    assert frozen.en_simple.use_alphabit == False
+    assert frozen.en_simple.db_file == "en_simple.db"
+    assert frozen.s3.bucket == ""
+
+
+def test_frozen_settings_is_immutable():
+    frozen = FrozenSettings.from_mapping({"DEBUG": False})
+    with raises(FrozenInstanceError):
+        frozen.debug = True  # type: ignore
+    with raises(FrozenInstanceError):
+        frozen.en_simple.use_alphabit = False  # type: ignore
+
+
+def test_frozen_settings_is_cached():
+    assert frozen_settings() is frozen_settings()
+    assert frozen_settings().components.cruciverbalist == "en_simple"
@@ -0,0 +1,64 @@
+from collections import Counter
+
+import duckdb
+import pytest
+
+from platyrhynchos.commons.alphabit import Alphabit
+from platyrhynchos.commons.utils import random
+from platyrhynchos.director import direct_search
+from platyrhynchos.exclusive import cpython
+from platyrhynchos.exclusive.synthetic import LENGTH_FREQUENCIES, build_synthetic, synthetic_clues
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.fixture
+def synthetic_db(tmp_path):
+    path = str(tmp_path / "synthetic.db")
+    build_synthetic(path, 20_000)
+    cpython.use_database(path)
+    direct_search.get_cruciverbalist.cache_clear()
+    yield path
+    cpython.use_database(None)
+    direct_search.get_cruciverbalist.cache_clear()
+
+
+def test_clues_schema():
+    conn = duckdb.connect()
+    synthetic_clues(conn, 1000)
+    columns = conn.execute("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'clues'")
+    assert columns.fetchall() == [("clue", "VARCHAR"), ("answer", "VARCHAR"), ("alphabit", "BIT")]
+    clues = conn.execute("SELECT answer, alphabit::VARCHAR FROM clues").fetchall()
+    assert len(clues) == 1000
+    assert all(alphabit == Alphabit(answer).to_db() for answer, alphabit in clues)
+
+
+def test_distributions():
+    conn = duckdb.connect()
+    synthetic_clues(conn, 10_000, seed=1)
+    answers = [answer for (answer,) in conn.execute("SELECT answer FROM clues").fetchall()]
+    assert set(Counter(map(len, answers))) <= set(LENGTH_FREQUENCIES)
+    letters = Counter("".join(answers))
+    assert letters.most_common(1)[0][0] == "E"
+    assert letters["E"] > letters["Q"] * 20
+    phrases = [answer for answer in answers if " " in answer]
+    assert phrases and all(len(part) > 1 for phrase in phrases for part in phrase.split(" "))
+
+
+def test_same_seed_same_clues():
+    tables = []
+    for seed in (0, 0, 1):
+        conn = duckdb.connect()
+        synthetic_clues(conn, 100, seed)
+        tables.append(conn.execute("SELECT answer FROM clues ORDER BY clue").fetchall())
+    assert tables[0] == tables[1] != tables[2]
+
+
+@pytest.mark.asyncio
+async def test_offline_generation(synthetic_db):
+    assert cpython.cursor_execute("SELECT count(*) FROM answers")[0][0] > 10_000
+    random.seed(0)
+    crossword = await direct_search.generate_crossword(8, 8, 6)
+    answers = cpython._answer_set()
+    assert len(crossword.words) >= 4
+    assert all(word in answers for word in crossword.words)
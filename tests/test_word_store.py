@@ -0,0 +1,193 @@
+from random import Random
+
+import duckdb
+import pytest
+
+from platyrhynchos.commons.alphabit import Alphabit
+from platyrhynchos.commons.exceptions import DatabaseException
+from platyrhynchos.crossword.domains import LetterMasks
+from platyrhynchos.cruciverbalist.en_simple import EnglishSimpleCruciverbalist
+from platyrhynchos.exclusive import cpython, queries
+
+pytest_plugins = ("pytest_asyncio",)
+
+WORDS = ["EXTINCT", "EXTRA", "TEXT", "NEXT", "KAPUT", "CAMERA", "A BULL IN A CHINA SHOP"]
+
+
+@pytest.fixture
+def words_db(tmp_path, monkeypatch):
+    path = str(tmp_path / "words.db")
+    conn = duckdb.connect(path)
+    conn.execute("CREATE TABLE clues (clue VARCHAR, answer VARCHAR, alphabit BIT)")
+    conn.executemany("INSERT INTO clues VALUES ('clue', ?, ?::BIT)", [(i, Alphabit(i).to_db()) for i in WORDS])
+    conn.close()
+
+    cpython.close_connection()
+    monkeypatch.setattr(cpython, "_db_path", lambda: path)
+    yield path
+    cpython.close_connection()
+
+
+@pytest.fixture
+def parquet_store(words_db, tmp_path, monkeypatch):
+    path = str(tmp_path / "words.parquet")
+    cpython.export_parquet(path)
+    cpython.close_connection()
+    monkeypatch.setattr(cpython, "_db_path", lambda: path)
+    monkeypatch.setattr(cpython, "_uses_parquet", lambda: True)
+    return path
+
+
+def test_invalid_database(tmp_path, monkeypatch):
+    path = str(tmp_path / "words.db")
+    conn = duckdb.connect(path)
+    conn.execute("CREATE TABLE clues (clue VARCHAR, answer VARCHAR)")
+    conn.close()
+
+    cpython.close_connection()
+    monkeypatch.setattr(cpython, "_db_path", lambda: path)
+    monkeypatch.setattr(cpython, "_has_s3_credentials", lambda: False)
+    with pytest.raises(DatabaseException, match="`words` view over the `clues` table"):
+        cpython.download_db("en_simple.db")
+    cpython.close_connection()
+
+
+def test_to_int():
+    assert Alphabit("a").to_int() == 1
+    assert Alphabit("z").to_int() == 1 << 25
+    assert Alphabit("ab").to_int() == 3
+
+
+def test_read_only_connection(words_db):
+    with pytest.raises(duckdb.Error):
+        cpython.cursor_execute("CREATE TABLE dictionary.other (i INTEGER)")
+
+
+@pytest.mark.asyncio
+async def test_parquet_query(words_db, parquet_store):
+    query = Alphabit("XT").to_query()
+    from_parquet = await cpython.get_regex_w_alphabit("^.{0,3}XT.{0,4}$", query, ["TEXT"])
+    assert cpython.cursor_execute("SELECT typeof(alphabit) FROM clues LIMIT 1")[0][0] == "UINTEGER"
+    assert sorted(from_parquet) == ["EXTINCT", "EXTRA", "NEXT"]
+
+
+@pytest.mark.asyncio
+async def test_browser_parquet(tmp_path, monkeypatch):
+    path = str(tmp_path / "en_simple.parquet")
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE clues (clue VARCHAR, answer VARCHAR, alphabit_raw VARCHAR)")
+    conn.executemany("INSERT INTO clues VALUES ('clue', ?, ?)", [(i, Alphabit(i).to_db()) for i in WORDS])
+    conn.execute(f"COPY clues TO '{path}' (FORMAT PARQUET)")
+    conn.close()
+
+    cpython.close_connection()
+    monkeypatch.setattr(cpython, "_db_path", lambda: path)
+    monkeypatch.setattr(cpython, "_uses_parquet", lambda: True)
+    monkeypatch.setattr(cpython, "_has_s3_credentials", lambda: False)
+    cpython.download_db("en_simple.parquet")
+    query = Alphabit("XT").to_query()
+    assert sorted(await cpython.get_regex_w_alphabit("^.{0,3}XT.{0,4}$", query, ["TEXT"])) == [
+        "EXTINCT",
+        "EXTRA",
+        "NEXT",
+    ]
+    cpython.close_connection()
+
+
+def test_parquet_is_a_view(parquet_store):
+    assert cpython.cursor_execute("SELECT table_type FROM information_schema.tables WHERE table_name = 'clues'") == [
+        ("VIEW",)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_regex_batch(words_db):
+    results = await cpython.get_regex_batch(
+        [("^.{0,3}XT.{0,4}$", Alphabit("XT").to_query()), ("^KAP.{0,3}$", None), ("^QQ$", None)], ["TEXT"]
+    )
+    assert [sorted(i) for i in results] == [["EXTINCT", "EXTRA", "NEXT"], ["KAPUT"], []]
+    assert await cpython.get_regex_batch([]) == []
+
+
+def test_quoting(words_db):
+    assert (
+        cpython.cursor_execute(queries.regex_query("^.{0,30}$", ["O'HARA", "TEXT"], limit=1000)).count(("TEXT",)) == 0
+    )
+
+
+def test_allocate_lengths():
+    counts = {1: 100, 2: 1, 5: 10, 20: 1000}
+    allocation = queries.allocate_lengths(counts, 10, 1000, Random(1))
+    assert set(allocation) == {2, 5}
+    assert sum(allocation.values()) == 1000
+    assert allocation[5] > allocation[2]
+    assert queries.allocate_lengths(counts, 1, 10, Random(1)) == {}
+
+
+@pytest.mark.asyncio
+async def test_random_batch(words_db):
+    drawn = await cpython.get_random_batch(7, 5, seed=42)
+    assert 0 < len(drawn) <= 5
+    assert len(set(drawn)) == len(drawn)
+    assert all(len(i) <= 7 for i in drawn)
+    assert drawn == await cpython.get_random_batch(7, 5, seed=42)
+    assert await cpython.get_random_batch(1, 5) == []
+    assert len(await cpython.get_random(7)) == 1
+
+
+@pytest.mark.parametrize(
+    "regex, expected",
+    [
+        ("^.{0,3}AB.{2}C.{0,4}$", queries.PatternBounds(5, 12, ("AB", "C"))),
+        ("^.{0,1}A\\ .{1}\\-B.{0,2}$", queries.PatternBounds(5, 8, ("A ", "-B"))),
+        ("^.{0,6}$", queries.PatternBounds(0, 6, ())),
+        ("^[AB]$", None),
+        ("AB", None),
+    ],
+)
+def test_pattern_bounds(regex, expected):
+    assert queries.pattern_bounds(regex) == expected
+
+
+def test_pattern_conditions():
+    assert queries.pattern_conditions("^.{0,3}X.{1}TE.{0,2}$") == [
+        "length between 4 and 9",
+        "contains(answer, 'TE')",
+        "contains(answer, 'X')",
+    ]
+    assert queries.pattern_conditions("^(A|B)$") == []
+
+
+@pytest.mark.asyncio
+async def test_letter_masks(words_db):
+    assert await cpython.get_letter_masks() == {
+        length: list(masks) for length, masks in LetterMasks.from_words(WORDS).masks.items()
+    }
+    (found,) = await cpython.get_regex_batch([("^.{0,4}A.{0,4}$", None, Alphabit("KC").to_int())])
+    assert sorted(found) == ["EXTRA"]
+
+
+@pytest.mark.asyncio
+async def test_limited_lookup_excludes_previous(words_db):
+    cruciverbalist = EnglishSimpleCruciverbalist()
+    cruciverbalist.TOP_K = 1
+    (best,) = await cruciverbalist.select_by_regex(["^.EXT$"])
+    assert await cruciverbalist.select_by_regex(["^.EXT$"], [best]) == [{"TEXT": "NEXT", "NEXT": "TEXT"}[best]]
+    assert await cruciverbalist.select_by_regex(["^.EXT$"], ["TEXT", "NEXT"]) == []
+
+
+@pytest.mark.asyncio
+async def test_answer_set(words_db):
+    assert await cpython.get_answer_set() == frozenset(WORDS)
+
+
+@pytest.mark.parametrize(
+    "sql, columns, widths",
+    [
+        (queries.letter_masks_query(), ("length", "position", "mask"), queries.LETTER_MASKS_WIDTHS),
+        (queries.length_counts_query(), ("length", "amount"), queries.LENGTH_COUNTS_WIDTHS),
+    ],
+)
+def test_packed_query(words_db, sql, columns, widths):
+    packed = cpython.cursor_execute(queries.packed_query(sql, columns, widths))
+    assert [queries.unpack(value, widths) for (value,) in packed] == cpython.cursor_execute(sql)